@@ -0,0 +1,121 @@
+"""
+Compares the disk usage and lookup latency of regular
+snapshots against snapshots in the compact archive
+"""
+
+import os
+import time
+import random
+import sqlite3
+import argparse
+import tempfile
+
+from helper.functions import get_config
+from helper.snapshotcodec import encode_stats, decode_stats
+
+
+def generate_snapshot(stat_count: int) -> list[int]:
+    """
+    Generates the stats gained by a player during a single day
+    :param stat_count: the amount of tracked stats
+    """
+    # Most players don't play on a given day
+    if random.random() > 0.3:
+        return [0] * stat_count
+    return [random.choice((0, 0, 0, random.randint(1, 40), random.randint(1, 5000)))
+            for _ in range(stat_count)]
+
+
+def build_databases(path: str, stat_keys: list[str], players: int, days: int) -> tuple[str, str]:
+    """
+    Builds a database for each layout filled with the same snapshots
+    :param path: the directory to create the databases in
+    :param stat_keys: the stats tracked by each snapshot
+    :param players: the amount of players to generate snapshots for
+    :param days: the amount of daily snapshots per player
+    """
+    regular_path, archive_path = f'{path}/regular.db', f'{path}/archive.db'
+
+    columns = ', '.join([f'{key} INTEGER' for key in stat_keys])
+    regular = sqlite3.connect(regular_path)
+    regular.execute(
+        f'CREATE TABLE snapshots (uuid TEXT, period_type TEXT, period_key TEXT, '
+        f'{columns}, PRIMARY KEY (uuid, period_type, period_key))')
+
+    archive = sqlite3.connect(archive_path)
+    archive.execute(
+        'CREATE TABLE snapshot_archive (uuid TEXT, period_type TEXT, period_key TEXT, '
+        'schema_version INTEGER, data BLOB, PRIMARY KEY (uuid, period_type, period_key)) '
+        'WITHOUT ROWID')
+
+    placeholders = ', '.join('?' * (len(stat_keys) + 3))
+    for player in range(players):
+        rows = [(f'{player:032x}', 'daily', f'2023_{day // 28 + 1:02d}_{day % 28 + 1:02d}',
+                 *generate_snapshot(len(stat_keys))) for day in range(days)]
+
+        regular.executemany(f'INSERT INTO snapshots VALUES ({placeholders})', rows)
+        archive.executemany(
+            'INSERT INTO snapshot_archive VALUES (?, ?, ?, 1, ?)',
+            [(*row[:3], encode_stats(row[3:])) for row in rows])
+
+    for conn in (regular, archive):
+        conn.commit()
+        conn.execute('VACUUM')
+        conn.close()
+    return regular_path, archive_path
+
+
+def time_lookups(path: str, query: str, decode, players: int, days: int, lookups: int) -> float:
+    """
+    Returns the average latency of a single snapshot lookup in milliseconds
+    :param path: the path of the database to query
+    :param query: the query selecting a single snapshot
+    :param decode: turns the selected row into a stat vector
+    :param players: the amount of players in the database
+    :param days: the amount of daily snapshots per player
+    :param lookups: the amount of lookups to time
+    """
+    keys = [(f'{random.randrange(players):032x}', 'daily',
+             f'2023_{(day := random.randrange(days)) // 28 + 1:02d}_{day % 28 + 1:02d}')
+            for _ in range(lookups)]
+
+    with sqlite3.connect(path) as conn:
+        start = time.perf_counter()
+        for key in keys:
+            decode(conn.execute(query, key).fetchone())
+        elapsed = time.perf_counter() - start
+    return elapsed / lookups * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--players', type=int, default=2000)
+    parser.add_argument('--days', type=int, default=90)
+    parser.add_argument('--lookups', type=int, default=5000)
+    args = parser.parse_args()
+
+    stat_keys = ['level', 'stars_gained', *get_config()['tracked_bedwars_stats']]
+
+    with tempfile.TemporaryDirectory() as path:
+        regular_path, archive_path = build_databases(path, stat_keys, args.players, args.days)
+
+        where = 'WHERE uuid = ? AND period_type = ? AND period_key = ?'
+        regular_latency = time_lookups(
+            regular_path, f'SELECT * FROM snapshots {where}', lambda row: list(row[3:]),
+            args.players, args.days, args.lookups)
+        archive_latency = time_lookups(
+            archive_path, f'SELECT data FROM snapshot_archive {where}',
+            lambda row: decode_stats(row[0], len(stat_keys)),
+            args.players, args.days, args.lookups)
+
+        regular_size = os.path.getsize(regular_path)
+        archive_size = os.path.getsize(archive_path)
+
+    print(f'{args.players * args.days:,} snapshots of {len(stat_keys)} stats')
+    print(f'regular: {regular_size / 1024 ** 2:.2f} MiB, {regular_latency:.4f} ms per lookup')
+    print(f'archive: {archive_size / 1024 ** 2:.2f} MiB, {archive_latency:.4f} ms per lookup')
+    print(f'archive uses {archive_size / regular_size:.1%} of the space')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,4 @@
-import sqlite3
-
+from helper.database import connect_db
 from helper.calctools import (
     get_player_rank_info,
     get_mode,
@@ -18,7 +17,7 @@ class Difference:
 
         discord_id = uuid_to_discord_id(uuid)
 
-        with sqlite3.connect('./database/historical.db') as conn:
+        with connect_db('./database/historical.db') as conn:
             cursor = conn.cursor()
             if discord_id:
                 cursor.execute(f"SELECT * FROM configuration WHERE discord_id = '{discord_id}'")
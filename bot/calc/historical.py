@@ -1,6 +1,5 @@
-import sqlite3
-
-from helper.historical import get_reset_time
+from helper.database import connect_db
+from helper.historical import get_reset_time, get_snapshot
 from helper.calctools import (
     get_progress,
     get_player_rank_info,
@@ -20,7 +19,7 @@ class HistoricalStats:
         self.hypixel_data = get_player_dict(hypixel_data)
         self.hypixel_data_bedwars = self.hypixel_data.get('stats', {}).get('Bedwars', {})
 
-        with sqlite3.connect('./database/historical.db') as conn:
+        with connect_db('./database/historical.db') as conn:
             cursor = conn.cursor()
 
             cursor.execute(f"SELECT * FROM {method} WHERE uuid = '{uuid}'")
@@ -107,29 +106,26 @@ class HistoricalStats:
 
 
 class LookbackStats:
-    def __init__(self, name: str, uuid: str, table_name: str,
-                 mode: str, hypixel_data: dict) -> None:
-        self.name, self.uuid, self.table_name = name, uuid, table_name
+    def __init__(self, name: str, uuid: str, period_type: str,
+                 period_key: str, mode: str, hypixel_data: dict) -> None:
+        self.name, self.uuid = name, uuid
+        self.period_type, self.period_key = period_type, period_key
         self.mode = get_mode(mode)
 
         self.hypixel_data = get_player_dict(hypixel_data)
-        with sqlite3.connect('./database/linked_accounts.db') as conn:
+        with connect_db('./database/linked_accounts.db') as conn:
             cursor = conn.cursor()
             cursor.execute(f"SELECT * FROM linked_accounts WHERE uuid = '{uuid}'")
             linked_data = cursor.fetchone()
 
-        with sqlite3.connect('./database/historical.db') as conn:
+        with connect_db('./database/historical.db') as conn:
             cursor = conn.cursor()
             if linked_data:
                 cursor.execute(f"SELECT * FROM configuration WHERE discord_id = '{linked_data[0]}'")
                 self.config_data = cursor.fetchone()
             else: self.config_data = ()
 
-            cursor.execute(f"SELECT * FROM {table_name} WHERE uuid = '{uuid}'")
-            historical_data = cursor.fetchone()
-
-            column_names = [desc[0] for desc in cursor.description]
-            self.historical_data = dict(zip(column_names, historical_data))
+        self.historical_data = get_snapshot(uuid, period_type, period_key)
 
         self.level = self.historical_data['level']
         self.stars_gained = f"{rround(get_level(self.historical_data['Experience']), 2):,}"
@@ -1,6 +1,6 @@
 import math
-import sqlite3
 
+from helper.database import connect_db
 from helper.calctools import (
     get_player_rank_info,
     get_mode,
@@ -16,7 +16,7 @@ class Stats:
         self.name = name
         self.mode = get_mode(mode)
 
-        with sqlite3.connect('./database/sessions.db') as conn:
+        with connect_db('./database/sessions.db') as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM sessions WHERE session=? AND uuid=?", (session, uuid))
             session_data = cursor.fetchone()
@@ -1,6 +1,6 @@
-import sqlite3
 from datetime import datetime, timedelta
 
+from helper.database import connect_db
 from helper.calctools import (
     get_player_rank_info,
     add_suffixes,
@@ -21,7 +21,7 @@ class ProjectedStats:
         self.hypixel_data = get_player_dict(hypixel_data)
         self.hypixel_data_bedwars = self.hypixel_data.get('stats', {}).get('Bedwars', {})
 
-        with sqlite3.connect('./database/sessions.db') as conn:
+        with connect_db('./database/sessions.db') as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM sessions WHERE session=? AND uuid=?", (session, uuid))
             session_data = cursor.fetchone()
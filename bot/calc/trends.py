@@ -0,0 +1,73 @@
+from datetime import date, timedelta
+
+import numpy as np
+
+from helper.historical import get_snapshot_series
+from helper.calctools import get_player_rank_info, get_mode, get_player_dict
+
+
+class TrendStats:
+    def __init__(self, name: str, uuid: str, end_date: date, days: int,
+                 window: int, mode: str, hypixel_data: dict) -> None:
+        self.name, self.uuid = name, uuid
+        self.days, self.window = days, window
+        self.mode = get_mode(mode)
+
+        self.hypixel_data = get_player_dict(hypixel_data)
+        self.player_rank_info = get_player_rank_info(self.hypixel_data)
+
+        self.start_date = end_date - timedelta(days=days - 1)
+        self.end_date = end_date
+
+        stat_keys = (
+            f'{self.mode}final_kills_bedwars', f'{self.mode}final_deaths_bedwars',
+            f'{self.mode}wins_bedwars', f'{self.mode}losses_bedwars', 'stars_gained'
+        )
+        period_keys, series = get_snapshot_series(
+            uuid, 'daily', stat_keys,
+            self.start_date.strftime('%Y_%m_%d'), end_date.strftime('%Y_%m_%d'))
+
+        # Days without a snapshot weren't played so they are left as zero
+        daily = np.zeros((days, len(stat_keys)))
+        offsets = np.array([
+            (date(*map(int, key.split('_'))) - self.start_date).days for key in period_keys], dtype=int)
+        daily[offsets] = series
+
+        self.tracked_days = len(period_keys)
+        (self.final_kills, self.final_deaths,
+         self.wins, self.losses, self.stars_gained) = daily.T
+
+
+    def rolling_sum(self, values: np.ndarray) -> np.ndarray:
+        """
+        Returns the sum of each day and the days before it within the window
+        :param values: the value of each day
+        """
+        totals = np.cumsum(values)
+        totals[self.window:] = totals[self.window:] - totals[:-self.window]
+        return totals
+
+
+    def rolling_ratio(self, numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+        """
+        Returns the ratio of two stats over each window, a window without
+        any of the denominator is treated as if it were one like the other ratios
+        :param numerator: the value of the top stat each day
+        :param denominator: the value of the bottom stat each day
+        """
+        numerator, denominator = self.rolling_sum(numerator), self.rolling_sum(denominator)
+        return numerator / np.maximum(denominator, 1)
+
+
+    def get_fkdr(self) -> np.ndarray:
+        return self.rolling_ratio(self.final_kills, self.final_deaths)
+
+
+    def get_wlr(self) -> np.ndarray:
+        return self.rolling_ratio(self.wins, self.losses)
+
+
+    def get_stars_per_day(self) -> np.ndarray:
+        # The first days of the range average over the days available
+        return self.rolling_sum(self.stars_gained) / np.minimum(
+            np.arange(1, self.days + 1), self.window)
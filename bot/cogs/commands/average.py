@@ -1,5 +1,3 @@
-import os
-
 import discord
 from discord import app_commands
 from discord.ext import commands
@@ -32,7 +30,6 @@ class Average(commands.Cog):
         name, uuid = await fetch_player_info(username, interaction)
 
         await interaction.followup.send(self.LOADING_MSG)
-        os.makedirs(f'./database/activerenders/{interaction.id}')
         skin_res = await fetch_skin_model(uuid, 144)
         hypixel_data = await get_hypixel_data(uuid)
 
@@ -40,8 +37,7 @@ class Average(commands.Cog):
             "name": name,
             "uuid": uuid,
             "hypixel_data": hypixel_data,
-            "skin_res": skin_res,
-            "save_dir": interaction.id
+            "skin_res": skin_res
         }
 
         await send_generic_renders(interaction, render_average, kwargs)
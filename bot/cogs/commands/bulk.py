@@ -0,0 +1,100 @@
+import re
+import json
+import asyncio
+
+import aiohttp
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from render.bulk import render_bulk
+from helper.mojang import get_profile_by_name, get_name
+from helper.functions import (
+    get_command_cooldown,
+    get_hypixel_data,
+    update_command_stats,
+    send_generic_renders,
+    loading_message
+)
+
+
+MAX_PLAYERS = 16
+
+
+async def fetch_bulk_player(player: str) -> tuple[str, dict] | None:
+    """
+    Resolves a player and fetches their hypixel data, returns None if either fails
+    :param player: the username or uuid of the player
+    """
+    try:
+        if len(player) <= 16:
+            uuid, name = await get_profile_by_name(player)
+        else:
+            uuid, name = player, await get_name(player)
+        if name is None:
+            return None
+
+        hypixel_data = await get_hypixel_data(uuid)
+    # Unknown players and failed requests drop the player, anything else is a bug
+    except (KeyError, aiohttp.ClientError, asyncio.TimeoutError, json.JSONDecodeError):
+        return None
+
+    if not hypixel_data.get('player'):
+        return None
+    return name, hypixel_data
+
+
+class Bulk(commands.Cog):
+    def __init__(self, client):
+        self.client: discord.Client = client
+        self.LOADING_MSG = loading_message()
+
+
+    @app_commands.command(name="bulk", description="View the stats of up to 16 players at once")
+    @app_commands.describe(
+        players='The players to view, separated by spaces or commas',
+        sort='The stat to sort the players by')
+    @app_commands.choices(sort=[
+        app_commands.Choice(name='FKDR', value='fkdr'),
+        app_commands.Choice(name='Star', value='star')])
+    @app_commands.checks.dynamic_cooldown(get_command_cooldown)
+    async def bulk(self, interaction: discord.Interaction, players: str, sort: str='fkdr'):
+        await interaction.response.defer()
+
+        # Duplicates are dropped, keeping the order the players were given in
+        names = list({name.lower(): name for name in re.split(r'[\s,]+', players) if name}.values())
+        if not names:
+            await interaction.followup.send('Specify at least one player!')
+            return
+        if len(names) > MAX_PLAYERS:
+            await interaction.followup.send(f'You can only view up to {MAX_PLAYERS} players at once!')
+            return
+
+        await interaction.followup.send(self.LOADING_MSG)
+
+        # Every player is resolved and fetched at the same time, the
+        # fetch layer limits how many requests reach hypixel at once
+        results = await asyncio.gather(*(fetch_bulk_player(name) for name in names))
+
+        found = [result for result in results if result]
+        missing = [name for name, result in zip(names, results) if not result]
+        if not found:
+            await interaction.edit_original_response(content="None of those players could be found!")
+            return
+
+        message = None
+        if missing:
+            refined = ', '.join(name.replace('_', r'\_') for name in missing)
+            message = f"Couldn't find: {refined}"
+
+        kwargs = {
+            "players": found,
+            "sort": sort
+        }
+
+        await send_generic_renders(interaction, render_bulk, kwargs, message=message)
+        update_command_stats(interaction.user.id, 'bulk')
+
+
+async def setup(client: commands.Bot) -> None:
+    await client.add_cog(Bulk(client))
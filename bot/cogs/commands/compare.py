@@ -1,5 +1,3 @@
-import os
-
 import discord
 from discord import app_commands
 from discord.ext import commands
@@ -32,7 +30,6 @@ class Compare(commands.Cog):
         name_2, uuid_2 = await fetch_player_info(player_2 if player_2 else player_1, interaction)
 
         await interaction.followup.send(self.LOADING_MSG)
-        os.makedirs(f'./database/activerenders/{interaction.id}')
         hypixel_data_1 = await get_hypixel_data(uuid_1)
         hypixel_data_2 = await get_hypixel_data(uuid_2)
 
@@ -41,8 +38,7 @@ class Compare(commands.Cog):
             "name_2": name_2,
             "uuid_1": uuid_1,
             "hypixel_data_1": hypixel_data_1,
-            "hypixel_data_2": hypixel_data_2,
-            "save_dir": interaction.id
+            "hypixel_data_2": hypixel_data_2
         }
 
         await send_generic_renders(interaction, render_compare, kwargs)
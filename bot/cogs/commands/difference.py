@@ -1,4 +1,3 @@
-import os
 from datetime import datetime, timedelta, timezone
 
 import discord
@@ -7,7 +6,8 @@ from discord.ext import commands
 
 from render.difference import render_difference
 from helper.historical import HistoricalManager
-from helper.linking import fetch_player_info, uuid_to_discord_id
+from helper.linking import fetch_player_info
+from helper.repositories import linking_repo, historical_repo
 from helper.functions import (
     username_autocompletion,
     get_command_cooldown,
@@ -39,14 +39,14 @@ class Difference(commands.Cog):
 
         historic = HistoricalManager(interaction.user.id, uuid)
 
-        discord_id = uuid_to_discord_id(uuid=uuid)
+        discord_id = await linking_repo.uuid_to_discord_id(uuid)
         if method == 'yearly':
             result = await yearly_eligibility(interaction, discord_id)
             if not result:
                 return
 
-        gmt_offset = historic.get_reset_time()[0]
-        historical_data = historic.get_historical(table_name=method)
+        gmt_offset = (await historical_repo.get_reset_time(uuid))[0]
+        historical_data = await historical_repo.get_historical(uuid, method)
 
         if not historical_data:
             await historic.start_historical()
@@ -54,7 +54,6 @@ class Difference(commands.Cog):
             return
 
         await interaction.followup.send(self.LOADING_MSG)
-        os.makedirs(f'./database/activerenders/{interaction.id}')
         skin_res = await fetch_skin_model(uuid, 144)
         hypixel_data = await get_hypixel_data(uuid)
 
@@ -67,8 +66,7 @@ class Difference(commands.Cog):
             "relative_date": formatted_date,
             "method": method,
             "hypixel_data": hypixel_data,
-            "skin_res": skin_res,
-            "save_dir": interaction.id
+            "skin_res": skin_res
         }
 
         await send_generic_renders(interaction, render_difference, kwargs)
@@ -27,7 +27,7 @@ class DisplayName(commands.Cog):
 
         hypixel_data = await get_hypixel_data(uuid)
         if not hypixel_data.get('player'):
-            hypixel_data['player'] = {}
+            hypixel_data = {**hypixel_data, 'player': {}}
         rendered = render_displayname(name, hypixel_data)
         await interaction.followup.send(content=None, files=[discord.File(rendered, filename="displayname.png")])
 
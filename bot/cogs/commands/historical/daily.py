@@ -1,14 +1,13 @@
-import os
-import asyncio
 from datetime import datetime, timedelta, timezone
 
 import discord
 from discord import app_commands
-from discord.ext import commands, tasks
+from discord.ext import commands
 
 from render.historical import render_historical
-from helper.historical import HistoricalManager, reset_historical
-from helper.linking import fetch_player_info, uuid_to_discord_id
+from helper.historical import HistoricalManager
+from helper.linking import fetch_player_info
+from helper.repositories import linking_repo, historical_repo
 from helper.functions import (
     username_autocompletion,
     get_command_cooldown,
@@ -17,7 +16,6 @@ from helper.functions import (
     fetch_skin_model,
     ordinal, loading_message,
     send_generic_renders,
-    log_error_msg,
 )
 
 
@@ -27,35 +25,6 @@ class Daily(commands.Cog):
         self.LOADING_MSG = loading_message()
 
 
-    @tasks.loop(hours=1)
-    async def reset_daily(self):
-        await reset_historical(
-            method='daily',
-            table_format='daily_%Y_%m_%d',
-            condition='True'
-        )
-
-
-    def cog_load(self):
-        self.reset_daily.start()
-
-
-    def cog_unload(self):
-        self.reset_daily.cancel()
-
-
-    @reset_daily.error
-    async def on_reset_daily_error(self, error):
-        await log_error_msg(self.client, error)
-
-
-    @reset_daily.before_loop
-    async def before_reset_daily(self):
-        now = datetime.now()
-        sleep_seconds = (60 - now.minute) * 60 - now.second
-        await asyncio.sleep(sleep_seconds)
-
-
     @app_commands.command(name="daily", description="View the daily stats of a player")
     @app_commands.autocomplete(username=username_autocompletion)
     @app_commands.describe(username='The player you want to view')
@@ -67,9 +36,9 @@ class Daily(commands.Cog):
         refined = name.replace("_", "\_")
 
         historic = HistoricalManager(interaction.user.id, uuid)
-        gmt_offset, hour = historic.get_reset_time()
+        gmt_offset, hour = await historical_repo.get_reset_time(uuid)
 
-        historical_data = historic.get_historical(table_name='daily')
+        historical_data = await historical_repo.get_historical(uuid, 'daily')
 
         if not historical_data:
             await historic.start_historical()
@@ -77,7 +46,6 @@ class Daily(commands.Cog):
             return
 
         await interaction.followup.send(self.LOADING_MSG)
-        os.makedirs(f'./database/activerenders/{interaction.id}')
         skin_res = await fetch_skin_model(uuid, 144)
         hypixel_data = await get_hypixel_data(uuid)
 
@@ -97,8 +65,7 @@ class Daily(commands.Cog):
             "relative_date": formatted_date,
             "title": "Daily BW Stats",
             "hypixel_data": hypixel_data,
-            "skin_res": skin_res,
-            "save_dir": interaction.id
+            "skin_res": skin_res
         }
 
         await send_generic_renders(
@@ -122,9 +89,9 @@ class Daily(commands.Cog):
 
         historic = HistoricalManager(interaction.user.id, uuid)
         
-        discord_id = uuid_to_discord_id(uuid=uuid)
+        discord_id = await linking_repo.uuid_to_discord_id(uuid)
 
-        max_lookback = historic.get_lookback_eligiblility(discord_id, interaction.user.id)
+        max_lookback = await historical_repo.get_lookback_eligibility(discord_id, interaction.user.id)
         if -1 != max_lookback < days:
             await interaction.followup.send(embed=historic.build_invalid_lookback_embed(max_lookback))
             return
@@ -132,26 +99,25 @@ class Daily(commands.Cog):
         if days < 1:
             days = 1
 
-        gmt_offset = historic.get_reset_time()[0]
+        gmt_offset = (await historical_repo.get_reset_time(uuid))[0]
 
         now = datetime.now(timezone(timedelta(hours=gmt_offset)))
 
         try:
             relative_date = now - timedelta(days=days)
             formatted_date = relative_date.strftime(f"%b {relative_date.day}{ordinal(relative_date.day)}, %Y")
-            table_name = relative_date.strftime("daily_%Y_%m_%d")
+            period_key = relative_date.strftime("%Y_%m_%d")
         except OverflowError:
             await interaction.followup.send('Big, big number... too big number...')
             return
 
-        historical_data = historic.get_historical(table_name=table_name)
+        historical_data = await historical_repo.get_snapshot(uuid, 'daily', period_key)
 
         if not historical_data:
             await interaction.followup.send(f'{refined} has no tracked data for {days} day(s) ago!')
             return
 
         await interaction.followup.send(self.LOADING_MSG)
-        os.makedirs(f'./database/activerenders/{interaction.id}')
         skin_res = await fetch_skin_model(uuid, 144)
         hypixel_data = await get_hypixel_data(uuid)
 
@@ -161,10 +127,10 @@ class Daily(commands.Cog):
             "method": "lastday",
             "relative_date": formatted_date,
             "title": f"{days} Days Ago",
-            "table_name": table_name,
+            "period_type": "daily",
+            "period_key": period_key,
             "hypixel_data": hypixel_data,
-            "skin_res": skin_res,
-            "save_dir": interaction.id
+            "skin_res": skin_res
         }
 
         await send_generic_renders(interaction, render_historical, kwargs)
@@ -1,23 +1,19 @@
-import os
-import asyncio
-
-from calendar import monthrange
 from datetime import datetime, timedelta, timezone
 from dateutil.relativedelta import relativedelta
 
 import discord
 from discord import app_commands
-from discord.ext import commands, tasks
+from discord.ext import commands
 
 from render.historical import render_historical
-from helper.historical import reset_historical, HistoricalManager
-from helper.linking import fetch_player_info, uuid_to_discord_id
+from helper.historical import HistoricalManager
+from helper.linking import fetch_player_info
+from helper.repositories import linking_repo, historical_repo
 from helper.functions import (
     username_autocompletion,
     get_command_cooldown,
     get_hypixel_data,
     update_command_stats,
-    log_error_msg,
     fetch_skin_model,
     ordinal, loading_message,
     send_generic_renders,
@@ -30,39 +26,6 @@ class Monthly(commands.Cog):
         self.LOADING_MSG = loading_message()
 
 
-    @tasks.loop(hours=1)
-    async def reset_monthly(self):
-        utc_now = datetime.utcnow()
-        if not utc_now.day in (1, 2) and not utc_now.day == monthrange(utc_now.year, utc_now.month)[1]:
-            return
-        
-        await reset_historical(
-            method='monthly',
-            table_format='monthly_%Y_%m',
-            condition='timezone.day == 1'
-        )
-
-
-    def cog_load(self):
-        self.reset_monthly.start()
-
-
-    def cog_unload(self):
-        self.reset_monthly.cancel()
-
-
-    @reset_monthly.before_loop
-    async def before_reset_monthly(self):
-        now = datetime.now()
-        sleep_seconds = (60 - now.minute) * 60 - now.second
-        await asyncio.sleep(sleep_seconds)
-
-
-    @reset_monthly.error
-    async def on_reset_monthly_error(self, error):
-        await log_error_msg(self.client, error)
-
-
     @app_commands.command(name="monthly", description="View the monthly stats of a player")
     @app_commands.autocomplete(username=username_autocompletion)
     @app_commands.describe(username='The player you want to view')
@@ -74,9 +37,9 @@ class Monthly(commands.Cog):
         refined = name.replace("_", "\_")
 
         historic = HistoricalManager(interaction.user.id, uuid)
-        gmt_offset, hour = historic.get_reset_time()
+        gmt_offset, hour = await historical_repo.get_reset_time(uuid)
 
-        historical_data = historic.get_historical(table_name='monthly')
+        historical_data = await historical_repo.get_historical(uuid, 'monthly')
 
         if not historical_data:
             await historic.start_historical()
@@ -84,7 +47,6 @@ class Monthly(commands.Cog):
             return
 
         await interaction.followup.send(self.LOADING_MSG)
-        os.makedirs(f'./database/activerenders/{interaction.id}')
         skin_res = await fetch_skin_model(uuid, 144)
         hypixel_data = await get_hypixel_data(uuid)
 
@@ -107,8 +69,7 @@ class Monthly(commands.Cog):
             "relative_date": formatted_date,
             "title": "Monthly BW Stats",
             "hypixel_data": hypixel_data,
-            "skin_res": skin_res,
-            "save_dir": interaction.id
+            "skin_res": skin_res
         }
 
         await send_generic_renders(
@@ -132,9 +93,9 @@ class Monthly(commands.Cog):
 
         historic = HistoricalManager(interaction.user.id, uuid)
         
-        discord_id = uuid_to_discord_id(uuid=uuid)
+        discord_id = await linking_repo.uuid_to_discord_id(uuid)
 
-        max_lookback = historic.get_lookback_eligiblility(discord_id, interaction.user.id)
+        max_lookback = await historical_repo.get_lookback_eligibility(discord_id, interaction.user.id)
         if -1 != max_lookback < (months * 30):
             await interaction.followup.send(embed=historic.build_invalid_lookback_embed(max_lookback))
             return
@@ -142,26 +103,25 @@ class Monthly(commands.Cog):
         if months < 1:
             months = 1
 
-        gmt_offset = historic.get_reset_time()[0]
+        gmt_offset = (await historical_repo.get_reset_time(uuid))[0]
 
         now = datetime.now(timezone(timedelta(hours=gmt_offset)))
 
         try:
             relative_date = now - relativedelta(months=months)
             formatted_date = relative_date.strftime("%b %Y")
-            table_name = relative_date.strftime("monthly_%Y_%m")
+            period_key = relative_date.strftime("%Y_%m")
         except ValueError:
             await interaction.followup.send('Big, big number... too big number...')
             return
 
-        historical_data = historic.get_historical(table_name=table_name)
+        historical_data = await historical_repo.get_snapshot(uuid, 'monthly', period_key)
 
         if not historical_data:
             await interaction.followup.send(f'{refined} has no tracked data for {months} month(s) ago!')
             return
 
         await interaction.followup.send(self.LOADING_MSG)
-        os.makedirs(f'./database/activerenders/{interaction.id}')
         skin_res = await fetch_skin_model(uuid, 144)
         hypixel_data = await get_hypixel_data(uuid)
 
@@ -171,10 +131,10 @@ class Monthly(commands.Cog):
             "method": "lastmonth",
             "relative_date": formatted_date,
             "title": f"{months} Months Ago",
-            "table_name": table_name,
+            "period_type": "monthly",
+            "period_key": period_key,
             "hypixel_data": hypixel_data,
-            "skin_res": skin_res,
-            "save_dir": interaction.id
+            "skin_res": skin_res
         }
         
         await send_generic_renders(interaction, render_historical, kwargs)
@@ -0,0 +1,72 @@
+from datetime import datetime, timedelta, timezone
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from render.trends import render_trends
+from helper.historical import HistoricalManager
+from helper.linking import fetch_player_info
+from helper.repositories import linking_repo, historical_repo
+from helper.functions import (
+    username_autocompletion,
+    get_command_cooldown,
+    get_hypixel_data,
+    update_command_stats,
+    loading_message,
+    send_generic_renders
+)
+
+
+class Trends(commands.Cog):
+    def __init__(self, client):
+        self.client: discord.Client = client
+        self.LOADING_MSG = loading_message()
+
+
+    @app_commands.command(name="trends", description="View the daily trends of a player over time")
+    @app_commands.autocomplete(username=username_autocompletion)
+    @app_commands.describe(
+        username='The player you want to view',
+        days='The amount of days to view (7-365)',
+        window='The amount of days each point is averaged over (1-30)')
+    @app_commands.checks.dynamic_cooldown(get_command_cooldown)
+    async def trends(self, interaction: discord.Interaction,
+                     username: str=None, days: int=30, window: int=7):
+        await interaction.response.defer()
+        name, uuid = await fetch_player_info(username, interaction)
+
+        days = min(max(days, 7), 365)
+        window = min(max(window, 1), 30, days)
+
+        historic = HistoricalManager(interaction.user.id, uuid)
+        discord_id = await linking_repo.uuid_to_discord_id(uuid)
+
+        max_lookback = await historical_repo.get_lookback_eligibility(discord_id, interaction.user.id)
+        if -1 != max_lookback < days:
+            await interaction.followup.send(embed=historic.build_invalid_lookback_embed(max_lookback))
+            return
+
+        await interaction.followup.send(self.LOADING_MSG)
+        hypixel_data = await get_hypixel_data(uuid)
+
+        # The latest snapshot is of the day before the current day
+        gmt_offset, hour = await historical_repo.get_reset_time(uuid)
+        now = datetime.now(timezone(timedelta(hours=gmt_offset)))
+        end_date = (now - timedelta(hours=hour, days=1)).date()
+
+        kwargs = {
+            "name": name,
+            "uuid": uuid,
+            "hypixel_data": hypixel_data,
+            "end_date": end_date,
+            "days": days,
+            "window": window
+        }
+
+        await send_generic_renders(interaction, render_trends, kwargs)
+        update_command_stats(interaction.user.id, 'trends')
+
+
+async def setup(client: commands.Bot) -> None:
+    await client.add_cog(Trends(client))
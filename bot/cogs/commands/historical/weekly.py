@@ -1,14 +1,13 @@
-import os
-import asyncio
 from datetime import datetime, timedelta, timezone
 
 import discord
 from discord import app_commands
-from discord.ext import commands, tasks
+from discord.ext import commands
 
 from render.historical import render_historical
-from helper.historical import reset_historical, HistoricalManager
-from helper.linking import fetch_player_info, uuid_to_discord_id
+from helper.historical import HistoricalManager
+from helper.linking import fetch_player_info
+from helper.repositories import linking_repo, historical_repo
 from helper.functions import (
     username_autocompletion,
     get_command_cooldown,
@@ -17,7 +16,6 @@ from helper.functions import (
     fetch_skin_model,
     ordinal, loading_message,
     send_generic_renders,
-    log_error_msg,
 )
 
 
@@ -27,39 +25,6 @@ class Weekly(commands.Cog):
         self.LOADING_MSG = loading_message()
 
 
-    @tasks.loop(hours=1)
-    async def reset_weekly(self):
-        utc_now = datetime.utcnow()
-        if not utc_now.weekday() in (5, 6, 0):
-            return
-
-        await reset_historical(
-            method='weekly',
-            table_format='weekly_%Y_%U',
-            condition='timezone.weekday() == 6'
-        )
-
-
-    def cog_load(self):
-        self.reset_weekly.start()
-
-
-    def cog_unload(self):
-        self.reset_weekly.cancel()
-
-
-    @reset_weekly.before_loop
-    async def before_reset_weekly(self):
-        now = datetime.now()
-        sleep_seconds = (60 - now.minute) * 60 - now.second
-        await asyncio.sleep(sleep_seconds)
-
-
-    @reset_weekly.error
-    async def on_reset_weekly_error(self, error):
-        await log_error_msg(self.client, error)
-
-
     @app_commands.command(name="weekly", description="View the weekly stats of a player")
     @app_commands.autocomplete(username=username_autocompletion)
     @app_commands.describe(username='The player you want to view')
@@ -71,9 +36,9 @@ class Weekly(commands.Cog):
         refined = name.replace("_", "\_")
 
         historic = HistoricalManager(interaction.user.id, uuid)
-        gmt_offset, hour = historic.get_reset_time()
+        gmt_offset, hour = await historical_repo.get_reset_time(uuid)
 
-        historical_data = historic.get_historical(table_name='monthly')
+        historical_data = await historical_repo.get_historical(uuid, 'monthly')
 
         if not historical_data:
             await historic.start_historical()
@@ -81,7 +46,6 @@ class Weekly(commands.Cog):
             return
 
         await interaction.followup.send(self.LOADING_MSG)
-        os.makedirs(f'./database/activerenders/{interaction.id}')
         skin_res = await fetch_skin_model(uuid, 144)
         hypixel_data = await get_hypixel_data(uuid)
 
@@ -101,8 +65,7 @@ class Weekly(commands.Cog):
             "relative_date": formatted_date,
             "title": "Weekly BW Stats",
             "hypixel_data": hypixel_data,
-            "skin_res": skin_res,
-            "save_dir": interaction.id
+            "skin_res": skin_res
         }
 
         await send_generic_renders(
@@ -126,9 +89,9 @@ class Weekly(commands.Cog):
 
         historic = HistoricalManager(interaction.user.id, uuid)
         
-        discord_id = uuid_to_discord_id(uuid=uuid)
+        discord_id = await linking_repo.uuid_to_discord_id(uuid)
 
-        max_lookback = historic.get_lookback_eligiblility(discord_id, interaction.user.id)
+        max_lookback = await historical_repo.get_lookback_eligibility(discord_id, interaction.user.id)
         if -1 != max_lookback < (weeks * 7):
             await interaction.followup.send(embed=historic.build_invalid_lookback_embed(max_lookback))
             return
@@ -136,26 +99,25 @@ class Weekly(commands.Cog):
         if weeks < 1:
             weeks = 1
 
-        gmt_offset = historic.get_reset_time()[0]
+        gmt_offset = (await historical_repo.get_reset_time(uuid))[0]
 
         now = datetime.now(timezone(timedelta(hours=gmt_offset)))
 
         try:
             relative_date = now - timedelta(weeks=weeks)
             formatted_date = relative_date.strftime("Week %U, %Y")
-            table_name = relative_date.strftime("weekly_%Y_%U")
+            period_key = relative_date.strftime("%Y_%U")
         except OverflowError:
             await interaction.followup.send('Big, big number... too big number...')
             return
 
-        historical_data = historic.get_historical(table_name=table_name)
+        historical_data = await historical_repo.get_snapshot(uuid, 'weekly', period_key)
 
         if not historical_data:
             await interaction.followup.send(f'{refined} has no tracked data for {weeks} week(s) ago!')
             return
 
         await interaction.followup.send(self.LOADING_MSG)
-        os.makedirs(f'./database/activerenders/{interaction.id}')
         skin_res = await fetch_skin_model(uuid, 144)
         hypixel_data = await get_hypixel_data(uuid)
 
@@ -165,10 +127,10 @@ class Weekly(commands.Cog):
             "method": "lastweek",
             "relative_date": formatted_date,
             "title": f"{weeks} Weeks Ago",
-            "table_name": table_name,
+            "period_type": "weekly",
+            "period_key": period_key,
             "hypixel_data": hypixel_data,
-            "skin_res": skin_res,
-            "save_dir": interaction.id
+            "skin_res": skin_res
         }
 
         await send_generic_renders(interaction, render_historical, kwargs)
@@ -1,16 +1,14 @@
-import os
-import asyncio
-
 from datetime import datetime, timedelta, timezone
 from dateutil.relativedelta import relativedelta
 
 import discord
 from discord import app_commands
-from discord.ext import commands, tasks
+from discord.ext import commands
 
 from render.historical import render_historical
-from helper.historical import reset_historical, HistoricalManager
-from helper.linking import fetch_player_info, uuid_to_discord_id
+from helper.historical import HistoricalManager
+from helper.linking import fetch_player_info
+from helper.repositories import linking_repo, historical_repo
 from helper.functions import (
     username_autocompletion,
     get_command_cooldown,
@@ -20,7 +18,6 @@ from helper.functions import (
     fetch_skin_model,
     ordinal, loading_message,
     send_generic_renders,
-    log_error_msg,
 )
 
 
@@ -29,39 +26,6 @@ class Yearly(commands.Cog):
         self.client: discord.Client = client
         self.LOADING_MSG = loading_message()
 
-    @tasks.loop(hours=1)
-    async def reset_yearly(self):
-        utc_now = datetime.utcnow()
-        if not utc_now.timetuple().tm_yday in (1, 2, 365, 366):
-            return
-        
-        await reset_historical(
-            method='yearly',
-            table_format='yearly_%Y',
-            condition='timezone.timetuple().tm_yday == 1'
-        )
-
-
-    def cog_load(self):
-        self.reset_yearly.start()
-
-
-    def cog_unload(self):
-        self.reset_yearly.cancel()
-
-
-    @reset_yearly.before_loop
-    async def before_reset_yearly(self):
-        now = datetime.now()
-        sleep_seconds = (60 - now.minute) * 60 - now.second
-        await asyncio.sleep(sleep_seconds)
-
-
-    @reset_yearly.error
-    async def on_reset_yearly_error(self, error):
-        await log_error_msg(self.client, error)
-
-
     @app_commands.command(name="yearly", description="View the yearly stats of a player")
     @app_commands.autocomplete(username=username_autocompletion)
     @app_commands.describe(username='The player you want to view')
@@ -73,22 +37,21 @@ class Yearly(commands.Cog):
         refined = name.replace("_", "\_")
 
         historic = HistoricalManager(interaction.user.id, uuid)
-        gmt_offset, hour = historic.get_reset_time()
+        gmt_offset, hour = await historical_repo.get_reset_time(uuid)
 
-        historical_data = historic.get_historical(table_name='monthly')
+        historical_data = await historical_repo.get_historical(uuid, 'monthly')
 
         if not historical_data:
             await historic.start_historical()
             await interaction.followup.send(f'Historical stats for {refined} will now be tracked.')
             return
 
-        discord_id = uuid_to_discord_id(uuid=uuid)
+        discord_id = await linking_repo.uuid_to_discord_id(uuid)
         result = await yearly_eligibility(interaction, discord_id)
         if not result:
             return
 
         await interaction.followup.send(self.LOADING_MSG)
-        os.makedirs(f'./database/activerenders/{interaction.id}')
         skin_res = await fetch_skin_model(uuid, 144)
         hypixel_data = await get_hypixel_data(uuid)
 
@@ -108,8 +71,7 @@ class Yearly(commands.Cog):
             "relative_date": relative_date,
             "title": "Yearly BW Stats",
             "hypixel_data": hypixel_data,
-            "skin_res": skin_res,
-            "save_dir": interaction.id
+            "skin_res": skin_res
         }
 
         await send_generic_renders(
@@ -134,7 +96,7 @@ class Yearly(commands.Cog):
 
         historic = HistoricalManager(interaction.user.id, uuid)
         
-        discord_id = uuid_to_discord_id(uuid=uuid)
+        discord_id = await linking_repo.uuid_to_discord_id(uuid)
 
         # Check if user is allowed to use command
         result = await yearly_eligibility(interaction, discord_id)
@@ -144,7 +106,7 @@ class Yearly(commands.Cog):
         # Check if user is within their lookback limitations
         # First checks if a user is checking 1 year back with a basic plan
         # and then checks if the max lookback days are within the given amount of 
-        max_lookback = historic.get_lookback_eligiblility(discord_id, interaction.user.id)
+        max_lookback = await historical_repo.get_lookback_eligibility(discord_id, interaction.user.id)
         if not (max_lookback == 60 and years == 1) and -1 != max_lookback < (years * 365):
             await interaction.followup.send(embed=historic.build_invalid_lookback_embed(max_lookback))
             return
@@ -153,19 +115,19 @@ class Yearly(commands.Cog):
             years = 1
 
         # Get time / date information
-        gmt_offset = historic.get_reset_time()[0]
+        gmt_offset = (await historical_repo.get_reset_time(uuid))[0]
 
         now = datetime.now(timezone(timedelta(hours=gmt_offset)))
         try:
             relative_date = now - relativedelta(years=years)
             formatted_date = relative_date.strftime("Year %Y")
-            table_name = relative_date.strftime("yearly_%Y")
+            period_key = relative_date.strftime("%Y")
         except ValueError:
             await interaction.followup.send('Big, big number... too big number...')
             return
 
         # Check if historical data exists
-        historical_data = historic.get_historical(table_name=table_name)
+        historical_data = await historical_repo.get_snapshot(uuid, 'yearly', period_key)
 
         if not historical_data:
             await interaction.followup.send(f'{refined} has no tracked data for {years} year(s) ago!')
@@ -173,7 +135,6 @@ class Yearly(commands.Cog):
 
         # Render and send
         await interaction.followup.send(self.LOADING_MSG)
-        os.makedirs(f'./database/activerenders/{interaction.id}')
         skin_res = await fetch_skin_model(uuid, 144)
         hypixel_data = await get_hypixel_data(uuid)
 
@@ -183,10 +144,10 @@ class Yearly(commands.Cog):
             "method": "lastyear",
             "relative_date": formatted_date,
             "title": f"{years} Years Ago",
-            "table_name": table_name,
+            "period_type": "yearly",
+            "period_key": period_key,
             "hypixel_data": hypixel_data,
-            "skin_res": skin_res,
-            "save_dir": interaction.id,
+            "skin_res": skin_res
         }
 
         await send_generic_renders(interaction, render_historical, kwargs)
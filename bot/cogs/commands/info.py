@@ -3,16 +3,15 @@ import psutil
 import sys
 import time
 import datetime
-import sqlite3
 from json import load as load_json
 
 import discord
 from discord import app_commands
 from discord.ext import commands
 
+from helper.repositories import linking_repo, usage_repo
 from helper.functions import (
     update_command_stats,
-    get_command_users,
     get_embed_color,
     get_config
 )
@@ -28,20 +27,12 @@ class Info(commands.Cog):
         await interaction.response.defer()
 
         # Usage metrics
-        with sqlite3.connect('./database/command_usage.db') as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                f'SELECT commands_ran FROM overall WHERE discord_id = 0')
-            total_commands_ran = cursor.fetchone()[0]
-
-        with sqlite3.connect('./database/linked_accounts.db') as conn:
-            cursor = conn.cursor()
-            cursor.execute('SELECT COUNT(discord_id) FROM linked_accounts')
-            total_linked_accounts = cursor.fetchone()[0]
+        total_commands_ran = await usage_repo.get_total_commands()
+        total_linked_accounts = await linking_repo.count_linked_accounts()
 
         # Other shit
         total_guilds = len(self.client.guilds)
-        total_members = get_command_users()
+        total_members = await usage_repo.get_command_users()
 
         with open('./database/uptime.json') as datafile:
             start_time = load_json(datafile)['start_time']
@@ -1,10 +1,9 @@
-import sqlite3
-
 import discord
 from discord import app_commands
 from discord.ext import commands
 
 from helper.linking import linking_interaction
+from helper.repositories import linking_repo
 from helper.functions import (
     update_command_stats,
     get_command_cooldown,
@@ -28,15 +27,10 @@ class Linking(commands.Cog):
     async def unlink(self, interaction: discord.Interaction):
         await interaction.response.defer()
 
-        with sqlite3.connect('./database/linked_accounts.db') as conn:
-            cursor = conn.cursor()
-            cursor.execute(f"SELECT * FROM linked_accounts WHERE discord_id = {interaction.user.id}")
-
-            if cursor.fetchone():
-                cursor.execute(f"DELETE FROM linked_accounts WHERE discord_id = {interaction.user.id}")
-                message = 'Successfully unlinked your account!'
-            else:
-                message = "You don't have an account linked! In order to link use `/link`!"
+        if await linking_repo.delete_linked_data(interaction.user.id):
+            message = 'Successfully unlinked your account!'
+        else:
+            message = "You don't have an account linked! In order to link use `/link`!"
 
         await interaction.followup.send(message)
         update_command_stats(interaction.user.id, 'unlink')
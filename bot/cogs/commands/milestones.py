@@ -1,12 +1,10 @@
-import os
-import sqlite3
-
 import discord
 from discord import app_commands
 from discord.ext import commands
 
 from render.milestones import render_milestones
 from helper.linking import fetch_player_info
+from helper.repositories import session_repo
 from helper.functions import (
     username_autocompletion,
     session_autocompletion,
@@ -36,16 +34,13 @@ class Milestones(commands.Cog):
         if session is None:
             session = 100
 
-        with sqlite3.connect('./database/sessions.db') as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM sessions WHERE session=? AND uuid=?", (int(str(session)[0]), uuid))
-            if not cursor.fetchone() and not session in (0, 100):
-                await interaction.response.send_message(
-                    f"`{username}` doesn't have an active session with ID: `{session}`!\nSelect a valid session or specify `0` in order to not use session data!")
-                return
+        session_data = await session_repo.get_session(uuid, int(str(session)[0]))
+        if not session_data and not session in (0, 100):
+            await interaction.response.send_message(
+                f"`{username}` doesn't have an active session with ID: `{session}`!\nSelect a valid session or specify `0` in order to not use session data!")
+            return
 
         await interaction.followup.send(self.LOADING_MSG)
-        os.makedirs(f'./database/activerenders/{interaction.id}')
         session = 1 if session == 100 else session
 
         hypixel_data = await get_hypixel_data(uuid)
@@ -56,8 +51,7 @@ class Milestones(commands.Cog):
             "uuid": uuid,
             "session": session,
             "hypixel_data": hypixel_data,
-            "skin_res": skin_res,
-            "save_dir": interaction.id
+            "skin_res": skin_res
         }
 
         await send_generic_renders(interaction, render_milestones, kwargs)
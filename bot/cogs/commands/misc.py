@@ -1,10 +1,10 @@
-import sqlite3
 from json import load as load_json
 
 import discord
 from discord import app_commands
 from discord.ext import commands
 
+from helper.repositories import usage_repo
 from helper.functions import update_command_stats, get_embed_color, get_config
 
 
@@ -65,23 +65,12 @@ class Misc(commands.Cog):
         with open('./assets/command_map.json', 'r') as datafile:
             command_map: dict = load_json(datafile)['commands']
 
-        with sqlite3.connect('./database/command_usage.db') as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-            tables = [table[0] for table in cursor.fetchall()]
-
-            cursor.execute(f'SELECT * FROM overall WHERE discord_id = {interaction.user.id}')
-            table_data = cursor.fetchone()
-            if not table_data: table_data = (0, 0)
-            overall = f'**Overall - {table_data[1]}**'
-            description = []
-
-            usage_values = {}
-            for table in tables:
-                cursor.execute(f'SELECT * FROM {table} WHERE discord_id = {interaction.user.id}')
-                table_data = cursor.fetchone()
-                if not table_data or table == "overall": continue
-                usage_values[command_map.get(table)] = table_data[1]
+        command_usage = await usage_repo.get_user_usage(interaction.user.id)
+        overall = f"**Overall - {command_usage.pop('overall', 0)}**"
+        description = []
+
+        usage_values = {command_map.get(command): commands_ran
+                        for command, commands_ran in command_usage.items()}
 
         for key, value in sorted(usage_values.items(), key=lambda x: x[1], reverse=True):
             description.append(f'`{key}` - `{value}`')
@@ -1,5 +1,3 @@
-import os
-
 import discord
 from discord import app_commands
 from discord.ext import commands
@@ -44,7 +42,6 @@ class Projection(commands.Cog):
             session = session_data[0]
 
         await interaction.followup.send(self.LOADING_MSG)
-        os.makedirs(f'./database/activerenders/{interaction.id}')
         skin_res = await fetch_skin_model(uuid, 144)
 
         hypixel_data = await get_hypixel_data(uuid)
@@ -63,8 +60,7 @@ class Projection(commands.Cog):
             "session": session,
             "target": prestige,
             "hypixel_data": hypixel_data,
-            "skin_res": skin_res,
-            "save_dir": interaction.id
+            "skin_res": skin_res
         }
 
         await send_generic_renders(interaction, render_projection, kwargs)
@@ -1,5 +1,3 @@
-import os
-
 import discord
 from discord import app_commands
 from discord.ext import commands
@@ -31,14 +29,12 @@ class Resources(commands.Cog):
         name, uuid = await fetch_player_info(username, interaction)
 
         await interaction.followup.send(self.LOADING_MSG)
-        os.makedirs(f'./database/activerenders/{interaction.id}')
         hypixel_data = await get_hypixel_data(uuid)
 
         kwargs = {
             "name": name,
             "uuid": uuid,
-            "hypixel_data": hypixel_data,
-            "save_dir": interaction.id
+            "hypixel_data": hypixel_data
         }
 
         await send_generic_renders(interaction, render_resources, kwargs)
@@ -1,19 +1,17 @@
-import os
-import sqlite3
-
 import discord
 from discord import app_commands
 from discord.ext import commands
 
 from render.session import render_session
-from helper.linking import fetch_player_info, get_linked_data
+from helper.linking import fetch_player_info
+from helper.repositories import linking_repo, session_repo
+from helper.entitlements import entitlement_resolver
 from helper.functions import (
     username_autocompletion,
     session_autocompletion,
     get_command_cooldown,
     get_hypixel_data,
     update_command_stats,
-    get_subscription,
     start_session,
     get_smart_session,
     fetch_skin_model,
@@ -42,17 +40,12 @@ class ManageSession(discord.ui.View):
         button.disabled = True
         await self.message.edit(view=self)
 
-        with sqlite3.connect('./database/sessions.db') as conn:
-            cursor = conn.cursor()
-
-            if self.method == "delete":
-                cursor.execute("DELETE FROM sessions WHERE session = ? AND uuid = ?", (self.session, self.uuid))
-                message = f'Session `{self.session}` has been deleted successfully!'
-            else:
-                cursor.execute("DELETE FROM sessions WHERE session = ? AND uuid = ?", (self.session, self.uuid))
+        await session_repo.delete_session(self.uuid, self.session)
 
-        if self.method != "delete":
-            start_session(self.uuid, self.session)
+        if self.method == "delete":
+            message = f'Session `{self.session}` has been deleted successfully!'
+        else:
+            await start_session(self.uuid, self.session)
             message = f'Session `{self.session}` has been reset successfully!'
         await interaction.followup.send(message, ephemeral=True)
 
@@ -85,7 +78,6 @@ class Sessions(commands.Cog):
             session = session_data[0]
 
         await interaction.followup.send(self.LOADING_MSG)
-        os.makedirs(f'./database/activerenders/{interaction.id}')
         hypixel_data = await get_hypixel_data(uuid)
         skin_res = await fetch_skin_model(uuid, 144)
 
@@ -94,8 +86,7 @@ class Sessions(commands.Cog):
             "uuid": uuid,
             "session": session,
             "hypixel_data": hypixel_data,
-            "skin_res": skin_res,
-            "save_dir": interaction.id
+            "skin_res": skin_res
         }
 
         await send_generic_renders(interaction, render_session, kwargs)
@@ -105,27 +96,23 @@ class Sessions(commands.Cog):
     @session_group.command(name="start", description="Starts a new session")
     async def start_session(self, interaction: discord.Interaction):
         await interaction.response.defer()
-        linked_data = get_linked_data(interaction.user.id)
+        linked_data = await linking_repo.get_linked_data(interaction.user.id)
 
         if linked_data:
             uuid = linked_data[1]
 
-            with sqlite3.connect('./database/sessions.db') as conn:
-                cursor = conn.cursor()
-                cursor.execute(f"SELECT * FROM sessions WHERE uuid='{uuid}' ORDER BY session ASC")
-                sessions = cursor.fetchall()
-
-            subscription = get_subscription(interaction.user.id)
+            sessions = await session_repo.get_session_ids(uuid)
+            entitlements = await entitlement_resolver.fetch(interaction.user.id)
 
-            if len(sessions) < 2 or subscription and len(sessions) < 5:
+            if len(sessions) < 2 or entitlements.is_premium and len(sessions) < 5:
                 for i, session in enumerate(sessions):
-                    if session[0] != i + 1:
+                    if session != i + 1:
                         sessionid = i + 1
-                        start_session(uuid, session=sessionid)
+                        await start_session(uuid, session=sessionid)
                         break
                 else:
                     sessionid = len(sessions) + 1
-                    start_session(uuid, session=sessionid)
+                    await start_session(uuid, session=sessionid)
                 await interaction.followup.send(
                     f'A new session was successfully created! Session ID: `{sessionid}`')
             else:
@@ -146,15 +133,12 @@ class Sessions(commands.Cog):
         if session is None:
             session = 1
 
-        linked_data = get_linked_data(interaction.user.id)
+        linked_data = await linking_repo.get_linked_data(interaction.user.id)
 
         if linked_data:
             uuid = linked_data[1]
 
-            with sqlite3.connect('./database/sessions.db') as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT * FROM sessions WHERE session=? AND uuid=?", (session, uuid))
-                session_data = cursor.fetchone()
+            session_data = await session_repo.get_session(uuid, session)
 
             if session_data:
                 view = ManageSession(session, uuid, method="delete")
@@ -176,7 +160,7 @@ class Sessions(commands.Cog):
     @app_commands.autocomplete(session=session_autocompletion)
     @app_commands.describe(session='The session you want to reset')
     async def reset_session(self, interaction: discord.Interaction, session: int = None):
-        linked_data = get_linked_data(interaction.user.id)
+        linked_data = await linking_repo.get_linked_data(interaction.user.id)
 
         if linked_data:
             uuid = linked_data[1]
@@ -184,10 +168,7 @@ class Sessions(commands.Cog):
             if session is None:
                 session = 1
 
-            with sqlite3.connect('./database/sessions.db') as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT * FROM sessions WHERE session=? AND uuid=?", (session, uuid))
-                session_data = cursor.fetchone()
+            session_data = await session_repo.get_session(uuid, session)
 
             if session_data:
                 view = ManageSession(session, uuid, method="reset")
@@ -208,16 +189,13 @@ class Sessions(commands.Cog):
     @session_group.command(name="active", description="View all active sessions")
     async def active_sessions(self, interaction: discord.Interaction):
         await interaction.response.defer()
-        linked_data = get_linked_data(interaction.user.id)
+        linked_data = await linking_repo.get_linked_data(interaction.user.id)
 
         if linked_data:
             uuid = linked_data[1]
 
-            with sqlite3.connect('./database/sessions.db') as conn:
-                cursor = conn.cursor()
-                cursor.execute(f"SELECT * FROM sessions WHERE uuid='{uuid}'")
-                sessions = cursor.fetchall()
-            session_list = [str(session[0]) for session in sessions]
+            sessions = await session_repo.get_session_ids(uuid)
+            session_list = [str(session) for session in sessions]
 
             if session_list:
                 session_string = ", ".join(session_list)
@@ -1,5 +1,3 @@
-import os
-
 import discord
 from discord import app_commands
 from discord.ext import commands
@@ -28,7 +26,6 @@ class Total(commands.Cog):
         name, uuid = await fetch_player_info(username, interaction)
 
         await interaction.followup.send(self.LOADING_MSG)
-        os.makedirs(f'./database/activerenders/{interaction.id}')
         skin_res = await fetch_skin_model(uuid, 144)
         hypixel_data = await get_hypixel_data(uuid)
 
@@ -37,7 +34,6 @@ class Total(commands.Cog):
             "uuid": uuid,
             "hypixel_data": hypixel_data,
             "skin_res": skin_res,
-            "save_dir": interaction.id,
             "method": method
         }
 
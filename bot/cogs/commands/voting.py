@@ -5,9 +5,9 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 
+from helper.repositories import voting_repo
 from helper.functions import (
     update_command_stats,
-    get_voting_data,
     get_embed_color,
     get_config
 )
@@ -47,7 +47,7 @@ class Voting(commands.Cog):
             inline=False
         )
 
-        voting_data = get_voting_data(interaction.user.id)
+        voting_data = await voting_repo.get_voting_data(interaction.user.id)
         if voting_data:
             total_votes = voting_data[1]
             last_vote = voting_data[3]
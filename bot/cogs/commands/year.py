@@ -1,11 +1,11 @@
-import os
-
 import discord
 from discord import app_commands
 from discord.ext import commands
 
 from render.year import render_year
-from helper.linking import fetch_player_info, uuid_to_discord_id
+from helper.linking import fetch_player_info
+from helper.repositories import linking_repo
+from helper.entitlements import entitlement_resolver
 from helper.functions import (
     username_autocompletion,
     session_autocompletion,
@@ -13,7 +13,6 @@ from helper.functions import (
     get_hypixel_data,
     update_command_stats,
     get_smart_session,
-    get_subscription,
     fetch_skin_model,
     send_generic_renders,
     get_embed_color,
@@ -41,7 +40,6 @@ class Year(commands.Cog):
             session = session_data[0]
 
         await interaction.followup.send(self.LOADING_MSG)
-        os.makedirs(f'./database/activerenders/{interaction.id}')
         skin_res = await fetch_skin_model(uuid, 144)
 
         hypixel_data = await get_hypixel_data(uuid)
@@ -52,8 +50,7 @@ class Year(commands.Cog):
             "session": session,
             "year": year,
             "hypixel_data": hypixel_data,
-            "skin_res": skin_res,
-            "save_dir": interaction.id
+            "skin_res": skin_res
         }
 
         await send_generic_renders(interaction, render_year, kwargs)
@@ -84,12 +81,12 @@ class Year(commands.Cog):
         await interaction.response.defer()
         name, uuid = await fetch_player_info(username, interaction)
 
-        discord_id = uuid_to_discord_id(uuid)
-        subscription = None
+        discord_id = await linking_repo.uuid_to_discord_id(uuid)
+        is_premium = False
         if discord_id:
-            subscription = get_subscription(discord_id=discord_id)
+            is_premium = (await entitlement_resolver.fetch(discord_id)).is_premium
 
-        if not subscription and not get_subscription(interaction.user.id):
+        if not is_premium and not (await entitlement_resolver.fetch(interaction.user.id)).is_premium:
             embed_color = get_embed_color('primary')
             embed = discord.Embed(
                 title="That player doesn't have premium!",
@@ -6,7 +6,8 @@ from datetime import datetime
 import discord
 from discord.ext import commands, tasks
 
-from helper.functions import get_command_users, to_thread
+from helper.functions import to_thread
+from helper.repositories import usage_repo
 
 
 class Counts(commands.Cog):
@@ -19,9 +20,8 @@ class Counts(commands.Cog):
 
 
     @to_thread
-    def update_counts(self):
+    def update_counts(self, total_users: int):
         guild_count = len(self.client.guilds)
-        total_users = get_command_users()
 
         requests.post(
             url='https://top.gg/api/bots/903765373181112360/stats',
@@ -57,7 +57,9 @@ class Counts(commands.Cog):
 
     @tasks.loop(hours=1)
     async def update_counts_loop(self):
-        await self.update_counts()
+        # Unflushed command counts are written first so new users are counted
+        total_users = await usage_repo.get_command_users()
+        await self.update_counts(total_users)
 
 
     def cog_load(self):
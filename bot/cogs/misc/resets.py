@@ -0,0 +1,42 @@
+import asyncio
+from datetime import datetime
+
+import discord
+from discord.ext import commands, tasks
+
+from helper.historical import reset_historical
+from helper.functions import log_error_msg
+
+
+class Resets(commands.Cog):
+    def __init__(self, client):
+        self.client: discord.Client = client
+
+
+    @tasks.loop(hours=1)
+    async def reset_historical_loop(self):
+        await reset_historical()
+
+
+    def cog_load(self):
+        self.reset_historical_loop.start()
+
+
+    def cog_unload(self):
+        self.reset_historical_loop.cancel()
+
+
+    @reset_historical_loop.before_loop
+    async def before_reset_historical(self):
+        now = datetime.now()
+        sleep_seconds = (60 - now.minute) * 60 - now.second
+        await asyncio.sleep(sleep_seconds)
+
+
+    @reset_historical_loop.error
+    async def on_reset_historical_error(self, error):
+        await log_error_msg(self.client, error)
+
+
+async def setup(client: commands.Bot) -> None:
+    await client.add_cog(Resets(client))
@@ -0,0 +1,74 @@
+"""
+Process wide cache of the fonts and images used by the render layer
+"""
+
+import os
+
+from PIL import Image, ImageFont
+
+
+# Font sizes used throughout the render layer, loaded by `preload_assets`
+PRELOAD_FONTS = {
+    'minecraft.ttf': (13, 16, 17, 18, 20, 22, 32, 36),
+    'arial.ttf': (24,)
+}
+
+_fonts: dict[tuple[str, int], ImageFont.FreeTypeFont] = {}
+_images: dict[str, Image.Image] = {}
+
+
+def get_font(size: int, name: str='minecraft.ttf') -> ImageFont.FreeTypeFont:
+    """
+    Returns a font from the cache, loading it if it hasn't been used yet
+    :param size: the size of the font
+    :param name: the file name of the font inside of the assets directory
+    """
+    font = _fonts.get((name, size))
+    if font is None:
+        font = _fonts[(name, size)] = ImageFont.truetype(f'./assets/{name}', size)
+    return font
+
+
+def get_image(path: str) -> Image.Image:
+    """
+    Returns an RGBA converted image from the cache, loading it if needed.
+    The returned image is shared by every caller, so it must be copied
+    (`image.copy()` or `image.convert(...)`) before it is drawn on
+    :param path: the path of the image file
+    """
+    key = os.path.normpath(path)
+    image = _images.get(key)
+    if image is None:
+        with Image.open(key) as image_file:
+            image = _images[key] = image_file.convert('RGBA')
+    return image
+
+
+def preload_assets(directory: str='./assets') -> None:
+    """
+    Loads every image inside of a directory and the common font sizes
+    :param directory: the directory to recursively load images from
+    """
+    for name, sizes in PRELOAD_FONTS.items():
+        for size in sizes:
+            get_font(size, name)
+
+    for root, _, files in os.walk(directory):
+        # Custom backgrounds are uploaded by users and aren't cached
+        if os.path.basename(root) == 'custom':
+            continue
+
+        for file in files:
+            if file.endswith('.png'):
+                get_image(os.path.join(root, file))
+
+
+def get_cache_stats() -> dict:
+    """Returns the amount of assets cached and the bytes they hold"""
+    image_bytes = sum(
+        image.width * image.height * len(image.getbands()) for image in _images.values())
+    return {
+        'fonts': len(_fonts),
+        'images': len(_images),
+        'image_bytes': image_bytes
+    }
@@ -0,0 +1,228 @@
+"""
+Pooled long lived connections to the SQLite databases
+"""
+
+import os
+import sys
+import time
+import sqlite3
+import asyncio
+import threading
+import traceback
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable
+
+from .metrics import register_stats
+from .tracing import tracer
+
+
+# Applied to every connection when it's opened. WAL lets the render
+# workers read while the bot writes, and with WAL a `NORMAL` sync
+# only risks the latest transactions on power loss, not corruption.
+PRAGMAS = (
+    'PRAGMA journal_mode = WAL',
+    'PRAGMA synchronous = NORMAL',
+    'PRAGMA cache_size = -16384',
+    'PRAGMA mmap_size = 268435456',
+    'PRAGMA temp_store = MEMORY',
+    'PRAGMA busy_timeout = 5000'
+)
+
+
+class CallSiteStats:
+    def __init__(self):
+        """Query counts and time spent with a connection for a single call site"""
+        self.uses = 0
+        self.queries = 0
+        self.held = 0.0
+
+
+class ConnectionPool:
+    def __init__(self, path: str, max_idle: int=8):
+        """
+        Keeps connections to a database file open between uses
+        :param path: the path of the database file
+        :param max_idle: the maximum amount of unused connections kept open
+        """
+        self.path = path
+        self.max_idle = max_idle
+
+        self._idle: list[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self.opened = 0
+
+
+    def _open(self) -> sqlite3.Connection:
+        # Connections are handed between the event loop and the db threads
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        self.opened += 1
+        return conn
+
+
+    def acquire(self) -> sqlite3.Connection:
+        """Returns an unused connection, opening one if there are none"""
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return self._open()
+
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        """
+        Returns a connection to the pool once it's no longer used
+        :param conn: the connection returned by `acquire`
+        """
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+
+    def close(self) -> None:
+        """Closes every unused connection"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+_pools: dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+_call_sites: defaultdict[str, CallSiteStats] = defaultdict(CallSiteStats)
+
+
+def get_pool(path: str) -> ConnectionPool:
+    """
+    Returns the connection pool of a database file, creating it if needed
+    :param path: the path of the database file
+    """
+    path = os.path.abspath(path)
+    pool = _pools.get(path)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.setdefault(path, ConnectionPool(path))
+    return pool
+
+
+class PooledConnection:
+    def __init__(self, pool: ConnectionPool, call_site: str):
+        """
+        Borrows a connection from a pool for the duration of a `with` block.
+        Like `sqlite3.connect`, the transaction is committed when the block
+        exits and rolled back if it raised, the connection is then returned
+        :param pool: the pool of the database file
+        :param call_site: the function using the connection
+        """
+        self.pool = pool
+        self.stats = _call_sites[call_site]
+        self._conn: sqlite3.Connection | None = None
+
+
+    def _trace(self, statement: str) -> None:
+        if not statement.startswith(('BEGIN', 'COMMIT', 'ROLLBACK')):
+            self.stats.queries += 1
+
+
+    def __enter__(self) -> sqlite3.Connection:
+        self._start = time.perf_counter()
+        self._conn = self.pool.acquire()
+        self._conn.set_trace_callback(self._trace)
+        return self._conn
+
+
+    def __exit__(self, exc_type, exc_value, exc_traceback) -> None:
+        conn, self._conn = self._conn, None
+        try:
+            if exc_type is None:
+                conn.commit()
+            else:
+                conn.rollback()
+        finally:
+            conn.set_trace_callback(None)
+            self.pool.release(conn)
+
+            self.stats.uses += 1
+            self.stats.held += time.perf_counter() - self._start
+
+
+def connect_db(path: str, call_site: str=None) -> PooledConnection:
+    """
+    Returns a pooled connection to a database file to use as a context manager
+    in place of `sqlite3.connect`, usage is recorded under the calling function
+    :param path: the path of the database file
+    :param call_site: the name to record usage under (defaults to the calling function)
+    """
+    if call_site is None:
+        caller = sys._getframe(1)
+        call_site = f"{caller.f_globals.get('__name__')}.{caller.f_code.co_name}"
+    return PooledConnection(get_pool(path), call_site)
+
+
+# Blocking database work is run on a few dedicated threads so
+# it never holds up the event loop or the default executor
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='database')
+
+
+async def run_db(func: Callable, *args):
+    """
+    Runs a blocking function that uses the database off of the event loop
+    :param func: the function to run
+    :param *args: the arguments to call the function with
+    """
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+    try:
+        return await loop.run_in_executor(_executor, func, *args)
+    finally:
+        tracer.record('sqlite', time.perf_counter() - start)
+
+
+def _log_failure(future: Future) -> None:
+    if not future.cancelled() and future.exception() is not None:
+        error = future.exception()
+        traceback.print_exception(type(error), error, error.__traceback__)
+
+
+def submit_db(func: Callable, *args) -> Future:
+    """
+    Schedules blocking database work without waiting for it to finish,
+    failures are printed since nothing will retrieve them
+    :param func: the function to run
+    :param *args: the arguments to call the function with
+    """
+    future = _executor.submit(func, *args)
+    future.add_done_callback(_log_failure)
+    return future
+
+
+def close_all() -> None:
+    """Waits for scheduled database work and closes every unused connection"""
+    _executor.shutdown(wait=True)
+    for pool in list(_pools.values()):
+        pool.close()
+
+
+def get_db_stats() -> dict:
+    """Returns the open connections of each pool and the usage of each call site"""
+    return {
+        'pools': {
+            os.path.basename(path): {'opened': pool.opened, 'idle': len(pool._idle)}
+            for path, pool in _pools.items()
+        },
+        'call_sites': {
+            call_site: {
+                'uses': stats.uses,
+                'queries': stats.queries,
+                'held_ms': round(stats.held * 1000, 2)
+            } for call_site, stats in sorted(
+                _call_sites.items(), key=lambda item: item[1].held, reverse=True)
+        }
+    }
+
+
+register_stats('database', get_db_stats)
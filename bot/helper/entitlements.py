@@ -0,0 +1,184 @@
+"""
+Cached view of what a discord user is entitled to (premium, votes and themes)
+"""
+
+import os
+import time
+import threading
+import multiprocessing
+
+from .database import connect_db, run_db
+from .memorycache import MemoryCache
+from .metrics import register_stats
+
+
+DATABASE_PATH = os.path.abspath(f'{__file__}/../../database')
+
+
+class Entitlements:
+    def __init__(self, discord_id: int, subscription: tuple | None,
+                 last_vote: float | None, owned_themes: list, active_theme: str | None):
+        """
+        Everything a discord user is entitled to, resolved in one go
+        :param discord_id: the discord id of the user
+        :param subscription: the user's row of the subscriptions table
+        :param last_vote: the timestamp of the user's most recent vote
+        :param owned_themes: the exclusive themes owned by the user
+        :param active_theme: the theme pack the user has enabled
+        """
+        self.discord_id = discord_id
+        self.subscription = subscription
+        self.last_vote = last_vote
+        self.owned_themes = owned_themes
+        self.active_theme = active_theme
+
+
+    @property
+    def tier(self) -> str:
+        """The package of the user's subscription or an empty string"""
+        return self.subscription[1] if self.subscription else ''
+
+
+    @property
+    def is_premium(self) -> bool:
+        return self.subscription is not None
+
+
+    @property
+    def voted_recently(self) -> bool:
+        """Whether the user has voted in the past 24 hours"""
+        # Worked out on access so a cached entry doesn't go stale when the vote expires
+        return bool(self.last_vote) and (time.time() - self.last_vote) / 3600 < 24
+
+
+    @property
+    def cooldown(self) -> float:
+        """The seconds between the user's commands"""
+        if self.is_premium:
+            return 0.0
+        if self.voted_recently:
+            return 1.75
+        return 3.5
+
+
+    @property
+    def lookback_days(self) -> int:
+        """The amount of days back the user can view historical stats, -1 being unlimited"""
+        if 'basic' in self.tier:
+            return 60
+        if 'pro' in self.tier:
+            return -1
+        return 30
+
+
+class EntitlementResolver:
+    def __init__(self, ttl: float, max_entries: int):
+        """
+        Resolves and caches the entitlements of discord users.
+        Writes made by the bot invalidate the cached entry, changes made
+        elsewhere (new subscriptions and votes) are picked up once it expires.
+        Render workers have their own cache, they drop it whenever the
+        shared generation is bumped by an invalidation in the bot process
+        :param ttl: the amount of seconds an entry is kept for
+        :param max_entries: the maximum amount of users cached
+        """
+        # Every entry is counted as one byte, capping the cache by entries
+        self.cache = MemoryCache(max_bytes=max_entries, ttl=ttl)
+        self.invalidations = 0
+
+        self.generation = multiprocessing.get_context('spawn').Value('Q', 0)
+        self._seen_generation = 0
+        self._lock = threading.Lock()
+
+
+    def share_generation(self, generation) -> None:
+        """
+        Uses the invalidation generation of the bot process, called in render workers
+        :param generation: the `generation` value of the bot process' resolver
+        """
+        self.generation = generation
+        self._seen_generation = generation.value
+
+
+    def _resolve(self, discord_id: int) -> Entitlements:
+        with connect_db(f'{DATABASE_PATH}/subscriptions.db') as conn:
+            subscription = conn.execute(
+                'SELECT * FROM subscriptions WHERE discord_id = ?', (discord_id,)).fetchone()
+
+        with connect_db(f'{DATABASE_PATH}/voting.db') as conn:
+            voting_data = conn.execute(
+                'SELECT * FROM voting_data WHERE discord_id = ?', (discord_id,)).fetchone()
+            rewards_data = conn.execute(
+                'SELECT enabled_theme FROM rewards_data WHERE discord_id = ?', (discord_id,)).fetchone()
+            owned_themes = conn.execute(
+                'SELECT owned_themes FROM owned_themes WHERE discord_id = ?', (discord_id,)).fetchone()
+
+        return Entitlements(
+            discord_id=discord_id,
+            subscription=subscription,
+            last_vote=voting_data[3] if voting_data else None,
+            owned_themes=owned_themes[0].split(',') if owned_themes else [],
+            active_theme=rewards_data[0] if rewards_data else None
+        )
+
+
+    def _check_generation(self) -> None:
+        generation = self.generation.value
+        if generation != self._seen_generation:
+            with self._lock:
+                self.cache.clear()
+                self._seen_generation = generation
+
+
+    def _get_cached(self, discord_id: int) -> Entitlements | None:
+        self._check_generation()
+        with self._lock:
+            return self.cache.get(discord_id)
+
+
+    def get(self, discord_id: int) -> Entitlements:
+        """
+        Returns the entitlements of a user, querying them if they aren't cached.
+        Blocks on a cache miss, use `fetch` from the event loop
+        :param discord_id: the discord id of the user
+        """
+        entitlements = self._get_cached(discord_id)
+        if entitlements is None:
+            entitlements = self._resolve(discord_id)
+            with self._lock:
+                self.cache.set(discord_id, entitlements, size=1)
+        return entitlements
+
+
+    async def fetch(self, discord_id: int) -> Entitlements:
+        """
+        Returns the entitlements of a user, cache misses are queried on the database threads
+        :param discord_id: the discord id of the user
+        """
+        entitlements = self._get_cached(discord_id)
+        if entitlements is None:
+            entitlements = await run_db(self.get, discord_id)
+        return entitlements
+
+
+    def invalidate(self, discord_id: int) -> None:
+        """
+        Drops the cached entitlements of a user after they were changed
+        :param discord_id: the discord id of the user
+        """
+        with self._lock:
+            self.cache.delete(discord_id)
+            self.invalidations += 1
+
+        with self.generation.get_lock():
+            self.generation.value += 1
+            self._seen_generation = self.generation.value
+
+
+    def get_stats(self) -> dict:
+        """Returns the usage of the cache and the amount of invalidations"""
+        return {**self.cache.get_stats(), 'invalidations': self.invalidations}
+
+
+entitlement_resolver = EntitlementResolver(ttl=60, max_entries=50000)
+register_stats('entitlements', entitlement_resolver.get_stats)
@@ -1,11 +1,10 @@
 """A set of useful functions used throughout the bot"""
 
 import os
+import time
 import random
 import json
-import time
 import typing
-import sqlite3
 import discord
 import requests
 import traceback
@@ -14,16 +13,25 @@ import functools
 from datetime import datetime
 
 from discord import app_commands
-from mcuuid import MCUUID
 from requests_cache import CachedSession
 
+from .database import connect_db
+from .repositories import linking_repo, session_repo, usage_repo
+from .entitlements import entitlement_resolver
 from .ui import ModesView
+from .renderexecutor import RenderExecutor, LazyRenders
+from .renderstore import RenderStore
+from .metrics import register_stats
+from .assetcache import get_cache_stats
+from .hypixel import HypixelClient, ResponseCache, TieredCache
+from .memorycache import MemoryCache
+from .singleflight import SingleFlight
+from .mojang import mojang_resolver
+from .tracing import tracer
 
 
 REL_PATH = os.path.abspath(f'{__file__}/../..')
 
-historic_cache = CachedSession(cache_name='cache/historic_cache', expire_after=300, ignored_parameters=['key'])
-stats_session = CachedSession(cache_name='cache/stats_cache', expire_after=300, ignored_parameters=['key'])
 skin_session = CachedSession(cache_name='cache/skin_cache', expire_after=900, ignored_parameters=['key'])
 
 
@@ -43,6 +51,52 @@ def get_config() -> dict:
     return config_data
 
 
+render_executor = RenderExecutor(
+    max_workers=get_config().get('render_workers'),
+    preload_assets=get_config().get('preload_assets', False)
+)
+
+# Rendered images are kept for as long as the `ModesView` they belong to
+render_store = RenderStore(
+    max_bytes=get_config()['render_store']['max_bytes'],
+    ttl=300,
+    filesystem_fallback=get_config()['render_store']['filesystem_fallback'],
+    fallback_dir=f'{REL_PATH}/database/activerenders'
+)
+register_stats('render_store', render_store.get_stats)
+register_stats('assets', get_cache_stats)
+
+hypixel_client = HypixelClient(
+    keys_path=f'{REL_PATH}/database/apikeys.json',
+    max_concurrency=get_config()['hypixel']['max_concurrency'],
+    timeout=get_config()['hypixel']['timeout']
+)
+register_stats('hypixel', hypixel_client.get_stats)
+register_stats('hypixel_keys', hypixel_client.key_pool.get_stats)
+
+# Concurrent fetches of the same player share a single upstream request
+hypixel_flight = SingleFlight()
+skin_flight = SingleFlight()
+register_stats('hypixel_flight', hypixel_flight.get_stats)
+register_stats('skin_flight', skin_flight.get_stats)
+
+# Decoded responses are kept in memory (L1) in front of the SQLite caches (L2)
+historic_cache = TieredCache(
+    MemoryCache(max_bytes=get_config()['memory_cache']['historic_bytes'], ttl=300),
+    ResponseCache(f'{REL_PATH}/cache/hypixel_historic.db', expire_after=300)
+)
+stats_cache = TieredCache(
+    MemoryCache(max_bytes=get_config()['memory_cache']['stats_bytes'], ttl=300),
+    ResponseCache(f'{REL_PATH}/cache/hypixel_stats.db', expire_after=300)
+)
+skin_cache = MemoryCache(max_bytes=get_config()['memory_cache']['skin_bytes'], ttl=900)
+skin_l2_stats = {'hits': 0, 'misses': 0}
+
+register_stats('historic_cache', historic_cache.get_stats)
+register_stats('stats_cache', stats_cache.get_stats)
+register_stats('skin_cache', lambda: {'l1': skin_cache.get_stats(), 'l2': skin_l2_stats})
+
+
 def get_embed_color(embed_type: str) -> int:
     """
     Returns a base 16 integer from a hex code.
@@ -64,10 +118,10 @@ def get_voting_data(discord_id: int) -> tuple:
     Returns a users voting data
     :param discord_id: The discord id of the user's voting data to be fetched
     """
-    with sqlite3.connect(f'{REL_PATH}/database/voting.db') as conn:
+    with connect_db(f'{REL_PATH}/database/voting.db') as conn:
         cursor = conn.cursor()
 
-        cursor.execute(f'SELECT * FROM voting_data WHERE discord_id = {discord_id}')
+        cursor.execute('SELECT * FROM voting_data WHERE discord_id = ?', (discord_id,))
         return cursor.fetchone()
 
 
@@ -76,18 +130,8 @@ async def username_autocompletion(interaction: discord.Interaction, current: str
     Interaction username autocomplete
     Paramaters will be handled automatically by discord.py
     """
-    data: list = []
-
-    with sqlite3.connect(f'{REL_PATH}/database/autofill.db') as conn:
-        cursor = conn.cursor()
-        result = cursor.execute("SELECT * FROM autofill WHERE LOWER(username) LIKE LOWER(?)", (fr'%{current.lower()}%',))
-
-    for row in result:
-        if len(data) < 25:
-            data.append(app_commands.Choice(name=row[2], value=row[2]))
-        else:
-            break
-    return data
+    usernames = await linking_repo.search_autofill(current, limit=25)
+    return [app_commands.Choice(name=username, value=username) for username in usernames]
 
 
 async def session_autocompletion(interaction: discord.Interaction, current: str) -> typing.List[app_commands.Choice[str]]:
@@ -95,26 +139,22 @@ async def session_autocompletion(interaction: discord.Interaction, current: str)
     Interaction session autocomplete
     Paramaters will be handled automatically by discord.py
     """
+    # Runs on every keystroke, so players are only resolved through
+    # the local caches to stay well within discord's deadline
     username_option = next((opt for opt in interaction.data['options'] if opt['name'] == 'username'), None)
     if username_option:
-        username = username_option.get('value')
-        uuid: str = MCUUID(name=username).uuid
+        profile = await mojang_resolver.get_cached_profile(username_option.get('value'))
+        if not profile:
+            return []
+        uuid = profile[0]
     else:
-        with sqlite3.connect(f'{REL_PATH}/database/linked_accounts.db') as conn:
-            cursor = conn.cursor()
-            cursor.execute(f"SELECT * FROM linked_accounts WHERE discord_id = {interaction.user.id}")
-            linked_data: tuple = cursor.fetchone()
+        linked_data: tuple = await linking_repo.get_linked_data(interaction.user.id)
         if not linked_data:
             return []
         uuid: str = linked_data[1]
-    with sqlite3.connect(f'{REL_PATH}/database/sessions.db') as conn:
-        cursor = conn.cursor()
-        cursor.execute(f"SELECT * FROM sessions WHERE uuid='{uuid}'")
-        session_data = cursor.fetchall()
-    data = []
-    for session in session_data:
-        data.append(app_commands.Choice(name=session[0], value=session[0]))
-    return data
+
+    session_ids = session_repo.get_cached_session_ids(uuid) or []
+    return [app_commands.Choice(name=session, value=session) for session in session_ids]
 
 
 def get_command_cooldown(interaction: discord.Interaction) -> typing.Optional[app_commands.Cooldown]:
@@ -126,99 +166,49 @@ def get_command_cooldown(interaction: discord.Interaction) -> typing.Optional[ap
 
     Paramaters will be handled automatically by discord.py
     """
-    with sqlite3.connect(f'{REL_PATH}/database/subscriptions.db') as conn:
-        cursor = conn.cursor()
-        cursor.execute(f"SELECT * FROM subscriptions WHERE discord_id = {interaction.user.id}")
-        subscription = cursor.fetchone()
-    if subscription:
-        return app_commands.Cooldown(1, 0.0)
-        
-    # If user has voted in past 24 hours
-    voting_data = get_voting_data(interaction.user.id)
-    current_time = time.time()
-    if voting_data and ((current_time - voting_data[3]) / 3600 < 24):
-        return app_commands.Cooldown(1, 1.75)
-
-    return app_commands.Cooldown(1, 3.5)
+    entitlements = entitlement_resolver.get(interaction.user.id)
+    return app_commands.Cooldown(1, entitlements.cooldown)
 
 
-@to_thread
-def get_hypixel_data(uuid: str, cache: bool=True, cache_obj: CachedSession=None) -> dict:
+@tracer.trace('hypixel')
+async def get_hypixel_data(uuid: str, cache: bool=True, cache_obj: TieredCache=None) -> dict:
     """
-    Fetch a users hypixel data from hypixel's api
+    Fetch a users hypixel data from hypixel's api.
+    Cached data is shared between callers and must not be mutated
     :param uuid: The uuid of the user's data to fetch
     :param cache: Whether to use caching or not
     :param cache_obj: Use a custom cache instead of the default stats cache
     """
-    with open(f'{REL_PATH}/database/apikeys.json', 'r') as keyfile:
-        all_keys: dict = json.load(keyfile)['hypixel']
-    key: str = all_keys[random.choice(list(all_keys.keys()))]
+    cache_obj = cache_obj or stats_cache
 
-    url = f"https://api.hypixel.net/player?key={key}&uuid={uuid}"
     if cache:
-        if not cache_obj:
-            data: dict = stats_session.get(url, timeout=10).json()
-        else:
-            data: dict = cache_obj.get(url, timeout=10).json()
-    else:
-        data: dict = requests.get(url, timeout=10).json()
-    return data
-
+        data = await cache_obj.get(uuid)
+        if data is not None:
+            return data
 
-def get_subscription(discord_id: int) -> tuple:
-    """
-    Returns a users subscription data from subscription database
-    :param discord_id: The discord id of user's subscription data to be retrieved
-    """
-    with sqlite3.connect(f'{REL_PATH}/database/subscriptions.db') as conn:
-        cursor = conn.cursor()
-        cursor.execute(f"SELECT * FROM subscriptions WHERE discord_id = {discord_id}")
-        return cursor.fetchone()
+    data: dict = await hypixel_flight.do(uuid, hypixel_client.get_player, uuid)
+    if cache and data.get('success'):
+        await cache_obj.set(uuid, data)
+    return data
 
 
 def update_command_stats(discord_id: int, command: str) -> None:
     """
     Updates command usage stats for passed command.
-    If command doesn't exist in database, a new table will be created.
+    The count is kept in memory and saved with the next batched flush
     :param discord_id: The user that ran he command
+    :param command: The name of the command that was ran
     """
-    with sqlite3.connect(f'{REL_PATH}/database/command_usage.db') as conn:
-        cursor = conn.cursor()
-
-        cursor.execute(f"SELECT * FROM overall WHERE discord_id = {discord_id}")
-        if not cursor.fetchone():
-            cursor.execute('INSERT INTO overall (discord_id, commands_ran) VALUES (?, ?)', (discord_id, 1))
-        else:
-            cursor.execute(f'UPDATE overall SET commands_ran = commands_ran + 1 WHERE discord_id = {discord_id}')
-
-        try:
-            cursor.execute(f"SELECT * FROM {command} WHERE discord_id = {discord_id}")
-            current_commands_ran: tuple = cursor.fetchone()
-        except sqlite3.OperationalError:
-            cursor.execute(f"CREATE TABLE {command}( discord_id INTEGER PRIMARY KEY, commands_ran INTEGER )")
-            cursor.execute(f'INSERT INTO {command} (discord_id, commands_ran) VALUES (?, ?)', (0, 0))
-            current_commands_ran = None
-
-        if not current_commands_ran:
-            cursor.execute(f'INSERT INTO {command} (discord_id, commands_ran) VALUES (?, ?)', (discord_id, 1))
-        else:
-            cursor.execute(f'UPDATE {command} SET commands_ran = commands_ran + 1 WHERE discord_id = {discord_id}')
-
-        cursor.execute(f'UPDATE overall SET commands_ran = commands_ran + 1 WHERE discord_id = 0')
-        cursor.execute(f'UPDATE {command} SET commands_ran = commands_ran + 1 WHERE discord_id = 0')
+    usage_repo.queue_command_stats(discord_id, command)
 
 
-def start_session(uuid: str, session: int) -> bool:
+async def start_session(uuid: str, session: int) -> bool:
     """
     Initiate a bedwars stats session
     :param uuid: The uuid of the player to initiate a session for
     :param session: The id of the session being initiated
     """
-    with open(f'{REL_PATH}/database/apikeys.json', 'r') as keyfile:
-        all_keys: dict = json.load(keyfile)['hypixel']
-    key: str = all_keys[random.choice(list(all_keys))]
-
-    data: dict = requests.get(f"https://api.hypixel.net/player?key={key}&uuid={uuid}", timeout=10).json()
+    data: dict = await get_hypixel_data(uuid, cache=False)
     if data['player'] is None:
         return False
 
@@ -234,23 +224,7 @@ def start_session(uuid: str, session: int) -> bool:
     for key in stat_keys:
         stat_values[key] = data["player"].get("stats", {}).get("Bedwars", {}).get(key, 0)
 
-    with sqlite3.connect(f'{REL_PATH}/database/sessions.db') as conn:
-        cursor = conn.cursor()
-
-        cursor.execute("SELECT * FROM sessions WHERE session=? AND uuid=?", (session, uuid))
-        row: tuple = cursor.fetchone()
-
-        if not row:
-            columns = ', '.join(stat_values.keys())
-            values = ', '.join(['?' for _ in stat_values.values()])
-            query = f"INSERT INTO sessions ({columns}) VALUES ({values})"
-            cursor.execute(query, tuple(stat_values.values()))
-        else:
-            set_clause = ', '.join([f"{column} = ?" for column in stat_values.keys()])
-            query = f"UPDATE sessions SET {set_clause} WHERE session=? AND uuid=?"
-            values = list(stat_values.values()) + [session, uuid]
-            cursor.execute(query, tuple(values))
-        conn.commit()
+    await session_repo.save_session(stat_values)
     return True
 
 
@@ -263,17 +237,14 @@ async def get_smart_session(interaction: discord.Interaction, session: int, user
     :param username: The username of the session owner
     :param uuid: The uuid of the session owner
     """
-    with sqlite3.connect(f'{REL_PATH}/database/sessions.db') as conn:
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM sessions WHERE session=? AND uuid=?", (int(str(session)[0]), uuid))
-        session_data: tuple = cursor.fetchone()
+    session_data: tuple = await session_repo.get_session(uuid, int(str(session)[0]))
 
-        if not session_data:
-            cursor.execute(f"SELECT session FROM sessions WHERE uuid='{uuid}' ORDER BY session ASC")
-            session_data: tuple = cursor.fetchone()
+    if not session_data:
+        session_ids = await session_repo.get_session_ids(uuid)
+        session_data: tuple = tuple(session_ids[:1])
 
     if not session_data:
-        response: bool = start_session(uuid, session=1)
+        response: bool = await start_session(uuid, session=1)
 
         if response is True:
             await interaction.followup.send(f"**{username}** has no active sessions so one was created!")
@@ -295,17 +266,30 @@ def skin_from_file() -> bytes:
 
 
 @to_thread
-def fetch_skin_model(uuid: int, size: int) -> bytes:
+def _fetch_skin_model(uuid: int, size: int) -> bytes:
+    response = skin_session.get(f'https://visage.surgeplay.com/bust/{size}/{uuid}', timeout=3)
+    skin_l2_stats['hits' if getattr(response, 'from_cache', False) else 'misses'] += 1
+    return response.content
+
+
+@tracer.trace('skin')
+async def fetch_skin_model(uuid: int, size: int) -> bytes:
     """
     Fetches a 3d skin model visage.surgeplay.com
     If something goes wrong, a steve skin will returned
     :param uuid: The uuid of the relative player
     :param size: The skin render size in pixels
     """
+    skin_res = skin_cache.get((uuid, size))
+    if skin_res is not None:
+        return skin_res
+
     try:
-        skin_res = skin_session.get(f'https://visage.surgeplay.com/bust/{size}/{uuid}', timeout=3).content
+        skin_res = await skin_flight.do((uuid, size), _fetch_skin_model, uuid, size)
     except (requests.exceptions.ReadTimeout, requests.exceptions.ConnectTimeout):
-        skin_res = skin_from_file()
+        return skin_from_file()
+
+    skin_cache.set((uuid, size), skin_res, len(skin_res))
     return skin_res
 
 
@@ -323,11 +307,11 @@ async def yearly_eligibility(interaction: discord.Interaction, discord_id: int |
     :param interaction: the discord interaction object
     :param discord_id: the discord id of the linked player being checked
     """
-    subscription = None
+    is_premium = False
     if discord_id:
-        subscription = get_subscription(discord_id=discord_id)
+        is_premium = (await entitlement_resolver.fetch(discord_id)).is_premium
 
-    if not subscription and not get_subscription(interaction.user.id):
+    if not is_premium and not (await entitlement_resolver.fetch(interaction.user.id)).is_premium:
         embed_color = get_embed_color('primary')
         embed = discord.Embed(
             title="That player doesn't have premium!",
@@ -345,12 +329,12 @@ async def yearly_eligibility(interaction: discord.Interaction, discord_id: int |
     return True
 
 
-def discord_message(discord_id):
+async def discord_message(discord_id):
     """
     Chooses a random message to send if the discord id has no subscription
     :param discord_id: the discord id of the respective user
     """
-    if get_subscription(discord_id):
+    if (await entitlement_resolver.fetch(discord_id)).is_premium:
         return None
 
     if random.choice(([False]*5) + ([True]*2)):
@@ -360,46 +344,38 @@ def discord_message(discord_id):
     return None
 
 
+@tracer.trace('send')
 async def send_generic_renders(interaction: discord.Interaction,
                                func: object, kwargs: dict, message=None):
     """
-    Renders and sends all modes to discord for the selected render
+    Renders and sends the overall mode to discord for the selected render.
+    Other modes are rendered when they are selected
     :param interaction: the relative discord interaction object
     :param func: the function object to render with
     :param kwargs: the keyword arguments needed to render the image
     :param message: the message to send to discord with the image
     """
     if not message:
-        message = discord_message(interaction.user.id)
+        message = await discord_message(interaction.user.id)
+
+    # Modes are only rendered once they are selected, the player
+    # data is kept in memory by the view until it times out
+    renders = LazyRenders(render_executor, render_store, interaction.id, func, kwargs)
 
-    func(mode="Overall", **kwargs)
-    view = ModesView(user=interaction.user.id, inter=interaction, mode='Select a mode')
+    image = await renders.get('overall')
+    view = ModesView(user=interaction.user.id, inter=interaction,
+                     mode='Select a mode', renders=renders)
+    start = time.perf_counter()
     try:
         await interaction.edit_original_response(
             content=message,
-            attachments=[
-                discord.File(f"{REL_PATH}/database/activerenders/{interaction.id}/overall.png")],
+            attachments=[discord.File(image, filename='overall.png')],
             view=view
         )
     except discord.errors.NotFound:
-        return
-    
-    func(mode="Solos", **kwargs)
-    func(mode="Doubles", **kwargs)
-    func(mode="Threes", **kwargs)
-    func(mode="Fours", **kwargs)
-    func(mode="4v4", **kwargs)
-
-
-def get_command_users():
-    """
-    Returns total amount of users to have run a command
-    """
-    with sqlite3.connect(f'{REL_PATH}/database/command_usage.db') as conn:
-        cursor = conn.cursor()
-        cursor.execute('SELECT COUNT(*) FROM overall')
-        total_users = cursor.fetchone()[0] - 1
-    return total_users
+        renders.discard()
+    finally:
+        tracer.record('upload', time.perf_counter() - start)
 
 
 async def log_error_msg(client: discord.Client, error: Exception):
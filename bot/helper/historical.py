@@ -1,21 +1,29 @@
+import re
+import json
 import time
+import typing
 import sqlite3
 import random
 from datetime import datetime, timedelta
 
 import asyncio
+import numpy as np
 from discord import Embed
 
+from .database import connect_db, run_db
 from .errors import NoLinkedAccountError
+from .metrics import register_stats
 from .calctools import get_player_dict
+from .entitlements import entitlement_resolver
+from .snapshotcodec import encode_stats, decode_stats
 from .linking import get_linked_data, uuid_to_discord_id
 from .functions import (
     REL_PATH,
     get_embed_color,
-    get_subscription,
     get_hypixel_data,
     get_config,
-    historic_cache
+    historic_cache,
+    hypixel_client
 )
 
 
@@ -25,10 +33,10 @@ def get_reset_time_default(uuid: str) -> tuple | None:
     Gets the default reset time assigned randomly for a player
     :param uuid: The uuid of the relative player
     """
-    with sqlite3.connect(f'{REL_PATH}/database/historical.db') as conn:
+    with connect_db(f'{REL_PATH}/database/historical.db') as conn:
         cursor = conn.cursor()
 
-        cursor.execute(f"SELECT * FROM default_reset_times WHERE uuid = '{uuid}'")
+        cursor.execute("SELECT * FROM default_reset_times WHERE uuid = ?", (uuid,))
         default_data = cursor.fetchone()
     
     if default_data:
@@ -41,10 +49,10 @@ def get_reset_time_configured(discord_id: int):
     Gets the configured reset time set by the linked discord user
     :param discord_id: The discord id of the respective user
     """
-    with sqlite3.connect(f'{REL_PATH}/database/historical.db') as conn:
+    with connect_db(f'{REL_PATH}/database/historical.db') as conn:
         cursor = conn.cursor()
 
-        cursor.execute(f"SELECT * FROM configuration WHERE discord_id = {discord_id}")
+        cursor.execute("SELECT * FROM configuration WHERE discord_id = ?", (discord_id,))
         configuration_data = cursor.fetchone()
 
     if configuration_data:
@@ -73,6 +81,106 @@ def get_reset_time(uuid: str) -> tuple | None:
 
 
 
+# Historical types with the strftime format of their period keys and
+# a function moving a local datetime to the first reset day on or after it
+RESET_TYPES = {
+    'daily': ('%Y_%m_%d', lambda local: local),
+    'weekly': ('%Y_%U', lambda local: local + timedelta(days=(6 - local.weekday()) % 7)),
+    'monthly': ('%Y_%m', lambda local: local if local.day == 1
+                else (local.replace(day=1) + timedelta(days=32)).replace(day=1)),
+    'yearly': ('%Y', lambda local: local if local.timetuple().tm_yday == 1
+               else local.replace(year=local.year + 1, month=1, day=1))
+}
+
+
+def get_next_reset(method: str, timezone: int, reset_hour: int, after: float=None) -> int:
+    """
+    Returns the unix timestamp of the next reset of a historical type
+    :param method: The historical type (daily, weekly, etc)
+    :param timezone: The GMT offset of the reset time
+    :param reset_hour: The local hour the reset happens at
+    :param after: The unix timestamp the reset has to happen after (defaults to now)
+    """
+    offset = timedelta(hours=timezone)
+
+    local_now = datetime.utcfromtimestamp(time.time() if after is None else after) + offset
+    local_reset = local_now.replace(hour=reset_hour, minute=0, second=0, microsecond=0)
+    if local_reset <= local_now:
+        local_reset += timedelta(days=1)
+
+    local_reset = RESET_TYPES[method][1](local_reset)
+
+    return int((local_reset - offset - datetime(1970, 1, 1)).total_seconds())
+
+
+def _create_reset_schedule(cursor: sqlite3.Cursor) -> None:
+    cursor.execute(
+        'CREATE TABLE IF NOT EXISTS reset_schedule (uuid TEXT, method TEXT, timezone INTEGER, '
+        'reset_hour INTEGER, next_reset INTEGER, PRIMARY KEY (uuid, method))')
+    cursor.execute(
+        'CREATE INDEX IF NOT EXISTS reset_schedule_next_reset ON reset_schedule (method, next_reset)')
+
+
+# Keeps the precomputed reset times of a player in line with
+# their reset time. Called whenever the reset time may change.
+def update_reset_schedule(uuid: str) -> None:
+    """
+    Recomputes the next reset of every historical type tracked for a player
+    :param uuid: The uuid of the relative player
+    """
+    timezone, reset_hour = get_reset_time(uuid)
+
+    with connect_db(f'{REL_PATH}/database/historical.db') as conn:
+        cursor = conn.cursor()
+        _create_reset_schedule(cursor)
+
+        for method in RESET_TYPES:
+            cursor.execute(f"SELECT uuid FROM {method} WHERE uuid = ?", (uuid,))
+            if cursor.fetchone():
+                cursor.execute(
+                    'INSERT OR REPLACE INTO reset_schedule '
+                    '(uuid, method, timezone, reset_hour, next_reset) VALUES (?, ?, ?, ?, ?)',
+                    (uuid, method, timezone, reset_hour,
+                     get_next_reset(method, timezone, reset_hour)))
+
+
+# Schedules the players that were tracked before the schedule existed
+def backfill_reset_schedule(method: str) -> None:
+    """
+    Adds every player of a historical type that isn't scheduled to the schedule
+    :param method: The historical type (daily, weekly, etc)
+    """
+    with connect_db(f'{REL_PATH}/database/historical.db') as conn:
+        cursor = conn.cursor()
+        _create_reset_schedule(cursor)
+
+        cursor.execute(
+            f'SELECT {method}.uuid FROM {method} LEFT JOIN reset_schedule '
+            f'ON reset_schedule.uuid = {method}.uuid AND reset_schedule.method = ? '
+            'WHERE reset_schedule.uuid IS NULL', (method,))
+        uuids = [row[0] for row in cursor.fetchall()]
+
+        # Players whose reset is this hour are still due this hour
+        hour_start = time.time() // 3600 * 3600 - 1
+
+        for uuid in uuids:
+            timezone, reset_hour = get_reset_time(uuid)
+            cursor.execute(
+                'INSERT INTO reset_schedule (uuid, method, timezone, reset_hour, next_reset) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (uuid, method, timezone, reset_hour,
+                 get_next_reset(method, timezone, reset_hour, after=hour_start)))
+
+
+def backfill_reset_schedules() -> None:
+    """
+    Schedules the players of every historical type tracked before the schedule
+    existed. Run once on startup, players tracked since are scheduled as they start
+    """
+    for method in RESET_TYPES:
+        backfill_reset_schedule(method)
+
+
 # Directly inserts or updates the default reset time of a player.
 def set_reset_time_default(uuid: str, timezone: int, reset_hour: int):
     """
@@ -81,7 +189,7 @@ def set_reset_time_default(uuid: str, timezone: int, reset_hour: int):
     :param timezone: The GMT offset to insert
     :param reset_hour: The reset hour to insert
     """
-    with sqlite3.connect(f'{REL_PATH}/database/historical.db') as conn:
+    with connect_db(f'{REL_PATH}/database/historical.db') as conn:
         cursor = conn.cursor()
 
         cursor.execute(f"SELECT * FROM default_reset_times WHERE uuid = '{uuid}'")
@@ -96,6 +204,8 @@ def set_reset_time_default(uuid: str, timezone: int, reset_hour: int):
                 (timezone, reset_hour, uuid)
             )
 
+    update_reset_schedule(uuid)
+
 
 # Updates default reset time if it is not present in the database.
 # If a player is linked to discord and has configured reset time
@@ -133,7 +243,7 @@ def update_reset_time_configured(discord_id: int, value: int, method: str):
     :param value: the value associated with the method
     :param method: row name (timezone, reset_hour)
     """
-    with sqlite3.connect(f'{REL_PATH}/database/historical.db') as conn:
+    with connect_db(f'{REL_PATH}/database/historical.db') as conn:
         cursor = conn.cursor()
         cursor.execute(
             f'SELECT timezone FROM configuration WHERE discord_id = {discord_id}')
@@ -177,45 +287,280 @@ async def start_historical(uuid: str) -> None:
 
     trackers = ('daily', 'weekly', 'monthly', 'yearly')
     for tracker in trackers:
-        with sqlite3.connect(f'{REL_PATH}/database/historical.db') as conn:
+        with connect_db(f'{REL_PATH}/database/historical.db') as conn:
             cursor = conn.cursor()
             cursor.execute(f"SELECT uuid FROM {tracker} WHERE uuid = '{uuid}'")
             if not cursor.fetchone():
                 cursor.execute(f"INSERT INTO {tracker} ({keys}) VALUES ({', '.join('?'*len(stat_keys))})", stat_values)
 
+    update_reset_schedule(uuid)
+
+
+# The stat columns of the snapshot table. The table is created and newly
+# tracked stats are added to it by the schema migrations run on startup
+SNAPSHOT_STAT_KEYS = ['level', 'stars_gained', *get_config()['tracked_bedwars_stats']]
+
 
-# Saves historical stats to a new table with a specified name.
+def _create_snapshot_table(cursor: sqlite3.Cursor) -> list[str]:
+    """
+    Creates the snapshot table, adding any newly tracked stats as columns.
+    Returns the stat columns of the table
+    :param cursor: the cursor of the historical database
+    """
+    stat_keys = SNAPSHOT_STAT_KEYS
+
+    columns = ', '.join([f'{key} INTEGER' for key in stat_keys])
+    cursor.execute(
+        f'CREATE TABLE IF NOT EXISTS snapshots (uuid TEXT, period_type TEXT, period_key TEXT, '
+        f'{columns}, PRIMARY KEY (uuid, period_type, period_key))')
+    cursor.execute(
+        'CREATE INDEX IF NOT EXISTS snapshots_period ON snapshots (period_type, period_key)')
+
+    cursor.execute('PRAGMA table_info(snapshots)')
+    existing = {row[1] for row in cursor.fetchall()}
+    for key in stat_keys:
+        if key not in existing:
+            cursor.execute(f'ALTER TABLE snapshots ADD COLUMN {key} INTEGER')
+
+    cursor.execute(
+        'CREATE TABLE IF NOT EXISTS snapshot_archive (uuid TEXT, period_type TEXT, period_key TEXT, '
+        'schema_version INTEGER, data BLOB, PRIMARY KEY (uuid, period_type, period_key)) '
+        'WITHOUT ROWID')
+    cursor.execute(
+        'CREATE TABLE IF NOT EXISTS snapshot_schemas (version INTEGER PRIMARY KEY, stat_keys TEXT)')
+    return stat_keys
+
+
+# The stats archived snapshots were encoded with keyed by schema version,
+# a schema is never changed once it's created so they can be kept forever
+_snapshot_schemas: dict[int, list[str]] = {}
+
+
+def _get_schema(cursor: sqlite3.Cursor, version: int) -> list[str]:
+    """
+    Returns the stat keys of a snapshot schema version
+    :param cursor: the cursor of the historical database
+    :param version: the schema version of the archived snapshot
+    """
+    if version not in _snapshot_schemas:
+        cursor.execute('SELECT stat_keys FROM snapshot_schemas WHERE version = ?', (version,))
+        _snapshot_schemas[version] = json.loads(cursor.fetchone()[0])
+    return _snapshot_schemas[version]
+
+
+def _get_schema_version(cursor: sqlite3.Cursor, stat_keys: list[str]) -> int:
+    """
+    Returns the schema version for a list of stat keys, creating one if needed
+    :param cursor: the cursor of the historical database
+    :param stat_keys: the stat keys being archived in order
+    """
+    for version, schema in _snapshot_schemas.items():
+        if schema == stat_keys:
+            return version
+
+    cursor.execute('SELECT version, stat_keys FROM snapshot_schemas')
+    for version, schema in cursor.fetchall():
+        _snapshot_schemas[version] = json.loads(schema)
+        if _snapshot_schemas[version] == stat_keys:
+            return version
+
+    cursor.execute('INSERT INTO snapshot_schemas (stat_keys) VALUES (?)', (json.dumps(stat_keys),))
+    _snapshot_schemas[cursor.lastrowid] = stat_keys
+    return cursor.lastrowid
+
+
+# Saves the historical stats gained during a period as a snapshot.
 # The local stats are subtracted from the current stats leaving
 # the gained stats during the historical tracking period.
-def save_historical(local_data: tuple, hypixel_data: tuple, table: str) -> None:
+def save_historical(local_data: tuple, hypixel_data: tuple, period_type: str, period_key: str) -> None:
     """
-    Saves historical data to a specified table, typically used when historical stats reset.
-    Creates new table if specified table doesn't exist
+    Saves historical data as a snapshot, typically used when historical stats reset.
     :param local_data: The historical starting data
     :param hypixel_data: The current hypixel data
-    :param table: The name of the table to save the historical data to
+    :param period_type: The historical type of the period (daily, weekly, etc)
+    :param period_key: The key of the period (2023_07_14, 2023_28, etc)
     """
-    historical_values = [hypixel_data[0], hypixel_data[1]]
+    with connect_db(f'{REL_PATH}/database/historical.db') as conn:
+        _save_historical(conn.cursor(), local_data, hypixel_data, period_type, period_key)
+
+
+def _save_historical(cursor: sqlite3.Cursor, local_data: tuple, hypixel_data: tuple,
+                     period_type: str, period_key: str) -> None:
+    historical_values = [hypixel_data[0], period_type, period_key, hypixel_data[1]]
 
     for i, value in enumerate(hypixel_data[1:]):
         historical_values.append(value - local_data[i+1])
 
-    stat_keys = ['uuid', 'level', 'stars_gained']
-    stat_keys.extend(get_config()['tracked_bedwars_stats'])
+    stat_keys = ['uuid', 'period_type', 'period_key', *SNAPSHOT_STAT_KEYS]
+
+    # A snapshot that was already saved for the period is kept
+    if get_config()['historical_archive']['compact']:
+        version = _get_schema_version(cursor, stat_keys[3:])
+        cursor.execute(
+            'INSERT OR IGNORE INTO snapshot_archive '
+            '(uuid, period_type, period_key, schema_version, data) VALUES (?, ?, ?, ?, ?)',
+            (*historical_values[:3], version, encode_stats(historical_values[3:])))
+        return
+
+    keys = ', '.join(stat_keys)
+    cursor.execute(
+        f"INSERT OR IGNORE INTO snapshots ({keys}) VALUES ({', '.join('?'*len(stat_keys))})",
+        historical_values)
+
 
-    with sqlite3.connect(f'{REL_PATH}/database/historical.db') as conn:
+# Pulls snapshots for a range of periods, period keys of the
+# same type sort in chronological order so a range is one index scan
+def get_snapshots(uuid: str, period_type: str, start_key: str=None, end_key: str=None) -> list[dict]:
+    """
+    Returns the snapshots of a player for a range of periods ordered from oldest to newest
+    :param uuid: the uuid of the respective user
+    :param period_type: the historical type of the periods (daily, weekly, etc)
+    :param start_key: the key of the first period to include (defaults to the first snapshot)
+    :param end_key: the key of the last period to include (defaults to the latest snapshot)
+    """
+    params = (uuid, period_type, start_key or '', end_key or '~')
+
+    with connect_db(f'{REL_PATH}/database/historical.db') as conn:
         cursor = conn.cursor()
+        stat_keys = SNAPSHOT_STAT_KEYS
 
-        cursor.execute(f"SELECT name FROM sqlite_master WHERE type='table' AND name='{table}'")
-        if not cursor.fetchone():
-            columns = ', '.join([f'{key} INTEGER' for key in stat_keys[1:]])
-            cursor.execute(f"CREATE TABLE {table} (uuid TEXT PRIMARY KEY, {columns})")
+        cursor.execute(
+            'SELECT * FROM snapshots WHERE uuid = ? AND period_type = ? '
+            'AND period_key BETWEEN ? AND ? ORDER BY period_key', params)
 
-        cursor.execute(f"SELECT uuid FROM {table} WHERE uuid = '{hypixel_data[0]}'")
-    
-        if not cursor.fetchone():
-            keys = ', '.join(stat_keys)
-            cursor.execute(f"INSERT INTO {table} ({keys}) VALUES ({', '.join('?'*len(stat_keys))})", historical_values)
+        column_names = [desc[0] for desc in cursor.description]
+        snapshots = [dict(zip(column_names, row)) for row in cursor.fetchall()]
+
+        cursor.execute(
+            'SELECT period_key, schema_version, data FROM snapshot_archive WHERE uuid = ? '
+            'AND period_type = ? AND period_key BETWEEN ? AND ? ORDER BY period_key', params)
+        archived = cursor.fetchall()
+
+        if not archived:
+            return snapshots
+
+        # Archived snapshots are decoded into the same shape as regular ones,
+        # stats that weren't tracked when a snapshot was archived are zero
+        for period_key, version, data in archived:
+            schema = _get_schema(cursor, version)
+            snapshot = {'uuid': uuid, 'period_type': period_type, 'period_key': period_key}
+            snapshot.update(dict.fromkeys(stat_keys, 0))
+            snapshot.update(zip(schema, decode_stats(data, len(schema))))
+            snapshots.append(snapshot)
+
+    return sorted(snapshots, key=lambda snapshot: snapshot['period_key'])
+
+
+# Pulls only the requested stats of a range of snapshots as an array,
+# used for trends where decoding every snapshot into a dict is wasteful
+def get_snapshot_series(uuid: str, period_type: str, stat_keys: list[str],
+                        start_key: str=None, end_key: str=None) -> tuple[list[str], np.ndarray]:
+    """
+    Returns the period keys of a player's snapshots for a range of periods
+    and an array of the requested stats with a row for each period
+    :param uuid: the uuid of the respective user
+    :param period_type: the historical type of the periods (daily, weekly, etc)
+    :param stat_keys: the stats to include as the columns of the array
+    :param start_key: the key of the first period to include (defaults to the first snapshot)
+    :param end_key: the key of the last period to include (defaults to the latest snapshot)
+    """
+    params = (uuid, period_type, start_key or '', end_key or '~')
+    columns = ', '.join([f'IFNULL({key}, 0)' for key in stat_keys])
+
+    with connect_db(f'{REL_PATH}/database/historical.db') as conn:
+        cursor = conn.cursor()
+
+        cursor.execute(
+            f'SELECT period_key, {columns} FROM snapshots WHERE uuid = ? AND period_type = ? '
+            'AND period_key BETWEEN ? AND ?', params)
+        rows = cursor.fetchall()
+
+        cursor.execute(
+            'SELECT period_key, schema_version, data FROM snapshot_archive WHERE uuid = ? '
+            'AND period_type = ? AND period_key BETWEEN ? AND ?', params)
+
+        for period_key, version, data in cursor.fetchall():
+            schema = _get_schema(cursor, version)
+            values = dict(zip(schema, decode_stats(data, len(schema))))
+            rows.append((period_key, *[values.get(key, 0) for key in stat_keys]))
+
+    rows.sort()
+    period_keys = [row[0] for row in rows]
+    series = np.array([row[1:] for row in rows], dtype=np.float64).reshape(len(rows), len(stat_keys))
+    return period_keys, series
+
+
+def get_snapshot(uuid: str, period_type: str, period_key: str) -> dict | None:
+    """
+    Returns the snapshot of a player for a single period or None if it wasn't tracked
+    :param uuid: the uuid of the respective user
+    :param period_type: the historical type of the period (daily, weekly, etc)
+    :param period_key: the key of the period (2023_07_14, 2023_28, etc)
+    """
+    snapshots = get_snapshots(uuid, period_type, period_key, period_key)
+    return snapshots[0] if snapshots else None
+
+
+# Moves the snapshots of the old one table per period layout
+# (daily_2023_07_14, weekly_2023_28, etc) into the snapshot table
+def migrate_snapshot_tables(drop: bool=False) -> dict[str, int]:
+    """
+    Copies every per period snapshot table into the snapshot table.
+    Returns the amount of rows copied from each table
+    :param drop: whether to drop each table once it has been copied
+    """
+    migrated = {}
+
+    with connect_db(f'{REL_PATH}/database/historical.db') as conn:
+        cursor = conn.cursor()
+        stat_keys = _create_snapshot_table(cursor)
+
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
+        tables = [row[0] for row in cursor.fetchall()]
+
+        for table in tables:
+            match = re.fullmatch(r'(daily|weekly|monthly|yearly)_(\d{4}(?:_\d{2}){0,2})', table)
+            if not match:
+                continue
+
+            cursor.execute(f'PRAGMA table_info({table})')
+            columns = [row[1] for row in cursor.fetchall() if row[1] in stat_keys]
+            keys = ', '.join(columns)
+
+            cursor.execute(
+                f'INSERT OR IGNORE INTO snapshots (uuid, period_type, period_key, {keys}) '
+                f'SELECT uuid, ?, ?, {keys} FROM {table}', match.groups())
+            migrated[table] = cursor.rowcount
+
+            if drop:
+                cursor.execute(f'DROP TABLE {table}')
+            conn.commit()
+    return migrated
+
+
+# Moves finished snapshots into the compact archive
+def archive_snapshots(period_type: str=None) -> int:
+    """
+    Encodes regular snapshots into the compact archive, removing the originals.
+    Returns the amount of snapshots archived
+    :param period_type: only archive snapshots of this historical type (defaults to every type)
+    """
+    with connect_db(f'{REL_PATH}/database/historical.db') as conn:
+        cursor = conn.cursor()
+        stat_keys = _create_snapshot_table(cursor)
+        version = _get_schema_version(cursor, stat_keys)
+
+        keys = ', '.join(stat_keys)
+        where, params = ('WHERE period_type = ?', (period_type,)) if period_type else ('', ())
+        rows = cursor.execute(
+            f'SELECT uuid, period_type, period_key, {keys} FROM snapshots {where}', params).fetchall()
+
+        cursor.executemany(
+            'INSERT OR IGNORE INTO snapshot_archive '
+            '(uuid, period_type, period_key, schema_version, data) VALUES (?, ?, ?, ?, ?)',
+            [(*row[:3], version, encode_stats([value or 0 for value in row[3:]])) for row in rows])
+        cursor.execute(f'DELETE FROM snapshots {where}', params)
+    return len(rows)
 
 
 # Pulls a player's historical stats from the database
@@ -225,7 +570,7 @@ def get_historical(uuid: str, table_name: str):
     :param uuid: the uuid of the respective user
     :param table_name: the name of the respective table (daily, weekly, etc)
     """
-    with sqlite3.connect(f'{REL_PATH}/database/historical.db') as conn:
+    with connect_db(f'{REL_PATH}/database/historical.db') as conn:
         cursor = conn.cursor()
 
         try:
@@ -273,90 +618,211 @@ def get_lookback_eligiblility(discord_id_primary: int, discord_id_secondary: int
     :param discord_id_primary: the primary discord id to use (linked discord account of player)
     :param discord_id_secondary: the secondary discord id to use (the interaction user's id) 
     """
-    subscription = None
+    entitlements = None
     if discord_id_primary:
-        subscription = get_subscription(discord_id=discord_id_primary)
+        entitlements = entitlement_resolver.get(discord_id_primary)
 
-    if not subscription or not discord_id_primary:
-        subscription = get_subscription(discord_id=discord_id_secondary)
+    if not entitlements or not entitlements.is_premium:
+        entitlements = entitlement_resolver.get(discord_id_secondary)
 
-    if subscription:
-        if 'basic' in subscription[1]:
-            return 60
-        elif 'pro' in subscription[1]:
-            return -1
-    return 30
+    return entitlements.lookback_days
 
 
-async def reset_historical(method: str, table_format: str, condition: str):
+def get_stat_values(hypixel_data: dict) -> list:
     """
-    Loops through historical and resets each row if a condition is met
-    :param method: The historical type (daily, weekly, etc)
-    :param table_format: The datetime strftime format for the table name
-    :param condition: The condition to be evaluated to determine whether or not to reset
+    Returns the level and tracked bedwars stats of a player
+    in the order of the columns of the historical tables
+    :param hypixel_data: the player dict of the player's hypixel data
     """
-    # Get all linked accounts
-    with sqlite3.connect(f'{REL_PATH}/database/linked_accounts.db') as conn:
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM linked_accounts')
-        row = cursor.fetchone()
+    stat_values = [hypixel_data.get("achievements", {}).get("bedwars_level", 0)]
 
-        linked_data = {}
-        while row:
-            linked_data[row[1]] = row[0]
-            row = cursor.fetchone()
+    for key in get_config()['tracked_bedwars_stats']:
+        stat_values.append(hypixel_data.get("stats", {}).get("Bedwars", {}).get(key, 0))
+    return stat_values
 
-    # Get all configuration and historical
-    with sqlite3.connect(f'{REL_PATH}/database/historical.db') as conn:
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM configuration')
-        row = cursor.fetchone()
 
-        config_data = {}
-        while row:
-            config_data[row[0]] = row
-            row = cursor.fetchone()
+# Progress of the latest historical reset
+reset_progress: dict = {}
+register_stats('historical_resets', lambda: reset_progress)
+
+
+class ResetPipeline:
+    def __init__(self, workers: int, batch_size: int):
+        """
+        Resets historical stats of due players concurrently.
+        A producer queues the due players, a pool of workers fetches
+        their hypixel data and a single writer saves them in batches.
+        Every historical type due for a player is reset with one fetch
+        :param workers: The amount of players fetched concurrently
+        :param batch_size: The maximum amount of players saved in one transaction
+        """
+        self.workers = workers
+        self.batch_size = batch_size
+
+        self.scheduled = time.time() // 3600 * 3600
+        self.progress = reset_progress
+        self.progress.clear()
+        self.progress.update({
+            'workers': workers,
+            'due': 0,
+            'resets': {method: 0 for method in RESET_TYPES},
+            'fetched': 0,
+            'written': 0,
+            'failed': 0,
+            'started': time.time(),
+            'finished': None,
+            'lag': 0,
+            'last_error': None
+        })
+
+
+    async def _produce(self, due_players: typing.Iterable[tuple[str, list]],
+                       fetch_queue: asyncio.Queue) -> None:
+        for uuid, resets in due_players:
+            self.progress['due'] += 1
+            for method, *_ in resets:
+                self.progress['resets'][method] += 1
+            await fetch_queue.put((uuid, resets))
+
+        for _ in range(self.workers):
+            await fetch_queue.put(None)
+
+
+    async def _fetch(self, fetch_queue: asyncio.Queue, write_queue: asyncio.Queue) -> None:
+        while (item := await fetch_queue.get()) is not None:
+            uuid, resets = item
+
+            try:
+                hypixel_data = await get_hypixel_data(uuid, cache=True, cache_obj=historic_cache)
+            except Exception as error:
+                self.progress['failed'] += 1
+                self.progress['last_error'] = repr(error)
+                continue
+
+            stat_values = get_stat_values(get_player_dict(hypixel_data))
+            self.progress['fetched'] += 1
+            await write_queue.put((uuid, resets, stat_values))
+
+
+    def _flush(self, batch: list[tuple[str, list, list]]) -> None:
+        stat_keys = ['level', *get_config()['tracked_bedwars_stats']]
+        set_clause = ', '.join([f"{column} = ?" for column in stat_keys])
+
+        # Every due historical type of every player in the batch is saved in one transaction
+        with connect_db(f'{REL_PATH}/database/historical.db') as conn:
+            cursor = conn.cursor()
+
+            for uuid, resets, stat_values in batch:
+                for method, historical, period_key, next_reset in resets:
+                    cursor.execute(f"UPDATE {method} SET {set_clause} WHERE uuid = ?", (*stat_values, uuid))
+                    cursor.execute(
+                        "UPDATE reset_schedule SET next_reset = ? WHERE uuid = ? AND method = ?",
+                        (next_reset, uuid, method))
+                    _save_historical(cursor, historical, (uuid, *stat_values), method, period_key)
+
 
-        cursor.execute(f'SELECT * FROM {method}')
-        historical_data = cursor.fetchall()
+    async def _write_batch(self, batch: list[tuple[str, list, list]]) -> None:
+        # A failed batch is recorded and skipped, the writer has to keep
+        # draining the queue or the workers would block on it forever
+        try:
+            await run_db(self._flush, batch)
+        except Exception as error:
+            self.progress['failed'] += len(batch)
+            self.progress['last_error'] = repr(error)
+            return
 
-    # Reset all historical that is at the correct time
-    utc_now = datetime.utcnow()
-    for historical in historical_data:
-        if not historical:
-            continue
+        self.progress['written'] += len(batch)
+        self.progress['lag'] = round(time.time() - self.scheduled)
 
-        uuid = historical[0]
-        start_time = time.time()
 
-        gmt_offset, hour = get_reset_time(uuid)
+    async def _write(self, write_queue: asyncio.Queue) -> None:
+        batch = []
+        while (item := await write_queue.get()) is not None:
+            batch.append(item)
 
-        timezone = utc_now + timedelta(hours=gmt_offset)
+            # Write as soon as the workers fall behind rather than waiting for a full batch
+            if len(batch) >= self.batch_size or write_queue.empty():
+                await self._write_batch(batch)
+                batch = []
 
-        if eval(condition) and timezone.hour == hour:
-            hypixel_data = await get_hypixel_data(uuid, cache=True, cache_obj=historic_cache)
-            hypixel_data = get_player_dict(hypixel_data)
+        if batch:
+            await self._write_batch(batch)
 
-            stat_keys: list = get_config()['tracked_bedwars_stats']
-            stat_values = [hypixel_data.get("achievements", {}).get("bedwars_level", 0)]
 
-            for key in stat_keys:
-                stat_values.append(hypixel_data.get("stats", {}).get("Bedwars", {}).get(key, 0))
-            stat_keys.insert(0, 'level')
+    async def run(self, due_players: typing.Iterable[tuple[str, list]]) -> None:
+        """
+        Resets every due player
+        :param due_players: pairs of a due player's uuid and their due resets from `get_due_players`
+        """
+        fetch_queue = asyncio.Queue(maxsize=self.workers * 2)
+        write_queue = asyncio.Queue(maxsize=self.batch_size * 2)
 
-            with sqlite3.connect(f'{REL_PATH}/database/historical.db') as conn:
-                cursor = conn.cursor()
+        writer = asyncio.create_task(self._write(write_queue))
+        try:
+            await asyncio.gather(
+                self._produce(due_players, fetch_queue),
+                *(self._fetch(fetch_queue, write_queue) for _ in range(self.workers))
+            )
+        finally:
+            await write_queue.put(None)
+            await writer
+            self.progress['finished'] = time.time()
 
-                set_clause = ', '.join([f"{column} = ?" for column in stat_keys])
-                cursor.execute(f"UPDATE {method} SET {set_clause} WHERE uuid = '{uuid}'", stat_values)
 
-            stat_values.insert(0, uuid)
-            table_name = (timezone - timedelta(days=1)).strftime(table_format)
-            save_historical(historical, stat_values, table=table_name)
+def get_reset_workers() -> int:
+    """
+    Returns the amount of reset workers the remaining api quota allows for
+    """
+    max_workers = get_config()['historical_reset']['max_workers']
+    quota = hypixel_client.key_pool.available_quota()
+    if quota is None:
+        return max_workers
+    return max(1, min(max_workers, quota))
 
-            time_elapsed = time.time() - start_time
-            sleep_time = 2 - (time_elapsed)
-            await asyncio.sleep(sleep_time)
+
+def get_due_players() -> dict[str, list]:
+    """
+    Returns the historical types due for a reset of every due player
+    keyed by uuid, each as a tuple of the historical type, the player's
+    historical row, the key of the period ending and their next reset
+    """
+    due_players: dict[str, list] = {}
+
+    # Only the due players are selected through the schedule index
+    with connect_db(f'{REL_PATH}/database/historical.db') as conn:
+        cursor = conn.cursor()
+
+        for method, (key_format, _) in RESET_TYPES.items():
+            cursor.execute(
+                f'SELECT reset_schedule.timezone, reset_schedule.reset_hour, reset_schedule.next_reset, '
+                f'{method}.* FROM reset_schedule JOIN {method} ON {method}.uuid = reset_schedule.uuid '
+                'WHERE reset_schedule.method = ? AND reset_schedule.next_reset <= ?',
+                (method, time.time()))
+
+            for timezone, reset_hour, reset_at, *historical in cursor.fetchall():
+                local_reset = datetime.utcfromtimestamp(reset_at) + timedelta(hours=timezone)
+                period_key = (local_reset - timedelta(days=1)).strftime(key_format)
+                next_reset = get_next_reset(method, timezone, reset_hour)
+
+                due_players.setdefault(historical[0], []).append(
+                    (method, tuple(historical), period_key, next_reset))
+    return due_players
+
+
+async def reset_historical():
+    """
+    Resets every historical type (daily, weekly, etc) of every
+    player whose scheduled reset has passed, fetching each player once
+    """
+    # Selecting the due players joins every historical table, so
+    # it is kept off of the event loop like the writes are
+    due_players = await run_db(get_due_players)
+
+    pipeline = ResetPipeline(
+        workers=get_reset_workers(),
+        batch_size=get_config()['historical_reset']['batch_size']
+    )
+    await pipeline.run(due_players.items())
 
 
 class HistoricalManager:
@@ -432,15 +898,16 @@ class HistoricalManager:
         await start_historical(uuid)
 
 
-    def save_historical(self, local_data: tuple, hypixel_data: tuple, table: str) -> None:
+    def save_historical(self, local_data: tuple, hypixel_data: tuple,
+                        period_type: str, period_key: str) -> None:
         """
-        Saves historical data to a specified table, typically used when historical stats reset.
-        Creates new table if specified table doesn't exist
+        Saves historical data as a snapshot, typically used when historical stats reset.
         :param local_data: The historical starting data
         :param hypixel_data: The current hypixel data
-        :param table: The name of the table to save the historical data to
+        :param period_type: The historical type of the period (daily, weekly, etc)
+        :param period_key: The key of the period (2023_07_14, 2023_28, etc)
         """
-        save_historical(local_data, hypixel_data, table)
+        save_historical(local_data, hypixel_data, period_type, period_key)
 
 
     def get_historical(self, uuid: str=None, table_name: str='daily'):
@@ -454,6 +921,18 @@ class HistoricalManager:
         return get_historical(uuid, table_name)
 
 
+    def get_snapshot(self, period_type: str, period_key: str, uuid: str=None):
+        """
+        Returns the snapshot of a player for a single period or None if it wasn't tracked
+        :param period_type: the historical type of the period (daily, weekly, etc)
+        :param period_key: the key of the period (2023_07_14, 2023_28, etc)
+        :param uuid: the uuid of the respective user
+        """
+        if not uuid:
+            uuid = self._get_uuid()
+        return get_snapshot(uuid, period_type, period_key)
+
+
     def build_invalid_lookback_embed(self, max_lookback: int) -> Embed:
         """
         Responds to a interaction with an max lookback exceeded message
@@ -0,0 +1,428 @@
+"""
+Asynchronous client for the hypixel api and a cache for its responses
+"""
+
+import os
+import json
+import time
+import asyncio
+
+import aiohttp
+
+from .database import connect_db, run_db
+from .memorycache import MemoryCache
+
+
+class ResponseCache:
+    def __init__(self, path: str, expire_after: float, purge_interval: float=60):
+        """
+        SQLite backed cache of hypixel api responses.
+        Its methods block and are meant to be run through `run_db`
+        :param path: the path of the database file
+        :param expire_after: the amount of seconds a response is cached for
+        :param purge_interval: the minimum amount of seconds between purges of expired responses
+        """
+        self.path = path
+        self.expire_after = expire_after
+        self.purge_interval = purge_interval
+        self.hits = 0
+        self.misses = 0
+        self._last_purge = 0.0
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with connect_db(self.path) as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS responses '
+                '(key TEXT PRIMARY KEY, expires REAL, data TEXT)')
+            conn.execute('CREATE INDEX IF NOT EXISTS responses_expires ON responses (expires)')
+
+
+    def get_entry(self, key: str) -> tuple[dict, int, float] | None:
+        """
+        Returns a cached response, its encoded size and the seconds
+        until it expires or None if it isn't cached or has expired
+        :param key: the key the response was cached under
+        """
+        with connect_db(self.path) as conn:
+            row = conn.execute(
+                'SELECT data, expires FROM responses WHERE key = ? AND expires > ?',
+                (key, time.time())).fetchone()
+
+        if row is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return json.loads(row[0]), len(row[0]), row[1] - time.time()
+
+
+    def get(self, key: str) -> dict | None:
+        """
+        Returns a cached response or None if it isn't cached or has expired
+        :param key: the key the response was cached under
+        """
+        entry = self.get_entry(key)
+        return entry[0] if entry else None
+
+
+    def set(self, key: str, data: dict) -> int:
+        """
+        Caches a response, replacing any response cached under the same key.
+        Returns the encoded size of the response
+        :param key: the key to cache the response under
+        :param data: the json response to cache
+        """
+        encoded = json.dumps(data)
+        with connect_db(self.path) as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO responses (key, expires, data) VALUES (?, ?, ?)',
+                (key, time.time() + self.expire_after, encoded))
+
+        if time.time() - self._last_purge >= self.purge_interval:
+            self.purge()
+        return len(encoded)
+
+
+    def purge(self) -> int:
+        """Deletes every expired response and returns how many were deleted"""
+        self._last_purge = time.time()
+        with connect_db(self.path) as conn:
+            return conn.execute(
+                'DELETE FROM responses WHERE expires <= ?', (time.time(),)).rowcount
+
+
+    def get_stats(self) -> dict:
+        """Returns the hits and misses of the cache"""
+        return {'hits': self.hits, 'misses': self.misses}
+
+
+class TieredCache:
+    def __init__(self, memory: MemoryCache, persistent: ResponseCache):
+        """
+        Keeps decoded responses in memory in front of a persistent response cache
+        :param memory: the in-process cache checked first (L1)
+        :param persistent: the SQLite cache checked on a memory miss (L2)
+        """
+        self.memory = memory
+        self.persistent = persistent
+
+
+    async def get(self, key: str) -> dict | None:
+        """
+        Returns a cached response or None if neither tier has it cached.
+        The response is shared and must not be mutated
+        :param key: the key the response was cached under
+        """
+        data = self.memory.get(key)
+        if data is not None:
+            return data
+
+        # Reading and decoding the response is kept off of the event loop
+        entry = await run_db(self.persistent.get_entry, key)
+        if entry is None:
+            return None
+
+        # Don't keep the response in memory for longer than it's persisted
+        data, size, expires_in = entry
+        self.memory.set(key, data, size, ttl=min(self.memory.ttl, expires_in))
+        return data
+
+
+    async def set(self, key: str, data: dict) -> None:
+        """
+        Caches a response in both tiers
+        :param key: the key to cache the response under
+        :param data: the json response to cache
+        """
+        size = await run_db(self.persistent.set, key, data)
+        self.memory.set(key, data, size)
+
+
+    def get_stats(self) -> dict:
+        """Returns the usage of each tier"""
+        return {'l1': self.memory.get_stats(), 'l2': self.persistent.get_stats()}
+
+
+class APIKey:
+    def __init__(self, name: str, key: str):
+        """
+        Rate limit state of a single hypixel api key
+        :param name: the name of the key in `apikeys.json`
+        :param key: the api key itself
+        """
+        self.name = name
+        self.key = key
+
+        self.limit: int | None = None
+        self.remaining: int | None = None
+        self.reset_at = 0.0
+        self.cooldown_until = 0.0
+        self.in_flight = 0
+
+        self.requests = 0
+        self.rate_limited = 0
+        self.forbidden = 0
+
+
+    def available_at(self, now: float) -> float:
+        """
+        Returns when the key can next be used
+        :param now: the current monotonic time
+        """
+        available_at = max(now, self.cooldown_until)
+        if self.remaining is not None and self.remaining - self.in_flight <= 0:
+            available_at = max(available_at, self.reset_at)
+        return available_at
+
+
+    def load(self, now: float) -> float:
+        """
+        Returns how much of the key's quota is in use, keys that
+        haven't been used yet are treated as unused
+        :param now: the current monotonic time
+        """
+        if self.remaining is None or self.limit is None or now >= self.reset_at:
+            return self.in_flight / (self.limit or 1)
+        return (self.limit - self.remaining + self.in_flight) / self.limit
+
+
+class KeyPool:
+    def __init__(self, cooldown: float=60, forbidden_cooldown: float=300):
+        """
+        Selects the least loaded hypixel api key using the rate limit
+        headers returned by the api
+        :param cooldown: the seconds a key is unused for after a 429 without a reset header
+        :param forbidden_cooldown: the seconds a key is unused for after a 403
+        """
+        self.cooldown = cooldown
+        self.forbidden_cooldown = forbidden_cooldown
+
+        self._keys: dict[str, APIKey] = {}
+        self.queued = 0
+
+
+    def update_keys(self, keys: dict[str, str]) -> None:
+        """
+        Replaces the keys in the pool, keeping the state of unchanged keys
+        :param keys: the api keys keyed by their name
+        """
+        self._keys = {
+            name: self._keys[name] if name in self._keys and self._keys[name].key == key
+            else APIKey(name, key) for name, key in keys.items()
+        }
+
+
+    async def acquire(self) -> APIKey:
+        """
+        Returns the least loaded available key, waiting
+        for one to become available if they are all exhausted
+        """
+        queued = False
+        try:
+            while True:
+                if not self._keys:
+                    raise LookupError('There are no hypixel api keys configured!')
+
+                now = time.monotonic()
+                available = [key for key in self._keys.values() if key.available_at(now) <= now]
+
+                if available:
+                    key = min(available, key=lambda key: key.load(now))
+                    key.in_flight += 1
+                    key.requests += 1
+                    return key
+
+                if not queued:
+                    queued = True
+                    self.queued += 1
+
+                next_available = min(key.available_at(now) for key in self._keys.values())
+                await asyncio.sleep(next_available - now)
+        finally:
+            if queued:
+                self.queued -= 1
+
+
+    def release(self, key: APIKey, status: int, headers: dict) -> None:
+        """
+        Updates the state of a key after its request has finished
+        :param key: the key returned by `acquire`
+        :param status: the status code of the response, 0 if the request failed
+        :param headers: the headers of the response
+        """
+        key.in_flight -= 1
+        now = time.monotonic()
+
+        try:
+            if 'RateLimit-Remaining' in headers:
+                key.remaining = int(headers['RateLimit-Remaining'])
+            if 'RateLimit-Limit' in headers:
+                key.limit = int(headers['RateLimit-Limit'])
+            if 'RateLimit-Reset' in headers:
+                key.reset_at = now + int(headers['RateLimit-Reset'])
+        except ValueError:
+            pass
+
+        if status == 429:
+            key.rate_limited += 1
+            key.remaining = 0
+            retry_after = headers.get('Retry-After')
+            key.cooldown_until = now + (
+                int(retry_after) if retry_after and retry_after.isdigit()
+                else max(key.reset_at - now, 0) or self.cooldown)
+
+        elif status == 403:
+            key.forbidden += 1
+            key.cooldown_until = now + self.forbidden_cooldown
+
+
+    def available_quota(self) -> int | None:
+        """
+        Returns the amount of requests that can be made right now
+        across every key or None if a key's quota isn't known yet
+        """
+        if not self._keys:
+            return None
+
+        now = time.monotonic()
+        quota = 0
+
+        for key in self._keys.values():
+            if key.cooldown_until > now:
+                continue
+            if key.remaining is None or now >= key.reset_at:
+                if key.limit is None:
+                    return None
+                quota += key.limit - key.in_flight
+            else:
+                quota += max(key.remaining - key.in_flight, 0)
+        return quota
+
+
+    def get_stats(self) -> dict:
+        """Returns the utilization of every key in the pool"""
+        now = time.monotonic()
+        return {
+            'queued': self.queued,
+            'keys': {
+                name: {
+                    'requests': key.requests,
+                    'in_flight': key.in_flight,
+                    'remaining': key.remaining,
+                    'limit': key.limit,
+                    'utilization': round(key.load(now), 3),
+                    'resets_in': round(max(key.reset_at - now, 0), 1),
+                    'cooldown': round(max(key.cooldown_until - now, 0), 1),
+                    'rate_limited': key.rate_limited,
+                    'forbidden': key.forbidden
+                } for name, key in self._keys.items()
+            }
+        }
+
+
+class HypixelClient:
+    BASE_URL = 'https://api.hypixel.net'
+
+    def __init__(self, keys_path: str, max_concurrency: int=50,
+                 timeout: float=10, max_retries: int=3):
+        """
+        Hypixel api client sharing one keep-alive connection pool
+        :param keys_path: the path of the `apikeys.json` file
+        :param max_concurrency: the maximum amount of requests in flight at once
+        :param timeout: the amount of seconds before a request is abandoned
+        :param max_retries: how many times a rate limited request is retried with another key
+        """
+        self.keys_path = keys_path
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.key_pool = KeyPool()
+
+        self._session: aiohttp.ClientSession | None = None
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+        self._keys_mtime: float | None = None
+
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+        self._total_latency = 0.0
+
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_concurrency, keepalive_timeout=60),
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+        return self._session
+
+
+    def _reload_keys(self) -> None:
+        """Reloads the api keys into the key pool if `apikeys.json` has changed"""
+        mtime = os.stat(self.keys_path).st_mtime
+        if mtime != self._keys_mtime:
+            with open(self.keys_path, 'r') as keyfile:
+                self.key_pool.update_keys(json.load(keyfile)['hypixel'])
+            self._keys_mtime = mtime
+
+
+    async def get(self, endpoint: str, **params) -> dict:
+        """
+        Makes a request to the hypixel api with the least loaded api key
+        :param endpoint: the endpoint to request (player, status, etc)
+        :param **params: the query parameters of the request
+        """
+        self._reload_keys()
+
+        for attempt in range(self.max_retries + 1):
+            key = await self.key_pool.acquire()
+            status, headers = 0, {}
+
+            async with self._semaphore:
+                self.in_flight += 1
+                start_time = time.perf_counter()
+
+                try:
+                    async with self.session.get(
+                        f'{self.BASE_URL}/{endpoint}', params=params, headers={'API-Key': key.key}
+                    ) as response:
+                        status, headers = response.status, response.headers
+                        data = await response.json(content_type=None)
+                except (aiohttp.ClientError, asyncio.TimeoutError):
+                    self.errors += 1
+                    raise
+                finally:
+                    self.key_pool.release(key, status, headers)
+                    self.in_flight -= 1
+                    self.requests += 1
+                    self._total_latency += time.perf_counter() - start_time
+
+            if status not in (429, 403) or attempt == self.max_retries:
+                return data
+
+
+    async def get_player(self, uuid: str) -> dict:
+        """
+        Fetches a player's data from the hypixel api
+        :param uuid: the uuid of the player
+        """
+        return await self.get('player', uuid=uuid)
+
+
+    async def close(self) -> None:
+        """Closes every pooled connection"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+    def get_stats(self) -> dict:
+        """Returns the current usage of the client"""
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'in_flight': self.in_flight,
+            'average_latency': self._total_latency / self.requests if self.requests else 0
+        }
@@ -1,12 +1,14 @@
-import sqlite3
-
-from mcuuid import MCUUID
 from discord import Interaction, Embed
 
+from .database import connect_db
 from .errors import MCUserNotFoundError
+from .mojang import get_profile_by_name, get_name
+from .repositories import linking_repo
+from .entitlements import entitlement_resolver
+from .usernameindex import username_index
+from .tracing import tracer
 from .functions import (
     get_hypixel_data,
-    get_subscription,
     get_embed_color,
     REL_PATH
 )
@@ -17,10 +19,10 @@ def uuid_to_discord_id(uuid: str) -> int | None:
     Attempts to fetch discord id from linked database
     :param uuid: The uuid of the player to find linked data for
     """
-    with sqlite3.connect(f'{REL_PATH}/database/linked_accounts.db') as conn:
+    with connect_db(f'{REL_PATH}/database/linked_accounts.db') as conn:
         cursor = conn.cursor()
 
-        cursor.execute(f"SELECT discord_id FROM linked_accounts WHERE uuid = '{uuid}'")
+        cursor.execute("SELECT discord_id FROM linked_accounts WHERE uuid = ?", (uuid,))
         discord_id = cursor.fetchone()
 
     return None if not discord_id else discord_id[0]
@@ -31,9 +33,9 @@ def get_linked_data(discord_id: int) -> tuple:
     Returns a users linked data from linked database
     :param discord_id: The discord id of user's linked data to be retrieved
     """
-    with sqlite3.connect(f'{REL_PATH}/database/linked_accounts.db') as conn:
+    with connect_db(f'{REL_PATH}/database/linked_accounts.db') as conn:
         cursor = conn.cursor()
-        cursor.execute(f"SELECT * FROM linked_accounts WHERE discord_id = {discord_id}")
+        cursor.execute("SELECT * FROM linked_accounts WHERE discord_id = ?", (discord_id,))
         return cursor.fetchone()
 
 
@@ -43,9 +45,9 @@ def set_linked_data(discord_id: int, uuid: str) -> None:
     :param discord_id: the discord id of the respective user
     :param uuid: the minecraft uuid of the relvative user
     """
-    with sqlite3.connect(f'{REL_PATH}/database/linked_accounts.db') as conn:
+    with connect_db(f'{REL_PATH}/database/linked_accounts.db') as conn:
         cursor = conn.cursor()
-        cursor.execute(f"SELECT * FROM linked_accounts WHERE discord_id = {discord_id}")
+        cursor.execute("SELECT * FROM linked_accounts WHERE discord_id = ?", (discord_id,))
         linked_data = cursor.fetchone()
 
         if not linked_data:
@@ -53,6 +55,10 @@ def set_linked_data(discord_id: int, uuid: str) -> None:
         else:
             cursor.execute("UPDATE linked_accounts SET uuid = ? WHERE discord_id = ?", (uuid, discord_id))
 
+    # The reset time configured by the discord user now applies to the player
+    from .historical import update_reset_schedule
+    update_reset_schedule(uuid)
+
 
 def update_autofill(discord_id: int, uuid: str, username: str) -> None:
     """
@@ -61,11 +67,10 @@ def update_autofill(discord_id: int, uuid: str, username: str) -> None:
     :param uuid: The uuid of the target linked user
     :param username: The updated username of the target linked user
     """
-    subscription: tuple = get_subscription(discord_id)
-    if subscription:
-        with sqlite3.connect(f'{REL_PATH}/database/autofill.db') as conn:
+    if entitlement_resolver.get(discord_id).is_premium:
+        with connect_db(f'{REL_PATH}/database/autofill.db') as conn:
             cursor = conn.cursor()
-            cursor.execute(f"SELECT * FROM autofill WHERE discord_id = {discord_id}")
+            cursor.execute("SELECT * FROM autofill WHERE discord_id = ?", (discord_id,))
             autofill_data: tuple = cursor.fetchone()
 
             if not autofill_data:
@@ -74,6 +79,7 @@ def update_autofill(discord_id: int, uuid: str, username: str) -> None:
             elif autofill_data[2] != username:
                 query = "UPDATE autofill SET uuid = ?, username = ? WHERE discord_id = ?"
                 cursor.execute(query, (uuid, username, discord_id))
+        username_index.set(discord_id, username)
 
 
 async def link_account(discord_tag: str, discord_id: int, name: str, uuid: str) -> bool | None:
@@ -99,13 +105,14 @@ async def link_account(discord_tag: str, discord_id: int, name: str, uuid: str)
     # Linking Logic
     if hypixel_discord_tag:
         if discord_tag == hypixel_discord_tag:
-            set_linked_data(discord_id, uuid)
-            update_autofill(discord_id, uuid, name)
+            await linking_repo.set_linked_data(discord_id, uuid)
+            await linking_repo.update_autofill(discord_id, uuid, name)
             return 1
         return 0
     return -1
 
 
+@tracer.trace('player_info')
 async def fetch_player_info(username: str, interaction: Interaction,
                             eph=False) -> tuple[str, str]:
     """
@@ -115,11 +122,11 @@ async def fetch_player_info(username: str, interaction: Interaction,
     :param eph: whether or not to respond with an ephemeral message (default false)
     """
     if username is None:
-        linked_data = get_linked_data(interaction.user.id)
+        linked_data = await linking_repo.get_linked_data(interaction.user.id)
         if linked_data:
             uuid: str = linked_data[1]
-            name: str = MCUUID(uuid=uuid).name
-            update_autofill(interaction.user.id, uuid, name)
+            name: str = await get_name(uuid)
+            await linking_repo.update_autofill(interaction.user.id, uuid, name)
         else:
             msg = "You are not linked! Either specify a player or link your account using `/link`!"
             if interaction.response.is_done():
@@ -130,10 +137,9 @@ async def fetch_player_info(username: str, interaction: Interaction,
     else:
         try:
             if len(username) <= 16:
-                uuid: str = MCUUID(name=username).uuid
-                name: str = MCUUID(name=username).name
+                uuid, name = await get_profile_by_name(username)
             else:
-                name: str = MCUUID(uuid=username).name
+                name: str = await get_name(username)
                 uuid: str = username
                 if not name:
                     raise KeyError
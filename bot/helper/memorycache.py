@@ -0,0 +1,95 @@
+"""
+In-process LRU cache bounded by the size of the values it holds
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+
+class MemoryCache:
+    def __init__(self, max_bytes: int, ttl: float):
+        """
+        LRU cache of decoded values with a per entry expiry
+        :param max_bytes: the total size of values kept before evicting
+        :param ttl: the default amount of seconds a value is kept for
+        """
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+
+        self._entries: OrderedDict[Hashable, tuple[float, int, Any]] = OrderedDict()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+
+    def _pop(self, key: Hashable) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._size -= size
+
+
+    def get(self, key: Hashable) -> Any | None:
+        """
+        Returns a cached value or None if it isn't cached or has expired
+        :param key: the key the value was cached under
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[2]
+            self._pop(key)
+
+        self.misses += 1
+        return None
+
+
+    def set(self, key: Hashable, value: Any, size: int, ttl: float=None) -> None:
+        """
+        Caches a value, evicting the least recently used values if needed
+        :param key: the key to cache the value under
+        :param value: the value to cache, callers must not mutate it
+        :param size: the approximate size of the value in bytes
+        :param ttl: the amount of seconds to keep the value for (defaults to `self.ttl`)
+        """
+        if size > self.max_bytes:
+            return
+
+        if key in self._entries:
+            self._pop(key)
+
+        self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), size, value)
+        self._size += size
+
+        while self._size > self.max_bytes:
+            self._pop(next(iter(self._entries)))
+            self.evictions += 1
+
+
+    def delete(self, key: Hashable) -> None:
+        """
+        Removes a value from the cache if it is cached
+        :param key: the key the value was cached under
+        """
+        if key in self._entries:
+            self._pop(key)
+
+
+    def clear(self) -> None:
+        """Removes every value from the cache"""
+        self._entries.clear()
+        self._size = 0
+
+
+    def get_stats(self) -> dict:
+        """Returns the current usage of the cache"""
+        return {
+            'entries': len(self._entries),
+            'bytes': self._size,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions
+        }
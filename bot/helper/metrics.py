@@ -0,0 +1,28 @@
+"""
+Registry of in-memory statistics exposed by different parts of the bot
+"""
+
+from typing import Callable
+
+
+_providers: dict[str, Callable[[], dict]] = {}
+
+
+def register_stats(name: str, provider: Callable[[], dict]) -> None:
+    """
+    Registers a function that returns a snapshot of some statistics
+    :param name: the name the statistics will be listed under
+    :param provider: a callable returning a json serializable dict
+    """
+    _providers[name] = provider
+
+
+def get_stats(name: str=None) -> dict:
+    """
+    Returns a snapshot of all registered statistics
+    :param name: only return the statistics registered under this name
+    """
+    if name is not None:
+        provider = _providers.get(name)
+        return {name: provider()} if provider else {}
+    return {name: provider() for name, provider in _providers.items()}
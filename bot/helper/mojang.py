@@ -0,0 +1,207 @@
+"""
+Minecraft username and uuid resolution through mojang's api
+"""
+
+import os
+import time
+import asyncio
+from urllib.parse import quote
+
+import aiohttp
+
+from .database import connect_db, run_db
+from .singleflight import SingleFlight
+from .metrics import register_stats
+
+
+class MojangResolver:
+    NAME_URL = 'https://api.mojang.com/users/profiles/minecraft'
+    UUID_URL = 'https://sessionserver.mojang.com/session/minecraft/profile'
+
+    def __init__(self, path: str, ttl: float=86400, negative_ttl: float=600, timeout: float=5):
+        """
+        Resolves usernames and uuids, caching both directions in a local table
+        :param path: the path of the database file resolved players are stored in
+        :param ttl: the amount of seconds a resolved player is trusted for
+        :param negative_ttl: the amount of seconds an unknown player is remembered for
+        :param timeout: the amount of seconds before a request to mojang is abandoned
+        """
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.timeout = timeout
+
+        self._session: aiohttp.ClientSession | None = None
+        self._flight = SingleFlight()
+
+        self.hits = 0
+        self.misses = 0
+        self.negative_hits = 0
+        self.errors = 0
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with connect_db(self.path) as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS players '
+                '(uuid TEXT PRIMARY KEY, name TEXT, lower_name TEXT, updated REAL)')
+            conn.execute('CREATE INDEX IF NOT EXISTS players_lower_name ON players (lower_name)')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS unknown '
+                '(identifier TEXT PRIMARY KEY, expires REAL)')
+
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.timeout))
+        return self._session
+
+
+    def _lookup(self, column: str, value: str) -> tuple[str, str, float] | None:
+        with connect_db(self.path) as conn:
+            row = conn.execute(
+                f'SELECT uuid, name, updated FROM players WHERE {column} = ? '
+                'ORDER BY updated DESC', (value,)).fetchone()
+        return row
+
+
+    def _is_unknown(self, identifier: str) -> bool:
+        with connect_db(self.path) as conn:
+            row = conn.execute(
+                'SELECT 1 FROM unknown WHERE identifier = ? AND expires > ?',
+                (identifier, time.time())).fetchone()
+        return row is not None
+
+
+    def _store(self, uuid: str, name: str) -> None:
+        with connect_db(self.path) as conn:
+            # Usernames can be taken by another player once they are changed
+            conn.execute(
+                'DELETE FROM players WHERE lower_name = ? AND uuid != ?', (name.lower(), uuid))
+            conn.execute(
+                'INSERT OR REPLACE INTO players (uuid, name, lower_name, updated) VALUES (?, ?, ?, ?)',
+                (uuid, name, name.lower(), time.time()))
+
+
+    def _store_unknown(self, identifier: str) -> None:
+        with connect_db(self.path) as conn:
+            conn.execute('DELETE FROM unknown WHERE expires <= ?', (time.time(),))
+            conn.execute(
+                'INSERT OR REPLACE INTO unknown (identifier, expires) VALUES (?, ?)',
+                (identifier, time.time() + self.negative_ttl))
+
+
+    async def _fetch(self, url: str, identifier: str) -> tuple[str, str] | None:
+        """
+        Requests a profile from mojang and stores the result
+        :param url: the url of the profile
+        :param identifier: the lowercase username or uuid being resolved
+        """
+        try:
+            async with self.session.get(url) as response:
+                if response.status in (204, 404):
+                    await run_db(self._store_unknown, identifier)
+                    return None
+                response.raise_for_status()
+                data = await response.json(content_type=None)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            self.errors += 1
+            raise
+
+        await run_db(self._store, data['id'], data['name'])
+        return data['id'], data['name']
+
+
+    async def _resolve(self, column: str, value: str, url: str) -> tuple[str, str] | None:
+        # The local tables are read on the database threads like any other query
+        row = await run_db(self._lookup, column, value)
+        if row and row[2] + self.ttl > time.time():
+            self.hits += 1
+            return row[:2]
+
+        if await run_db(self._is_unknown, value):
+            self.negative_hits += 1
+            return None
+
+        self.misses += 1
+        try:
+            return await self._flight.do((column, value), self._fetch, url, value)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            # Fall back to an expired entry rather than failing while mojang is down
+            if row:
+                return row[:2]
+            raise
+
+
+    async def get_profile_by_name(self, name: str) -> tuple[str, str]:
+        """
+        Returns the uuid and properly capitalized username of a player.
+        Raises a `KeyError` if the player doesn't exist
+        :param name: the username of the player
+        """
+        # Names are typed by users, so they can't be allowed to change the endpoint
+        profile = await self._resolve(
+            'lower_name', name.lower(), f'{self.NAME_URL}/{quote(name, safe="")}')
+        if profile is None:
+            raise KeyError(name)
+        return profile
+
+
+    async def get_cached_profile(self, name: str) -> tuple[str, str] | None:
+        """
+        Returns the uuid and username of a player if they were resolved before,
+        never reaching out to mojang. Expired entries are still returned
+        :param name: the username of the player
+        """
+        row = await run_db(self._lookup, 'lower_name', name.lower())
+        return row[:2] if row else None
+
+
+    async def get_name(self, uuid: str) -> str | None:
+        """
+        Returns the properly capitalized username of a player
+        :param uuid: the uuid of the player
+        """
+        uuid = uuid.replace('-', '').lower()
+        profile = await self._resolve('uuid', uuid, f'{self.UUID_URL}/{quote(uuid, safe="")}')
+        return profile[1] if profile else None
+
+
+    async def close(self) -> None:
+        """Closes the connections to mojang's api"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+    def get_stats(self) -> dict:
+        """Returns the cache usage of the resolver"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'negative_hits': self.negative_hits,
+            'errors': self.errors,
+            'upstream': self._flight.get_stats()
+        }
+
+
+mojang_resolver = MojangResolver(os.path.abspath(f'{__file__}/../../cache/mojang.db'))
+register_stats('mojang', mojang_resolver.get_stats)
+
+
+async def get_profile_by_name(name: str) -> tuple[str, str]:
+    """
+    Returns the uuid and properly capitalized username of a player.
+    Raises a `KeyError` if the player doesn't exist
+    :param name: the username of the player
+    """
+    return await mojang_resolver.get_profile_by_name(name)
+
+
+async def get_name(uuid: str) -> str | None:
+    """
+    Returns the properly capitalized username of a player
+    :param uuid: the uuid of the player
+    """
+    return await mojang_resolver.get_name(uuid)
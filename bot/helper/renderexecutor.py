@@ -0,0 +1,211 @@
+"""
+Process pool used to render images off of the event loop
+"""
+
+import os
+import time
+import asyncio
+import functools
+import importlib
+import multiprocessing
+from io import BytesIO
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from .metrics import register_stats
+from .assetcache import preload_assets
+from .renderstore import RenderStore
+from .entitlements import entitlement_resolver
+from .tracing import tracer, current_command
+
+
+# Generic render modes keyed by the lowercase value used by `SelectModes`
+MODES = {mode.lower(): mode for mode in ('Overall', 'Solos', 'Doubles', 'Threes', 'Fours', '4v4')}
+
+# How many times each mode has been requested across all generic renders
+mode_requests = Counter()
+register_stats('mode_requests', lambda: dict(mode_requests))
+
+
+# Modules imported by every worker as soon as it is spawned, so the
+# first render a worker picks up isn't paying for the imports.
+WARM_MODULES = (
+    'helper.rendertools',
+    'helper.rendername',
+    'helper.renderprogress',
+    'render.average',
+    'render.bulk',
+    'render.compare',
+    'render.difference',
+    'render.historical',
+    'render.milestones',
+    'render.projection',
+    'render.resources',
+    'render.session',
+    'render.total',
+    'render.trends',
+    'render.year'
+)
+
+
+def _warm_worker(modules: tuple, preload: bool, generation) -> None:
+    """
+    Imports the render layer inside of a freshly spawned worker
+    :param modules: the module paths to import
+    :param preload: whether to load every asset and star sprite up front
+    :param generation: the entitlement invalidation generation of the bot process
+    """
+    entitlement_resolver.share_generation(generation)
+
+    for module in modules:
+        importlib.import_module(module)
+
+    if preload:
+        preload_assets()
+        from .rendername import prebake_stars
+        prebake_stars()
+
+
+def _noop() -> None:
+    """Used to force the pool to spawn its workers"""
+
+
+def _timed_render(render_func: object, submitted: float, kwargs: dict) -> tuple[BytesIO, float, float]:
+    """
+    Renders an image inside of a worker, returning the image along with how long
+    the render waited for a worker and how long the worker spent rendering it.
+    The stats calculation, drawing and png encoding all happen in this one call
+    :param render_func: the module level render function to call
+    :param submitted: the wall clock time the render was submitted at
+    :param kwargs: the keyword arguments to call the function with
+    """
+    queued = time.time() - submitted
+    start = time.perf_counter()
+    image = render_func(**kwargs)
+    return image, queued, time.perf_counter() - start
+
+
+class RenderExecutor:
+    def __init__(self, max_workers: int=None, preload_assets: bool=False):
+        """
+        Lazily created process pool for image rendering
+        :param max_workers: the amount of worker processes (defaults to cpu count)
+        :param preload_assets: whether workers load every asset when spawned
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.preload_assets = preload_assets
+        self._executor: ProcessPoolExecutor | None = None
+
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Spawn rather than fork, forking a process with a running
+            # event loop and a handful of threads can deadlock the child
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_warm_worker,
+                initargs=(WARM_MODULES, self.preload_assets, entitlement_resolver.generation)
+            )
+        return self._executor
+
+
+    async def start(self) -> None:
+        """Spawns and warms every worker ahead of the first render"""
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(
+            *(loop.run_in_executor(self.executor, _noop) for _ in range(self.max_workers)))
+
+
+    def submit(self, func: object, **kwargs) -> asyncio.Future:
+        """
+        Schedules a render on the pool and returns an awaitable for its result
+        :param func: the module level render function to call
+        :param **kwargs: the keyword arguments to call the function with
+        """
+        loop = asyncio.get_running_loop()
+        return loop.run_in_executor(self.executor, functools.partial(func, **kwargs))
+
+
+    def shutdown(self) -> None:
+        """Stops all workers, cancelling any renders that haven't started"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+class LazyRenders:
+    def __init__(self, executor: RenderExecutor, store: RenderStore,
+                 render_id: int, func: object, kwargs: dict):
+        """
+        Renders each mode of a generic render the first time it is requested.
+        The player data the render needs is held onto until the view expires
+        :param executor: the render executor to render with
+        :param store: the render store finished images are kept in
+        :param render_id: the id of the interaction being rendered for
+        :param func: the module level render function to call
+        :param kwargs: the keyword arguments needed to render the image
+        """
+        self._executor = executor
+        self._store = store
+        self._render_id = render_id
+        self._func = func
+        self._kwargs = kwargs
+        self._pending: dict[str, asyncio.Future] = {}
+
+        # Modes selected later on are still recorded under the command
+        self._command = current_command.get()
+
+        # Every mode selection replaces the view holding the renders,
+        # only the newest view may discard them once it times out
+        self.owner: object = None
+
+
+    async def get(self, mode: str) -> BytesIO:
+        """
+        Returns the rendered image of a mode, rendering it if needed
+        :param mode: the mode to render (overall, solos, etc)
+        """
+        mode = mode.lower()
+        mode_requests[mode] += 1
+
+        image = self._store.get(self._render_id, mode)
+        if image is not None:
+            return image
+
+        # Concurrent requests for the same mode share a single render
+        render = self._pending.get(mode)
+        submitter = render is None
+        if submitter:
+            render = self._executor.submit(
+                _timed_render, render_func=self._func, submitted=time.time(),
+                kwargs={'mode': MODES[mode], **self._kwargs})
+            self._pending[mode] = render
+
+        try:
+            image, queued, rendered = await asyncio.shield(render)
+            image_bytes = image.getvalue()
+        finally:
+            if render.done() and self._pending.get(mode) is render:
+                self._pending.pop(mode)
+
+        # Requests sharing a render only record it once
+        if submitter:
+            tracer.record('render.queue', queued, command=self._command)
+            tracer.record(f'render.{self._func.__name__}', rendered, command=self._command)
+
+        self._store.put(self._render_id, mode, image_bytes)
+        return BytesIO(image_bytes)
+
+
+    def cancel(self) -> None:
+        """Cancels all renders that haven't started yet"""
+        for render in self._pending.values():
+            render.cancel()
+
+
+    def discard(self) -> None:
+        """Cancels pending renders and frees all stored images"""
+        self.cancel()
+        self._store.discard(self._render_id)
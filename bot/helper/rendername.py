@@ -1,7 +1,8 @@
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw
 
 from .prescolor import get_prestige_colors
-from .rendertools import recolor_pixels
+from .rendertools import get_recolored
+from .assetcache import get_font
 
 
 color_map = {
@@ -45,6 +46,26 @@ def get_rank_prefix(player_rank_info: dict):
 
     return rank_prefix
 
+def get_star(level: int) -> Image.Image:
+    """
+    Returns the star sprite recolored for a level's prestige.
+    The returned image is shared and must not be drawn on
+    :param level: the level to get the star for
+    """
+    pos_colors = get_prestige_colors(level)
+    star_type = "0_to_1000" if level < 1100 else "1100_to_2000" if level < 2100 else\
+               "2100_to_3000" if level < 3100 else "3100_to_5000"
+
+    return get_recolored(
+        f'./assets/stars/{star_type}.png',
+        rgb_from=((214, 214, 214),),
+        rgb_to=(pos_colors if level < 1000 or level >= 10000 else pos_colors[5],))
+
+def prebake_stars() -> None:
+    """Recolors the star sprite of every prestige ahead of the first render"""
+    for level in (*range(0, 5100, 100), 10000):
+        get_star(level)
+
 def render_level(level: int, position_x: int, position_y: int, fontsize: int, image: Image):
     """
     Render the star for any given level (10000+ will be red)
@@ -54,20 +75,12 @@ def render_level(level: int, position_x: int, position_y: int, fontsize: int, im
     :param fontsize: The size of the font
     :param image: The image to render on
     """
-    font = ImageFont.truetype('./assets/minecraft.ttf', fontsize)
+    font = get_font(fontsize)
     pos_colors = get_prestige_colors(level)
     draw = ImageDraw.Draw(image)
 
     star_y = round(((fontsize - 17) / 2) + position_y)
-    star_type = "0_to_1000" if level < 1100 else "1100_to_2000" if level < 2100 else\
-               "2100_to_3000" if level < 3100 else "3100_to_5000"
-
-    star = Image.open(f'./assets/stars/{star_type}.png')
-    star = star.convert("RGBA")
-    star = recolor_pixels(
-        image=star,
-        rgb_from=((214, 214, 214),),
-        rgb_to=(pos_colors if level < 1000 or level >= 10000 else pos_colors[5],))
+    star = get_star(level)
 
     if level < 1000 or level >= 10000:
         draw.text((position_x + 2, position_y + 2), f"[{level}", fill=(0, 0, 0), font=font)
@@ -115,7 +128,7 @@ def render_rank(name: str, position_x: int, position_y: int, rank_prefix: str,
     :param fontsize: The size of the font
     """
 
-    font = ImageFont.truetype('./assets/minecraft.ttf', fontsize)
+    font = get_font(fontsize)
 
     rank = player_rank_info['rank']
     old_package_rank = player_rank_info['packageRank']
@@ -188,7 +201,7 @@ def render_level_and_name(name: str, level: int, player_rank_info: dict,
     box_x, box_width = box_positions
 
     draw = draw = ImageDraw.Draw(image)
-    font = ImageFont.truetype('./assets/minecraft.ttf', fontsize)
+    font = get_font(fontsize)
 
     rank_prefix = get_rank_prefix(player_rank_info)
     totallength = draw.textlength(f'[{level}] {rank_prefix}{name}', font=font) + 16
@@ -1,14 +1,15 @@
-from PIL import Image, ImageFont, ImageDraw
+from PIL import Image, ImageDraw
 
 from .rendername import render_level
+from .assetcache import get_font
 
 
 class Values:
-    minecraft_13 = ImageFont.truetype('./assets/minecraft.ttf', 13)
-    minecraft_16 = ImageFont.truetype('./assets/minecraft.ttf', 16)
-    minecraft_20 = ImageFont.truetype('./assets/minecraft.ttf', 20)
-    minecraft_22 = ImageFont.truetype('./assets/minecraft.ttf', 22)
-    arial_24 = ImageFont.truetype(f"./assets/arial.ttf", 24)
+    minecraft_13 = get_font(13)
+    minecraft_16 = get_font(16)
+    minecraft_20 = get_font(20)
+    minecraft_22 = get_font(22)
+    arial_24 = get_font(24, 'arial.ttf')
 
     white = (255, 255, 255)
     black = (0, 0, 0)
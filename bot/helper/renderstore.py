@@ -0,0 +1,126 @@
+"""
+Bounded in-memory store for rendered images
+"""
+
+import os
+import time
+import shutil
+from io import BytesIO
+from collections import OrderedDict
+
+
+class RenderStore:
+    def __init__(self, max_bytes: int, ttl: float, filesystem_fallback: bool=False,
+                 fallback_dir: str='./database/activerenders'):
+        """
+        LRU store of rendered PNGs keyed by interaction id and mode
+        :param max_bytes: the total size of images kept in memory before evicting
+        :param ttl: the amount of seconds an image is kept for
+        :param filesystem_fallback: whether to spill evicted images to disk
+        :param fallback_dir: the directory evicted images are spilled to
+        """
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.filesystem_fallback = filesystem_fallback
+        self.fallback_dir = fallback_dir
+
+        self._renders: OrderedDict[tuple[int, str], tuple[float, bytes]] = OrderedDict()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+
+    def _fallback_path(self, render_id: int, mode: str) -> str:
+        return f'{self.fallback_dir}/{render_id}/{mode}.png'
+
+
+    def _pop(self, key: tuple[int, str]) -> tuple[float, bytes]:
+        expires, image_bytes = self._renders.pop(key)
+        self._size -= len(image_bytes)
+        return expires, image_bytes
+
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        for key in [key for key, (expires, _) in self._renders.items() if expires <= now]:
+            self._pop(key)
+
+        while self._size > self.max_bytes and self._renders:
+            key = next(iter(self._renders))
+            _, image_bytes = self._pop(key)
+            self.evictions += 1
+
+            if self.filesystem_fallback:
+                os.makedirs(f'{self.fallback_dir}/{key[0]}', exist_ok=True)
+                with open(self._fallback_path(*key), 'wb') as image_file:
+                    image_file.write(image_bytes)
+
+
+    def put(self, render_id: int, mode: str, image_bytes: bytes) -> None:
+        """
+        Stores a rendered image
+        :param render_id: the id of the interaction the image was rendered for
+        :param mode: the mode of the rendered image (overall, solos, etc)
+        :param image_bytes: the encoded PNG image
+        """
+        key = (render_id, mode.lower())
+        if key in self._renders:
+            self._pop(key)
+
+        self._renders[key] = (time.monotonic() + self.ttl, image_bytes)
+        self._size += len(image_bytes)
+        self._evict()
+
+
+    def get(self, render_id: int, mode: str) -> BytesIO | None:
+        """
+        Returns a new buffer of a stored image or None if it isn't stored
+        :param render_id: the id of the interaction the image was rendered for
+        :param mode: the mode of the rendered image (overall, solos, etc)
+        """
+        key = (render_id, mode.lower())
+        render = self._renders.get(key)
+
+        if render and render[0] > time.monotonic():
+            self._renders.move_to_end(key)
+            self.hits += 1
+            return BytesIO(render[1])
+
+        if self.filesystem_fallback and os.path.isfile(self._fallback_path(*key)):
+            with open(self._fallback_path(*key), 'rb') as image_file:
+                self.hits += 1
+                return BytesIO(image_file.read())
+
+        self.misses += 1
+        return None
+
+
+    def discard(self, render_id: int) -> None:
+        """
+        Removes all images stored for an interaction
+        :param render_id: the id of the interaction the images were rendered for
+        """
+        for key in [key for key in self._renders if key[0] == render_id]:
+            self._pop(key)
+
+        if self.filesystem_fallback and os.path.isdir(f'{self.fallback_dir}/{render_id}'):
+            shutil.rmtree(f'{self.fallback_dir}/{render_id}')
+
+
+    def clear_fallback(self) -> None:
+        """Removes images left on disk from before the bot was restarted"""
+        if os.path.isdir(self.fallback_dir):
+            shutil.rmtree(self.fallback_dir)
+
+
+    def get_stats(self) -> dict:
+        """Returns the current usage of the store"""
+        return {
+            'images': len(self._renders),
+            'bytes': self._size,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions
+        }
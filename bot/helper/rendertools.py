@@ -1,14 +1,16 @@
 import os
-import time
-import sqlite3
 from io import BytesIO
+from functools import lru_cache
 
 import numpy as np
 from PIL import Image, UnidentifiedImageError, ImageDraw
 
 from .prescolor import ColorMaps
+from .assetcache import get_image
+from .metrics import register_stats
 from .linking import uuid_to_discord_id
-from .functions import get_subscription, get_config
+from .entitlements import entitlement_resolver
+from .functions import get_config
 
 
 def shadow(rgb: tuple) -> tuple[int, int, int]:
@@ -47,7 +49,7 @@ def paste_skin(skin_res, image: Image, positions: tuple) -> Image.Image:
     try:
         skin = Image.open(BytesIO(skin_res))
     except UnidentifiedImageError:
-        skin = Image.open('./assets/steve.png')
+        skin = get_image('./assets/steve.png')
 
     composite_image = Image.new("RGBA", image.size)
     composite_image.paste(skin, positions)
@@ -87,16 +89,39 @@ def recolor_pixels(image: Image.Image, rgb_from: tuple | list, rgb_to: tuple | l
     :param rgb_to: a list of RGB sets to recolor to
     """
     data = np.array(image) # "data" is a height x width x 4 numpy array
-    red, green, blue, _ = data.T
 
-    # Replace placeholder with other color... (leaves alpha values alone...)
-    for rgb_from_val, rgb_to_val in zip(rgb_from, rgb_to):
-        placeholders = (red == rgb_from_val[0]) & (green == rgb_from_val[1]) & (blue == rgb_from_val[2])
-        data[..., :-1][placeholders.T] = rgb_to_val
+    # View every pixel as a single integer with its alpha zeroed out
+    # (leaves alpha values alone...) so all colors are matched in one pass
+    rgb_mask = np.array((255, 255, 255, 0), dtype=np.uint8).view(np.uint32)
+    pixels = data.view(np.uint32)[..., 0] & rgb_mask
+
+    lut_from = np.array([(*rgb, 0) for rgb in rgb_from], dtype=np.uint8).view(np.uint32).ravel()
+    lut_to = np.array(rgb_to, dtype=np.uint8)
+    order = np.argsort(lut_from)
+    lut_from, lut_to = lut_from[order], lut_to[order]
+
+    placeholders = np.isin(pixels, lut_from)
+    data[placeholders, :3] = lut_to[np.searchsorted(lut_from, pixels[placeholders])]
 
     return Image.fromarray(data)
 
 
+@lru_cache(maxsize=512)
+def get_recolored(path: str, rgb_from: tuple, rgb_to: tuple) -> Image.Image:
+    """
+    Returns a recolored asset from the cache, recoloring it if needed.
+    The returned image is shared by every caller, so it must be copied
+    before it is drawn on
+    :param path: the path of the image file to recolor
+    :param rgb_from: a tuple of RGB sets to recolor from
+    :param rgb_to: a tuple of RGB sets to recolor to
+    """
+    return recolor_pixels(get_image(path), rgb_from=rgb_from, rgb_to=rgb_to)
+
+
+register_stats('recolor', lambda: get_recolored.cache_info()._asdict())
+
+
 def theme_color_sync_fusion(path: str, **kwargs) -> Image.Image:
     """
     Returns image for color sync fusion theme
@@ -110,29 +135,29 @@ def theme_color_sync_fusion(path: str, **kwargs) -> Image.Image:
     level_color = colors.color_map.get(level) if level < 1000 else colors.color_map_2.get(level)[0]
     rank_color = get_rank_color(rank_info)
 
-    image = Image.open(f'{path}/themes/color_sync_fusion.png')
-    image = image.convert('RGBA')
-
     rgb_from = ((213, 213, 213), (214, 214, 214))
-    rgb_to = (rank_color, level_color)
-    return recolor_pixels(image, rgb_from=rgb_from, rgb_to=rgb_to)
+    rgb_to = (tuple(rank_color), tuple(level_color))
+    return get_recolored(
+        f'{path}/themes/color_sync_fusion.png', rgb_from=rgb_from, rgb_to=rgb_to)
 
 
 def get_theme_img(theme: str, path: str, **kwargs) -> Image:
     """
     Returns an image based on a passed theme
+    The image may be shared and must be copied before drawing on it
     :param theme: The theme you are attempting to get
     :param **kwargs: any keyword arguments that may be needed for the theme
     """
     if theme == 'color_sync_fusion':
         return theme_color_sync_fusion(path=path, **kwargs)
     else:
-        return Image.open(f'{path}/themes/{theme}.png')
+        return get_image(f'{path}/themes/{theme}.png')
 
 
 def get_background(path, uuid, default, **kwargs):
     """
     Returns an background information based on the users setup
+    The image may be shared and must be copied before drawing on it
     :param path: The base path of the feature location
     :param uuid: The uuid of the player who's background you are getting
     :param default: The default file name of the background (excluding .png extension)
@@ -140,45 +165,24 @@ def get_background(path, uuid, default, **kwargs):
     """
     discord_id = uuid_to_discord_id(uuid)
     if not discord_id:
-        return Image.open(f'{path}/{default}.png')
+        return get_image(f'{path}/{default}.png')
 
-    subscription = get_subscription(discord_id)
-    subscription = '' if not subscription else subscription[1]
+    entitlements = entitlement_resolver.get(discord_id)
 
     # User has a pro subscription and a custom background
-    if 'pro' in subscription and os.path.exists(f'{path}/custom/{discord_id}.png'):
+    if 'pro' in entitlements.tier and os.path.exists(f'{path}/custom/{discord_id}.png'):
         return Image.open(f'{path}/custom/{discord_id}.png')
 
-    # Voting and rewards data for active theme pack
-    with sqlite3.connect('./database/voting.db') as conn:
-        cursor = conn.cursor()
-
-        cursor.execute(f'SELECT * FROM voting_data WHERE discord_id = {discord_id}')
-        voting_data = cursor.fetchone()
-
-        cursor.execute(f'SELECT * FROM rewards_data WHERE discord_id = {discord_id}')
-        rewards_data = cursor.fetchone()
-
-        cursor.execute(f'SELECT * FROM owned_themes WHERE discord_id = {discord_id}')
-        owned_themes = cursor.fetchone()
-
     voter_themes = get_config()['theme_packs']['voter_themes'].keys()
 
     # If the user has configured a theme
-    if rewards_data and rewards_data[1]:
-        # If the user has voted in the past 24 hours
-        current_time = time.time()
-        voted_recently = voting_data and ((current_time - voting_data[3]) / 3600 < 24)
-
-        theme = rewards_data[1]
-        if owned_themes:
-            owned_themes = owned_themes[1].split(',')
-
+    theme = entitlements.active_theme
+    if theme:
         # If the user has voted, is premium, or is using an exclusive theme
         is_exclusive = not theme in voter_themes
-        if voted_recently or subscription or is_exclusive:
+        if entitlements.voted_recently or entitlements.is_premium or is_exclusive:
             # Check if the user is using a selected unowned exclusive theme
-            if not is_exclusive or theme in owned_themes:
+            if not is_exclusive or theme in entitlements.owned_themes:
                 return get_theme_img(theme=theme, path=path, **kwargs)
 
-    return Image.open(f'{path}/{default}.png')
+    return get_image(f'{path}/{default}.png')
@@ -0,0 +1,543 @@
+"""
+Awaitable access to the databases, every query runs on the database threads
+"""
+
+import os
+import sys
+import time
+import sqlite3
+import asyncio
+import traceback
+import contextlib
+from collections import Counter, defaultdict
+from typing import Any, Callable
+
+from .metrics import register_stats
+from .memorycache import MemoryCache
+from .usernameindex import username_index
+from .database import connect_db, run_db
+
+
+DATABASE_PATH = os.path.abspath(f'{__file__}/../../database')
+
+
+class Repository:
+    def __init__(self, name: str):
+        """
+        Base of the repositories of a single database file
+        :param name: the file name of the database inside of the database directory
+        """
+        self.path = f'{DATABASE_PATH}/{name}'
+
+
+    def _call_site(self) -> str:
+        # The repository method awaiting the query is two frames up
+        return f'{type(self).__name__}.{sys._getframe(2).f_code.co_name}'
+
+
+    def _query(self, call_site: str, query: str, params: tuple, fetch: str | None):
+        with connect_db(self.path, call_site) as conn:
+            cursor = conn.execute(query, params)
+            if fetch == 'one':
+                return cursor.fetchone()
+            if fetch == 'all':
+                return cursor.fetchall()
+            return cursor.rowcount
+
+
+    def _transaction(self, call_site: str, func: Callable, args: tuple):
+        with connect_db(self.path, call_site) as conn:
+            return func(conn.cursor(), *args)
+
+
+    async def fetchone(self, query: str, params: tuple=()) -> tuple | None:
+        """
+        Returns the first row selected by a parameterized query
+        :param query: the query to run
+        :param params: the parameters of the query
+        """
+        return await run_db(self._query, self._call_site(), query, params, 'one')
+
+
+    async def fetchall(self, query: str, params: tuple=()) -> list[tuple]:
+        """
+        Returns every row selected by a parameterized query
+        :param query: the query to run
+        :param params: the parameters of the query
+        """
+        return await run_db(self._query, self._call_site(), query, params, 'all')
+
+
+    async def execute(self, query: str, params: tuple=()) -> int:
+        """
+        Runs a parameterized query and returns the amount of rows it changed
+        :param query: the query to run
+        :param params: the parameters of the query
+        """
+        return await run_db(self._query, self._call_site(), query, params, None)
+
+
+    async def transaction(self, func: Callable[..., Any], *args) -> Any:
+        """
+        Runs `func(cursor, *args)` on the database threads inside of a single transaction
+        :param func: the function running the queries
+        """
+        return await run_db(self._transaction, self._call_site(), func, args)
+
+
+class LinkingRepository(Repository):
+    def __init__(self):
+        super().__init__('linked_accounts.db')
+        self.autofill_path = f'{DATABASE_PATH}/autofill.db'
+
+
+    async def get_linked_data(self, discord_id: int) -> tuple | None:
+        """
+        Returns a users linked data
+        :param discord_id: the discord id of the user
+        """
+        return await self.fetchone(
+            'SELECT * FROM linked_accounts WHERE discord_id = ?', (discord_id,))
+
+
+    async def uuid_to_discord_id(self, uuid: str) -> int | None:
+        """
+        Returns the discord id linked to a player
+        :param uuid: the uuid of the player
+        """
+        row = await self.fetchone('SELECT discord_id FROM linked_accounts WHERE uuid = ?', (uuid,))
+        return row[0] if row else None
+
+
+    async def delete_linked_data(self, discord_id: int) -> bool:
+        """
+        Unlinks a discord user and returns whether they had a linked account
+        :param discord_id: the discord id of the user
+        """
+        return await self.execute(
+            'DELETE FROM linked_accounts WHERE discord_id = ?', (discord_id,)) > 0
+
+
+    async def count_linked_accounts(self) -> int:
+        """Returns the amount of linked accounts"""
+        row = await self.fetchone('SELECT COUNT(discord_id) FROM linked_accounts')
+        return row[0]
+
+
+    async def set_linked_data(self, discord_id: int, uuid: str) -> None:
+        """
+        Links a discord user to a player
+        :param discord_id: the discord id of the user
+        :param uuid: the uuid of the player
+        """
+        from .linking import set_linked_data
+        await run_db(set_linked_data, discord_id, uuid)
+
+
+    async def update_autofill(self, discord_id: int, uuid: str, username: str) -> None:
+        """
+        Updates the autofilled username of a subscribed user
+        :param discord_id: the discord id of the user
+        :param uuid: the uuid of the user's linked player
+        :param username: the current username of the player
+        """
+        from .linking import update_autofill
+        await run_db(update_autofill, discord_id, uuid, username)
+
+
+    def _load_username_index(self) -> None:
+        with connect_db(self.autofill_path, 'LinkingRepository.load_username_index') as conn:
+            rows = conn.execute('SELECT discord_id, username FROM autofill').fetchall()
+        username_index.load(rows)
+
+
+    async def load_username_index(self) -> None:
+        """Builds the in-memory username index from the autofill database"""
+        await run_db(self._load_username_index)
+
+
+    async def search_autofill(self, current: str, limit: int=25) -> list[str]:
+        """
+        Returns autofilled usernames containing the current input, prefix matches first
+        :param current: the text typed so far
+        :param limit: the maximum amount of usernames to return
+        """
+        if not username_index.loaded:
+            await self.load_username_index()
+        return username_index.search(current, limit)
+
+
+class SessionRepository(Repository):
+    def __init__(self, ttl: float=3600, max_players: int=20000):
+        """
+        Sessions of players, the ids of each player's sessions are cached
+        and kept in sync by every session write made through the repository
+        :param ttl: the amount of seconds the session ids of a player are cached for
+        :param max_players: the maximum amount of players with cached session ids
+        """
+        super().__init__('sessions.db')
+        # Every player is counted as one byte, capping the cache by players
+        self._session_ids = MemoryCache(max_bytes=max_players, ttl=ttl)
+        self._warming: set[str] = set()
+        # Bumped on every session write of a player, so ids read
+        # from the database before the write aren't cached after it
+        self._generations: Counter[str] = Counter()
+
+
+    async def get_session(self, uuid: str, session: int) -> tuple | None:
+        """
+        Returns a session of a player
+        :param uuid: the uuid of the player
+        :param session: the id of the session
+        """
+        return await self.fetchone(
+            'SELECT * FROM sessions WHERE session = ? AND uuid = ?', (session, uuid))
+
+
+    async def get_session_ids(self, uuid: str) -> list[int]:
+        """
+        Returns the ids of every session of a player in ascending order
+        :param uuid: the uuid of the player
+        """
+        session_ids = self._session_ids.get(uuid)
+        if session_ids is None:
+            generation = self._generations[uuid]
+            rows = await self.fetchall(
+                'SELECT session FROM sessions WHERE uuid = ? ORDER BY session ASC', (uuid,))
+            session_ids = tuple(row[0] for row in rows)
+
+            if self._generations[uuid] == generation:
+                self._session_ids.set(uuid, session_ids, size=1)
+        return list(session_ids)
+
+
+    async def _warm_session_ids(self, uuid: str) -> None:
+        try:
+            await self.get_session_ids(uuid)
+        finally:
+            self._warming.discard(uuid)
+
+
+    def get_cached_session_ids(self, uuid: str) -> list[int] | None:
+        """
+        Returns the cached session ids of a player without querying the database.
+        On a miss None is returned and the ids are loaded in the background
+        :param uuid: the uuid of the player
+        """
+        session_ids = self._session_ids.get(uuid)
+        if session_ids is not None:
+            return list(session_ids)
+
+        if uuid not in self._warming:
+            self._warming.add(uuid)
+            asyncio.get_running_loop().create_task(self._warm_session_ids(uuid))
+        return None
+
+
+    def _update_session_ids(self, uuid: str, session: int, add: bool) -> None:
+        self._generations[uuid] += 1
+        session_ids = self._session_ids.get(uuid)
+        if session_ids is None:
+            return
+
+        session_ids = set(session_ids)
+        if add:
+            session_ids.add(session)
+        else:
+            session_ids.discard(session)
+        self._session_ids.set(uuid, tuple(sorted(session_ids)), size=1)
+
+
+    def get_cache_stats(self) -> dict:
+        """Returns the usage of the session id cache"""
+        return self._session_ids.get_stats()
+
+
+    async def delete_session(self, uuid: str, session: int) -> None:
+        """
+        Deletes a session of a player
+        :param uuid: the uuid of the player
+        :param session: the id of the session
+        """
+        await self.execute('DELETE FROM sessions WHERE session = ? AND uuid = ?', (session, uuid))
+        self._update_session_ids(uuid, session, add=False)
+
+
+    @staticmethod
+    def _save_session(cursor: sqlite3.Cursor, stat_values: dict) -> None:
+        session, uuid = stat_values['session'], stat_values['uuid']
+
+        cursor.execute('SELECT 1 FROM sessions WHERE session = ? AND uuid = ?', (session, uuid))
+        if not cursor.fetchone():
+            columns = ', '.join(stat_values.keys())
+            values = ', '.join(['?' for _ in stat_values.values()])
+            cursor.execute(
+                f'INSERT INTO sessions ({columns}) VALUES ({values})', tuple(stat_values.values()))
+        else:
+            set_clause = ', '.join([f'{column} = ?' for column in stat_values.keys()])
+            cursor.execute(
+                f'UPDATE sessions SET {set_clause} WHERE session = ? AND uuid = ?',
+                (*stat_values.values(), session, uuid))
+
+
+    async def save_session(self, stat_values: dict) -> None:
+        """
+        Creates or overwrites a session with the starting stats of a player
+        :param stat_values: the session, uuid, date, level and tracked stats of the session
+        """
+        await self.transaction(self._save_session, stat_values)
+        self._update_session_ids(stat_values['uuid'], stat_values['session'], add=True)
+
+
+class HistoricalRepository(Repository):
+    def __init__(self):
+        super().__init__('historical.db')
+
+
+    async def get_reset_time(self, uuid: str) -> tuple:
+        """
+        Returns the GMT offset and hour historical stats of a player reset at
+        :param uuid: the uuid of the player
+        """
+        from .historical import get_reset_time
+        return await run_db(get_reset_time, uuid)
+
+
+    async def get_historical(self, uuid: str, method: str) -> tuple | None:
+        """
+        Returns the starting stats of a player's current historical period
+        :param uuid: the uuid of the player
+        :param method: the historical type (daily, weekly, etc)
+        """
+        from .historical import get_historical
+        return await run_db(get_historical, uuid, method)
+
+
+    async def get_snapshot(self, uuid: str, period_type: str, period_key: str) -> dict | None:
+        """
+        Returns the snapshot of a player for a single period or None if it wasn't tracked
+        :param uuid: the uuid of the player
+        :param period_type: the historical type of the period (daily, weekly, etc)
+        :param period_key: the key of the period (2023_07_14, 2023_28, etc)
+        """
+        from .historical import get_snapshot
+        return await run_db(get_snapshot, uuid, period_type, period_key)
+
+
+    async def get_lookback_eligibility(self, discord_id_primary: int, discord_id_secondary: int) -> int:
+        """
+        Returns the amount of days back a user can check a player's historical stats
+        :param discord_id_primary: the linked discord account of the player
+        :param discord_id_secondary: the interaction user's discord id
+        """
+        from .historical import get_lookback_eligiblility
+        return await run_db(get_lookback_eligiblility, discord_id_primary, discord_id_secondary)
+
+
+class VotingRepository(Repository):
+    def __init__(self):
+        super().__init__('voting.db')
+
+
+    async def get_voting_data(self, discord_id: int) -> tuple | None:
+        """
+        Returns a users voting data
+        :param discord_id: the discord id of the user
+        """
+        return await self.fetchone('SELECT * FROM voting_data WHERE discord_id = ?', (discord_id,))
+
+
+class UsageRepository(Repository):
+    def __init__(self, max_pending: int=1000):
+        """
+        Counts commands ran in memory and writes them behind in batches
+        :param max_pending: the amount of counted users and commands that triggers an early flush
+        """
+        super().__init__('command_usage.db')
+        self.max_pending = max_pending
+
+        self._pending: defaultdict[tuple[int, str], int] = defaultdict(int)
+        self._flushing: dict[tuple[int, str], int] = {}
+        self._task: asyncio.Task | None = None
+        self._wake = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+
+        self.flushes = 0
+        self.rows_flushed = 0
+        self.flush_time = 0.0
+
+
+    @staticmethod
+    def _create_usage_table(cursor: sqlite3.Cursor) -> None:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
+        tables = [row[0] for row in cursor.fetchall()]
+        if 'command_usage' in tables:
+            return
+
+        # Discord id 0 holds the totals of every user and the
+        # `overall` command holds the total of every command
+        cursor.execute(
+            'CREATE TABLE command_usage (discord_id INTEGER, command TEXT, '
+            'count INTEGER, PRIMARY KEY (discord_id, command)) WITHOUT ROWID')
+        cursor.execute('CREATE INDEX command_usage_command ON command_usage (command)')
+
+        # Move the counts of the old table per command layout over
+        for table in tables:
+            cursor.execute(
+                f'INSERT INTO command_usage (discord_id, command, count) '
+                f'SELECT discord_id, ?, commands_ran FROM "{table}"', (table,))
+            cursor.execute(f'DROP TABLE "{table}"')
+
+
+    def _flush(self, counts: dict[tuple[int, str], int]) -> None:
+        start = time.perf_counter()
+
+        with connect_db(self.path, 'UsageRepository.flush') as conn:
+            conn.executemany(
+                'INSERT INTO command_usage (discord_id, command, count) VALUES (?, ?, ?) '
+                'ON CONFLICT (discord_id, command) DO UPDATE SET count = count + excluded.count',
+                [(discord_id, command, count) for (discord_id, command), count in counts.items()])
+
+        self.flushes += 1
+        self.rows_flushed += len(counts)
+        self.flush_time += time.perf_counter() - start
+
+
+    async def flush(self) -> None:
+        """
+        Writes every pending count to the database in a single transaction,
+        a flush already in progress is waited for before the next one starts
+        """
+        async with self._flush_lock:
+            if not self._pending:
+                return
+
+            self._flushing, self._pending = self._pending, defaultdict(int)
+            try:
+                await run_db(self._flush, self._flushing)
+            except Exception:
+                # Keep the counts for the next flush
+                for key, count in self._flushing.items():
+                    self._pending[key] += count
+                raise
+            finally:
+                self._flushing = {}
+
+
+    async def _flush_loop(self, flush_interval: float) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+            # Stopping the loop mustn't abandon a write that's already running
+            try:
+                await asyncio.shield(self.flush())
+            except Exception:
+                traceback.print_exc()
+
+
+    async def start(self, flush_interval: float) -> None:
+        """
+        Creates the usage table if needed and starts flushing the pending counts periodically
+        :param flush_interval: the seconds between each flush
+        """
+        await self.transaction(self._create_usage_table)
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._flush_loop(flush_interval))
+
+
+    async def close(self) -> None:
+        """
+        Stops the periodic flushes and writes the remaining counts,
+        waiting for a flush that's in progress to finish first
+        """
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+        while self._pending:
+            await self.flush()
+
+
+    def queue_command_stats(self, discord_id: int, command: str) -> None:
+        """
+        Counts a command ran by a user, the count is saved with the next flush
+        :param discord_id: the discord id of the user
+        :param command: the name of the command
+        """
+        for key in ((discord_id, command), (discord_id, 'overall'), (0, command), (0, 'overall')):
+            self._pending[key] += 1
+
+        if len(self._pending) >= self.max_pending:
+            self._wake.set()
+
+
+    def _get_pending(self, discord_id: int) -> dict[str, int]:
+        pending = defaultdict(int)
+        for (pending_id, command), count in self._pending.items():
+            if pending_id == discord_id:
+                pending[command] += count
+        return pending
+
+
+    async def get_user_usage(self, discord_id: int) -> dict[str, int]:
+        """
+        Returns the amount of times a user ran each command, `overall` holds the total.
+        Counts that haven't been flushed yet are included
+        :param discord_id: the discord id of the user
+        """
+        # No flush can move the pending counts into the table while they're read
+        async with self._flush_lock:
+            pending = self._get_pending(discord_id)
+            rows = await self.fetchall(
+                'SELECT command, count FROM command_usage WHERE discord_id = ?', (discord_id,))
+
+        usage = dict(rows)
+        for command, count in pending.items():
+            usage[command] = usage.get(command, 0) + count
+        return usage
+
+
+    async def get_total_commands(self) -> int:
+        """Returns the amount of commands ran by every user, including unflushed counts"""
+        async with self._flush_lock:
+            pending = self._get_pending(0).get('overall', 0)
+            row = await self.fetchone(
+                "SELECT count FROM command_usage WHERE discord_id = 0 AND command = 'overall'")
+        return (row[0] if row else 0) + pending
+
+
+    async def get_command_users(self) -> int:
+        """
+        Returns the amount of users to have run a command. The pending counts
+        are flushed first, since users that are new to them can't be told apart
+        from users that are already saved without reading the database
+        """
+        await self.flush()
+        row = await self.fetchone(
+            "SELECT COUNT(*) FROM command_usage WHERE command = 'overall' AND discord_id != 0")
+        return row[0]
+
+
+    def get_usage_stats(self) -> dict:
+        """Returns the pending counts and the flushes done so far"""
+        return {
+            'pending': len(self._pending),
+            'flushes': self.flushes,
+            'rows_flushed': self.rows_flushed,
+            'flush_ms': round(self.flush_time * 1000, 2)
+        }
+
+
+linking_repo = LinkingRepository()
+session_repo = SessionRepository()
+historical_repo = HistoricalRepository()
+voting_repo = VotingRepository()
+usage_repo = UsageRepository()
+register_stats('command_usage', usage_repo.get_usage_stats)
+register_stats('session_ids', session_repo.get_cache_stats)
@@ -0,0 +1,266 @@
+"""
+Versioned schemas of the bot's databases and the plans of their hot queries
+"""
+
+import os
+import sqlite3
+from typing import Callable
+
+from .database import connect_db
+from .functions import get_config
+from .historical import RESET_TYPES, _create_reset_schedule, _create_snapshot_table
+from .repositories import UsageRepository
+
+
+DATABASE_PATH = os.path.abspath(f'{__file__}/../../database')
+
+
+def _stat_columns(kind: str='INTEGER') -> str:
+    return ', '.join([f'{key} {kind}' for key in get_config()['tracked_bedwars_stats']])
+
+
+def _is_indexed(cursor: sqlite3.Cursor, table: str, columns: tuple) -> bool:
+    """
+    Returns whether an existing index (or the rowid) leads with the given columns
+    :param cursor: the cursor of the database
+    :param table: the table the columns are in
+    :param columns: the columns that are searched by, in order
+    """
+    # An INTEGER PRIMARY KEY is an alias of the rowid
+    primary_keys = [row for row in cursor.execute(f'PRAGMA table_info("{table}")') if row[5]]
+    if (len(primary_keys) == 1 and primary_keys[0][2].upper() == 'INTEGER'
+            and primary_keys[0][1] == columns[0] and len(columns) == 1):
+        return True
+
+    for index in cursor.execute(f'PRAGMA index_list("{table}")').fetchall():
+        indexed = [row[2] for row in cursor.execute(f'PRAGMA index_info("{index[1]}")')]
+        if tuple(indexed[:len(columns)]) == tuple(columns):
+            return True
+    return False
+
+
+def _ensure_index(cursor: sqlite3.Cursor, table: str, *columns: str) -> None:
+    """
+    Indexes columns of a table unless an existing index already covers them,
+    tables created before the schema was versioned may be missing their keys
+    :param cursor: the cursor of the database
+    :param table: the table to index
+    :param *columns: the columns to index, in order
+    """
+    if not _is_indexed(cursor, table, columns):
+        cursor.execute(
+            f'CREATE INDEX "{table}_{"_".join(columns)}" ON "{table}" ({", ".join(columns)})')
+
+
+def _add_missing_columns(cursor: sqlite3.Cursor, table: str, columns: dict) -> None:
+    """
+    Adds newly tracked stats to a table
+    :param cursor: the cursor of the database
+    :param table: the table to add the columns to
+    :param columns: the type of each column keyed by name
+    """
+    existing = {row[1] for row in cursor.execute(f'PRAGMA table_info("{table}")')}
+    for column, kind in columns.items():
+        if column not in existing:
+            cursor.execute(f'ALTER TABLE "{table}" ADD COLUMN {column} {kind}')
+
+
+def _linked_accounts_v1(cursor: sqlite3.Cursor) -> None:
+    cursor.execute(
+        'CREATE TABLE IF NOT EXISTS linked_accounts (discord_id INTEGER PRIMARY KEY, uuid TEXT)')
+    _ensure_index(cursor, 'linked_accounts', 'discord_id')
+    _ensure_index(cursor, 'linked_accounts', 'uuid')
+
+
+def _autofill_v1(cursor: sqlite3.Cursor) -> None:
+    cursor.execute(
+        'CREATE TABLE IF NOT EXISTS autofill (discord_id INTEGER PRIMARY KEY, uuid TEXT, username TEXT)')
+    _ensure_index(cursor, 'autofill', 'discord_id')
+
+
+def _sessions_v1(cursor: sqlite3.Cursor) -> None:
+    cursor.execute(
+        f'CREATE TABLE IF NOT EXISTS sessions (session INTEGER, uuid TEXT, date TEXT, '
+        f'level REAL, {_stat_columns()})')
+    _ensure_index(cursor, 'sessions', 'uuid', 'session')
+
+
+def _subscriptions_v1(cursor: sqlite3.Cursor) -> None:
+    cursor.execute(
+        'CREATE TABLE IF NOT EXISTS subscriptions (discord_id INTEGER PRIMARY KEY, '
+        'package TEXT, expires INTEGER)')
+    _ensure_index(cursor, 'subscriptions', 'discord_id')
+
+
+def _voting_v1(cursor: sqlite3.Cursor) -> None:
+    cursor.execute(
+        'CREATE TABLE IF NOT EXISTS voting_data (discord_id INTEGER PRIMARY KEY, '
+        'total_votes INTEGER, weekend_votes INTEGER, last_vote REAL)')
+    cursor.execute(
+        'CREATE TABLE IF NOT EXISTS rewards_data (discord_id INTEGER PRIMARY KEY, enabled_theme TEXT)')
+    cursor.execute(
+        'CREATE TABLE IF NOT EXISTS owned_themes (discord_id INTEGER PRIMARY KEY, owned_themes TEXT)')
+
+    for table in ('voting_data', 'rewards_data', 'owned_themes'):
+        _ensure_index(cursor, table, 'discord_id')
+
+
+def _historical_v1(cursor: sqlite3.Cursor) -> None:
+    cursor.execute(
+        'CREATE TABLE IF NOT EXISTS default_reset_times (uuid TEXT PRIMARY KEY, '
+        'timezone INTEGER, reset_hour INTEGER)')
+    cursor.execute(
+        'CREATE TABLE IF NOT EXISTS configuration (discord_id INTEGER PRIMARY KEY, '
+        'timezone INTEGER, reset_hour INTEGER)')
+    _ensure_index(cursor, 'default_reset_times', 'uuid')
+    _ensure_index(cursor, 'configuration', 'discord_id')
+
+    for method in RESET_TYPES:
+        cursor.execute(
+            f'CREATE TABLE IF NOT EXISTS {method} (uuid TEXT PRIMARY KEY, level REAL, {_stat_columns()})')
+        _ensure_index(cursor, method, 'uuid')
+
+    _create_reset_schedule(cursor)
+    _create_snapshot_table(cursor)
+
+
+# Migrations of each database keyed by file name, as pairs of the version
+# a migration brings the database to and the function applying it. The
+# version of a database is stored in its `user_version` pragma.
+MIGRATIONS: dict[str, list[tuple[int, Callable[[sqlite3.Cursor], None]]]] = {
+    'linked_accounts.db': [(1, _linked_accounts_v1)],
+    'autofill.db': [(1, _autofill_v1)],
+    'sessions.db': [(1, _sessions_v1)],
+    'subscriptions.db': [(1, _subscriptions_v1)],
+    'voting.db': [(1, _voting_v1)],
+    'historical.db': [(1, _historical_v1)],
+    'command_usage.db': [(1, UsageRepository._create_usage_table)],
+}
+
+# Tables with a column per tracked stat, new stats are added on every migration
+STAT_TABLES = {
+    'sessions.db': ('sessions',),
+    'historical.db': (*RESET_TYPES, 'snapshots'),
+}
+
+
+def get_schema_version(name: str) -> int:
+    """
+    Returns the schema version of a database
+    :param name: the file name of the database
+    """
+    with connect_db(f'{DATABASE_PATH}/{name}') as conn:
+        return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def migrate_database(name: str) -> list[int]:
+    """
+    Applies the pending migrations of a database in a single transaction
+    and returns the versions that were applied
+    :param name: the file name of the database
+    """
+    applied = []
+    with connect_db(f'{DATABASE_PATH}/{name}') as conn:
+        cursor = conn.cursor()
+        # Table changes aren't wrapped in a transaction implicitly
+        cursor.execute('BEGIN')
+        version = cursor.execute('PRAGMA user_version').fetchone()[0]
+
+        for target, migration in MIGRATIONS[name]:
+            if target > version:
+                migration(cursor)
+                applied.append(target)
+                version = target
+
+        stat_columns = {key: 'INTEGER' for key in get_config()['tracked_bedwars_stats']}
+        for table in STAT_TABLES.get(name, ()):
+            _add_missing_columns(cursor, table, stat_columns)
+
+        # Pragmas can't be parameterized, the version is always an int
+        cursor.execute(f'PRAGMA user_version = {int(version)}')
+    return applied
+
+
+def migrate_databases() -> dict[str, list[int]]:
+    """Applies the pending migrations of every database"""
+    os.makedirs(DATABASE_PATH, exist_ok=True)
+    return {name: migrate_database(name) for name in MIGRATIONS}
+
+
+# Queries run on every command or render, as the database, the function
+# running the query and the query. Queries reading a whole table on
+# purpose are marked so their scan isn't flagged.
+HOT_QUERIES = (
+    ('linked_accounts.db', 'get_linked_data',
+     'SELECT * FROM linked_accounts WHERE discord_id = ?', False),
+    ('linked_accounts.db', 'uuid_to_discord_id',
+     'SELECT discord_id FROM linked_accounts WHERE uuid = ?', False),
+    ('linked_accounts.db', 'count_linked_accounts',
+     'SELECT COUNT(discord_id) FROM linked_accounts', True),
+    ('autofill.db', 'update_autofill',
+     'SELECT * FROM autofill WHERE discord_id = ?', False),
+    ('autofill.db', 'load_username_index',
+     'SELECT discord_id, username FROM autofill', True),
+    ('sessions.db', 'get_session',
+     'SELECT * FROM sessions WHERE session = ? AND uuid = ?', False),
+    ('sessions.db', 'get_session_ids',
+     'SELECT session FROM sessions WHERE uuid = ? ORDER BY session ASC', False),
+    ('subscriptions.db', 'EntitlementResolver._resolve',
+     'SELECT * FROM subscriptions WHERE discord_id = ?', False),
+    ('voting.db', 'EntitlementResolver._resolve',
+     'SELECT * FROM voting_data WHERE discord_id = ?', False),
+    ('voting.db', 'EntitlementResolver._resolve',
+     'SELECT enabled_theme FROM rewards_data WHERE discord_id = ?', False),
+    ('voting.db', 'EntitlementResolver._resolve',
+     'SELECT owned_themes FROM owned_themes WHERE discord_id = ?', False),
+    ('historical.db', 'get_reset_time_default',
+     'SELECT * FROM default_reset_times WHERE uuid = ?', False),
+    ('historical.db', 'get_reset_time_configured',
+     'SELECT * FROM configuration WHERE discord_id = ?', False),
+    *(('historical.db', 'get_historical', f'SELECT * FROM {method} WHERE uuid = ?', False)
+      for method in RESET_TYPES),
+    *(('historical.db', 'get_due_players',
+       f'SELECT reset_schedule.timezone, reset_schedule.reset_hour, reset_schedule.next_reset, '
+       f'{method}.* FROM reset_schedule JOIN {method} ON {method}.uuid = reset_schedule.uuid '
+       'WHERE reset_schedule.method = ? AND reset_schedule.next_reset <= ?', False)
+      for method in RESET_TYPES),
+    ('historical.db', 'get_snapshots',
+     'SELECT * FROM snapshots WHERE uuid = ? AND period_type = ? '
+     'AND period_key BETWEEN ? AND ? ORDER BY period_key', False),
+    ('historical.db', 'get_snapshots',
+     'SELECT period_key, schema_version, data FROM snapshot_archive WHERE uuid = ? '
+     'AND period_type = ? AND period_key BETWEEN ? AND ? ORDER BY period_key', False),
+    ('command_usage.db', 'get_user_usage',
+     'SELECT command, count FROM command_usage WHERE discord_id = ?', False),
+    ('command_usage.db', 'get_total_commands',
+     "SELECT count FROM command_usage WHERE discord_id = 0 AND command = 'overall'", False),
+    ('command_usage.db', 'get_command_users',
+     "SELECT COUNT(*) FROM command_usage WHERE command = 'overall' AND discord_id != 0", False),
+)
+
+
+def check_query_plans() -> list[dict]:
+    """
+    Returns the query plan of every hot query, flagging the full table scans.
+    Each plan holds the database, call site, query, plan steps and whether it was flagged
+    """
+    plans = []
+    for name, call_site, query, scan_expected in HOT_QUERIES:
+        plan = {'database': name, 'call_site': call_site, 'query': query}
+
+        with connect_db(f'{DATABASE_PATH}/{name}') as conn:
+            try:
+                rows = conn.execute(
+                    f'EXPLAIN QUERY PLAN {query}', (None,) * query.count('?')).fetchall()
+            except sqlite3.OperationalError as error:
+                plans.append({**plan, 'steps': [], 'error': str(error), 'flagged': True})
+                continue
+
+        # A search uses an index, a scan reads every row of the table
+        # (a covering index scan still reads every row of the index)
+        steps = [row[3] for row in rows]
+        scans = [step for step in steps if step.startswith('SCAN')
+                 and not step.startswith('SCAN CONSTANT')]
+        plans.append({**plan, 'steps': steps, 'error': None,
+                      'flagged': bool(scans) and not scan_expected})
+    return plans
@@ -0,0 +1,56 @@
+"""
+Deduplication of concurrent calls that would fetch the same resource
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Hashable
+
+
+class SingleFlight:
+    def __init__(self):
+        """
+        Shares one in-flight call between every caller requesting the same key
+        """
+        self._calls: dict[Hashable, asyncio.Future] = {}
+        self.calls = 0
+        self.saved = 0
+
+
+    def _done(self, key: Hashable, call: asyncio.Future) -> None:
+        if self._calls.get(key) is call:
+            self._calls.pop(key)
+
+        # Mark the exception as retrieved in case every caller was cancelled
+        if not call.cancelled():
+            call.exception()
+
+
+    async def do(self, key: Hashable, func: Callable[..., Awaitable], *args, **kwargs):
+        """
+        Awaits `func(*args, **kwargs)` unless a call with the same key is
+        already in flight, in which case the result of that call is returned
+        :param key: the key identifying the resource being fetched
+        :param func: the coroutine function fetching the resource
+        """
+        self.calls += 1
+
+        call = self._calls.get(key)
+        if call is None:
+            call = asyncio.ensure_future(func(*args, **kwargs))
+            call.add_done_callback(lambda call: self._done(key, call))
+            self._calls[key] = call
+        else:
+            self.saved += 1
+
+        # A caller being cancelled shouldn't cancel the call for the others
+        return await asyncio.shield(call)
+
+
+    def get_stats(self) -> dict:
+        """Returns how many calls were made and how many upstream calls were saved"""
+        return {
+            'calls': self.calls,
+            'upstream_calls': self.calls - self.saved,
+            'saved': self.saved,
+            'in_flight': len(self._calls)
+        }
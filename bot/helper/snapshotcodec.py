@@ -0,0 +1,59 @@
+"""
+Compact encoding of archived historical stat vectors
+"""
+
+
+# Most of the stats gained during a single period are zero, so the
+# vector is stored as a bitmap of the non zero stats followed by
+# those stats as zigzag encoded varints (stats can be negative)
+def encode_stats(values: list[int]) -> bytes:
+    """
+    Encodes a stat vector into its compact form. Raises a `ValueError`
+    for stats that aren't whole numbers rather than truncating them
+    :param values: the stats to encode, ordered by their snapshot schema, as whole numbers
+    """
+    bitmap = bytearray((len(values) + 7) // 8)
+    payload = bytearray()
+
+    for i, value in enumerate(values):
+        if not value:
+            continue
+        bitmap[i >> 3] |= 1 << (i & 7)
+
+        # Whole numbers stored as floats (levels are REAL columns) are encoded as ints
+        whole = int(value)
+        if whole != value:
+            raise ValueError(f'Stat {i} is {value!r}, only whole numbers can be encoded')
+        value = (whole << 1) ^ (whole >> 63)
+        while value > 0x7F:
+            payload.append((value & 0x7F) | 0x80)
+            value >>= 7
+        payload.append(value)
+
+    return bytes(bitmap + payload)
+
+
+def decode_stats(data: bytes, length: int) -> list[int]:
+    """
+    Decodes a stat vector encoded with `encode_stats`
+    :param data: the encoded stats
+    :param length: the amount of stats in the snapshot schema the vector was encoded with
+    """
+    values = [0] * length
+    pos = (length + 7) // 8
+
+    for i in range(length):
+        if not data[i >> 3] & (1 << (i & 7)):
+            continue
+
+        value = shift = 0
+        while True:
+            byte = data[pos]
+            pos += 1
+            value |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                break
+            shift += 7
+
+        values[i] = (value >> 1) ^ -(value & 1)
+    return values
@@ -1,6 +1,6 @@
-import sqlite3
-
+from .database import connect_db
 from .errors import ThemeNotFoundError
+from .entitlements import entitlement_resolver
 from .functions import get_config, REL_PATH
 
 
@@ -9,16 +9,7 @@ def get_owned_themes(discord_id: int) -> list:
     Returns list of themes owned by a discord user
     :param discord_id: the discord id of the respective user
     """
-    with sqlite3.connect(f'{REL_PATH}/database/voting.db') as conn:
-        cursor = conn.cursor()
-
-        cursor.execute(
-            f'SELECT owned_themes FROM owned_themes WHERE discord_id = {discord_id}')
-        owned_themes: tuple = cursor.fetchone()
-    
-    if owned_themes:
-        return owned_themes[0].split(',')
-    return []
+    return list(entitlement_resolver.get(discord_id).owned_themes)
 
 
 def get_voter_themes() -> list:
@@ -47,7 +38,7 @@ def add_owned_theme(discord_id: int, theme_name: str):
     :param discord_id: the discord id of the respective user
     :param theme_name: the name of the theme to be given to the user
     """
-    with sqlite3.connect(f'{REL_PATH}/database/voting.db') as conn:
+    with connect_db(f'{REL_PATH}/database/voting.db') as conn:
         cursor = conn.cursor()
         cursor.execute(
             f"SELECT owned_themes FROM owned_themes WHERE discord_id = {discord_id}")
@@ -65,6 +56,7 @@ def add_owned_theme(discord_id: int, theme_name: str):
                 f'INSERT INTO owned_themes (discord_id, owned_themes) VALUES (?, ?)',
                 (discord_id, theme_name)
             )
+    entitlement_resolver.invalidate(discord_id)
 
 
 def remove_owned_theme(discord_id: int, theme_name: str):
@@ -73,7 +65,7 @@ def remove_owned_theme(discord_id: int, theme_name: str):
     :param discord_id: the discord id of the respective user
     :param theme_name: the name of the theme to be taken from the user
     """
-    with sqlite3.connect(f'{REL_PATH}/database/voting.db') as conn:
+    with connect_db(f'{REL_PATH}/database/voting.db') as conn:
         cursor = conn.cursor()
         cursor.execute(
             f"SELECT owned_themes FROM owned_themes WHERE discord_id = {discord_id}")
@@ -92,6 +84,7 @@ def remove_owned_theme(discord_id: int, theme_name: str):
                     )
                 else:
                     cursor.execute(f'DELETE FROM owned_themes WHERE discord_id = {discord_id}')
+    entitlement_resolver.invalidate(discord_id)
 
 
 def set_owned_themes(discord_id: int, themes: list | tuple):
@@ -103,7 +96,7 @@ def set_owned_themes(discord_id: int, themes: list | tuple):
     if not themes:
         return
 
-    with sqlite3.connect(f'{REL_PATH}/database/voting.db') as conn:
+    with connect_db(f'{REL_PATH}/database/voting.db') as conn:
         cursor = conn.cursor()
         cursor.execute(f"SELECT owned_themes FROM owned_themes WHERE discord_id = {discord_id}")
 
@@ -119,6 +112,7 @@ def set_owned_themes(discord_id: int, themes: list | tuple):
                 f'INSERT INTO owned_themes (discord_id, owned_themes) VALUES (?, ?)',
                 (discord_id, ','.join(themes))
             )
+    entitlement_resolver.invalidate(discord_id)
 
 
 def get_active_theme(discord_id: int, default='none'):
@@ -127,16 +121,8 @@ def get_active_theme(discord_id: int, default='none'):
     :param discord_id: the discord id of the respective user
     :param default: the default value to return if the user has no active theme
     """
-    with sqlite3.connect(f'{REL_PATH}/database/voting.db') as conn:
-        cursor = conn.cursor()
-
-        cursor.execute(
-            f'SELECT enabled_theme FROM rewards_data WHERE discord_id = {discord_id}')
-        rewards_data = cursor.fetchone()
-
-    if rewards_data:
-        return rewards_data[0]
-    return default
+    active_theme = entitlement_resolver.get(discord_id).active_theme
+    return default if active_theme is None else active_theme
 
 
 def set_active_theme(discord_id: int, theme_name: str):
@@ -145,7 +131,7 @@ def set_active_theme(discord_id: int, theme_name: str):
     :param discord_id: the discord id of the respective user
     :param theme_name: the name of the theme to set as active
     """
-    with sqlite3.connect(f'{REL_PATH}/database/voting.db') as conn:
+    with connect_db(f'{REL_PATH}/database/voting.db') as conn:
         cursor = conn.cursor()
 
         cursor.execute(
@@ -162,6 +148,7 @@ def set_active_theme(discord_id: int, theme_name: str):
                 f"INSERT INTO rewards_data (discord_id, enabled_theme) VALUES (?, ?)",
                 (discord_id, theme_name)
             )
+    entitlement_resolver.invalidate(discord_id)
 
 
 class ThemeManager:
@@ -0,0 +1,150 @@
+"""
+Per command latency histograms of each stage a command goes through
+"""
+
+import time
+import inspect
+import functools
+import contextvars
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Callable
+
+
+# The command being traced, set when a command is invoked and carried
+# into everything the command awaits. Work outside of a command, such
+# as the reset loops, is recorded as background work.
+current_command: contextvars.ContextVar[str] = contextvars.ContextVar(
+    'current_command', default='background')
+
+# Upper bounds of the histogram buckets in milliseconds, the last bucket is unbounded
+BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+
+class Histogram:
+    def __init__(self):
+        """Latencies of a single stage bucketed by duration"""
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+
+    def add(self, ms: float) -> None:
+        """
+        Records a single duration
+        :param ms: the duration in milliseconds
+        """
+        self.counts[bisect_left(BUCKETS, ms)] += 1
+        self.total += 1
+        self.sum += ms
+        if ms > self.max:
+            self.max = ms
+
+
+    def percentile(self, percent: float) -> float:
+        """
+        Returns the upper bound of the bucket a percentile falls in,
+        the slowest bucket is bounded by the slowest duration instead
+        :param percent: the percentile to return (0-100)
+        """
+        target = self.total * percent / 100
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= target and count:
+                return round(min(BUCKETS[i], self.max) if i < len(BUCKETS) else self.max, 2)
+        return 0.0
+
+
+    def to_dict(self) -> dict:
+        """Returns the summary and the buckets of the histogram"""
+        return {
+            'count': self.total,
+            'avg_ms': round(self.sum / self.total, 2) if self.total else 0,
+            'p50_ms': self.percentile(50),
+            'p95_ms': self.percentile(95),
+            'p99_ms': self.percentile(99),
+            'max_ms': round(self.max, 2),
+            'buckets': {f'<={bound}': count for bound, count
+                        in zip((*BUCKETS, 'inf'), self.counts) if count}
+        }
+
+
+class Tracer:
+    def __init__(self):
+        """Collects the durations of the stages of every command into histograms"""
+        self._histograms: defaultdict[str, defaultdict[str, Histogram]] = \
+            defaultdict(lambda: defaultdict(Histogram))
+        self.started = time.time()
+
+
+    def record(self, stage: str, seconds: float, command: str=None) -> None:
+        """
+        Records the duration of a stage
+        :param stage: the name of the stage (hypixel, render.queue, etc)
+        :param seconds: the duration of the stage
+        :param command: the command to record under (defaults to the current command)
+        """
+        self._histograms[command or current_command.get()][stage].add(seconds * 1000)
+
+
+    def trace(self, stage: str) -> Callable:
+        """
+        Decorates a function or coroutine function so every call is recorded as a stage
+        :param stage: the name of the stage
+        """
+        def decorator(func: Callable) -> Callable:
+            if inspect.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    start = time.perf_counter()
+                    try:
+                        return await func(*args, **kwargs)
+                    finally:
+                        self.record(stage, time.perf_counter() - start)
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.record(stage, time.perf_counter() - start)
+            return wrapper
+        return decorator
+
+
+    def export(self, command: str=None) -> dict:
+        """
+        Returns the histograms of every stage keyed by command
+        :param command: only return the histograms of this command
+        """
+        return {
+            name: {stage: histogram.to_dict() for stage, histogram in sorted(stages.items())}
+            for name, stages in sorted(self._histograms.items())
+            if command is None or name == command
+        }
+
+
+    def summary(self, command: str=None) -> list[tuple]:
+        """
+        Returns a row of the command, stage, count, p50, p95 and max of every stage
+        :param command: only return the stages of this command
+        """
+        rows = []
+        for name, stages in self.export(command).items():
+            for stage, histogram in stages.items():
+                rows.append((name, stage, histogram['count'], histogram['p50_ms'],
+                             histogram['p95_ms'], histogram['max_ms']))
+        return rows
+
+
+    def reset(self) -> None:
+        """Removes every recorded duration"""
+        self._histograms.clear()
+        self.started = time.time()
+
+
+tracer = Tracer()
@@ -1,14 +1,12 @@
-import os
-
-import shutil
 import discord
 
 
 class SelectModes(discord.ui.Select):
-    def __init__(self, user, inter, mode):
+    def __init__(self, user, inter, mode, renders):
         self.user = user
         self.inter = inter
         self.mode = mode.title()
+        self.renders = renders
         options=[
             discord.SelectOption(label="Overall"),
             discord.SelectOption(label="Solos"),
@@ -23,28 +21,37 @@ class SelectModes(discord.ui.Select):
     async def callback(self, interaction: discord.Interaction):
         await interaction.response.defer()
         mode = self.values[0].lower()
+
+        # Modes are rendered lazily the first time they are selected
+        image = await self.renders.get(mode)
+
         if not interaction.user.id == self.user:
             await interaction.followup.send(
-                file=discord.File(f'./database/activerenders/{self.inter.id}/{mode}.png'),ephemeral=True)
+                file=discord.File(image, filename=f'{mode}.png'),ephemeral=True)
 
         else:
-            view = ModesView(user=self.user, inter=self.inter, mode=mode)
+            view = ModesView(user=self.user, inter=self.inter, mode=mode, renders=self.renders)
             await self.inter.edit_original_response(
-                attachments=[discord.File(f'./database/activerenders/{self.inter.id}/{mode}.png')], view=view)
+                attachments=[discord.File(image, filename=f'{mode}.png')], view=view)
 
 
 class ModesView(discord.ui.View):
-    def __init__(self, user, inter, mode, *, timeout = 300):
+    def __init__(self, user, inter, mode, renders, *, timeout = 300):
         super().__init__(timeout=timeout)
-        self.add_item(SelectModes(user, inter, mode))
+        self.add_item(SelectModes(user, inter, mode, renders))
         self.inter = inter
+        self.renders = renders
+        renders.owner = self
 
 
     async def on_timeout(self) -> None:
+        # A newer view has replaced this one and still needs the renders
+        if self.renders.owner is not self:
+            return
+
         try:
             self.clear_items()
             await self.inter.edit_original_response(view=self)
         except discord.errors.NotFound:
             pass
-        if os.path.isdir(f'./database/activerenders/{self.inter.id}'):
-            shutil.rmtree(f'./database/activerenders/{self.inter.id}')
+        self.renders.discard()
@@ -0,0 +1,163 @@
+"""
+In-memory index of the autofilled usernames used for autocomplete
+"""
+
+import time
+import threading
+from bisect import bisect_left, insort
+from collections import defaultdict
+
+from .metrics import register_stats
+
+
+GRAM_SIZE = 3
+
+
+def _grams(name: str) -> set[str]:
+    return {name[i:i + GRAM_SIZE] for i in range(len(name) - GRAM_SIZE + 1)}
+
+
+class UsernameIndex:
+    def __init__(self):
+        """
+        Searches usernames by prefix and substring without touching the database.
+        Prefixes are found by bisecting a sorted list of the lowercase names,
+        substrings by intersecting the trigram sets of the typed text
+        """
+        self.loaded = False
+
+        self._usernames: dict[int, str] = {}
+        self._owners: defaultdict[str, set[int]] = defaultdict(set)
+        self._display: dict[str, str] = {}
+        self._sorted: list[str] = []
+        self._grams: defaultdict[str, set[str]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+        self.searches = 0
+        self.search_time = 0.0
+
+
+    def _add(self, discord_id: int, username: str) -> None:
+        key = username.lower()
+        self._usernames[discord_id] = username
+        self._display[key] = username
+
+        if not self._owners[key]:
+            insort(self._sorted, key)
+            for gram in _grams(key):
+                self._grams[gram].add(key)
+        self._owners[key].add(discord_id)
+
+
+    def _remove(self, discord_id: int) -> None:
+        username = self._usernames.pop(discord_id, None)
+        if username is None:
+            return
+
+        key = username.lower()
+        owners = self._owners[key]
+        owners.discard(discord_id)
+        if owners:
+            return
+
+        del self._owners[key]
+        del self._display[key]
+        self._sorted.pop(bisect_left(self._sorted, key))
+        for gram in _grams(key):
+            self._grams[gram].discard(key)
+            if not self._grams[gram]:
+                del self._grams[gram]
+
+
+    def load(self, rows: list[tuple[int, str]]) -> None:
+        """
+        Replaces the indexed usernames
+        :param rows: the discord id and username of every autofilled user
+        """
+        with self._lock:
+            self._usernames.clear()
+            self._owners.clear()
+            self._display.clear()
+            self._grams.clear()
+
+            for discord_id, username in rows:
+                key = username.lower()
+                self._usernames[discord_id] = username
+                self._display[key] = username
+                self._owners[key].add(discord_id)
+
+            self._sorted = sorted(self._owners)
+            for key in self._sorted:
+                for gram in _grams(key):
+                    self._grams[gram].add(key)
+            self.loaded = True
+
+
+    def set(self, discord_id: int, username: str) -> None:
+        """
+        Indexes the autofilled username of a user, replacing their previous one
+        :param discord_id: the discord id of the user
+        :param username: the user's current username
+        """
+        with self._lock:
+            if self._usernames.get(discord_id) == username:
+                return
+            self._remove(discord_id)
+            self._add(discord_id, username)
+
+
+    def _substring_matches(self, current: str) -> list[str]:
+        if len(current) < GRAM_SIZE:
+            return [key for key in self._sorted if current in key]
+
+        gram_sets = sorted((self._grams.get(gram, set()) for gram in _grams(current)), key=len)
+        candidates = set.intersection(*gram_sets)
+        # Trigrams can match out of order, so the substring is checked
+        return [key for key in candidates if current in key]
+
+
+    def search(self, current: str, limit: int=25) -> list[str]:
+        """
+        Returns usernames containing the typed text. An exact match comes first,
+        followed by names starting with the text and then names containing it
+        :param current: the text typed so far
+        :param limit: the maximum amount of usernames to return
+        """
+        start = time.perf_counter()
+        current = current.lower()
+
+        with self._lock:
+            matches = []
+            position = bisect_left(self._sorted, current)
+            while position < len(self._sorted) and len(matches) < limit:
+                key = self._sorted[position]
+                if not key.startswith(current):
+                    break
+                matches.append(key)
+                position += 1
+
+            if len(matches) < limit:
+                prefixed = set(matches)
+                substrings = [key for key in self._substring_matches(current) if key not in prefixed]
+                substrings.sort(key=lambda key: (key.index(current), key))
+                matches.extend(substrings[:limit - len(matches)])
+
+            usernames = [self._display[key] for key in matches]
+
+        self.searches += 1
+        self.search_time += time.perf_counter() - start
+        return usernames
+
+
+    def get_stats(self) -> dict:
+        """Returns the size of the index and the average search time"""
+        return {
+            'usernames': len(self._sorted),
+            'grams': len(self._grams),
+            'searches': self.searches,
+            'avg_search_us': round(self.search_time / self.searches * 1e6, 2) if self.searches else 0
+        }
+
+
+username_index = UsernameIndex()
+register_stats('username_index', username_index.get_stats)
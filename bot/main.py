@@ -1,24 +1,58 @@
 import os
 import time
 
-from json import dump as dump_json
+from io import BytesIO
+from json import dump as dump_json, dumps as dumps_json
 
 import discord
 from discord.ext import commands
 from discord import app_commands
 
 from helper.errors import MCUserNotFoundError
-from helper.functions import get_config, get_embed_color, log_error_msg
+from helper.metrics import get_stats
+from helper.tracing import tracer, current_command
+from helper.assetcache import preload_assets
+from helper.rendername import prebake_stars
+from helper.mojang import mojang_resolver
+from helper.database import close_all, run_db
+from helper.schema import migrate_databases
+from helper.historical import backfill_reset_schedules
+from helper.repositories import linking_repo, usage_repo
+from helper.functions import (
+    get_config,
+    get_embed_color,
+    log_error_msg,
+    render_executor,
+    hypixel_client,
+    render_store
+)
 
 
 TOKEN = os.environ.get('STATALYTICS_TOKEN')
 
 
+class TracedTree(app_commands.CommandTree):
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        # The command is set before it's invoked so every stage it awaits is
+        # recorded under it, autocomplete lookups are recorded separately
+        if interaction.command is not None:
+            name = interaction.command.qualified_name
+            if interaction.type is discord.InteractionType.autocomplete:
+                name = f'{name}:autocomplete'
+            current_command.set(name)
+        interaction.extras['trace_start'] = time.perf_counter()
+        return True
+
+
 class MyClient(commands.Bot):
     def __init__(self, *, intents: discord.Intents):
-        super().__init__(intents=intents, command_prefix=commands.when_mentioned_or('$'))
+        super().__init__(intents=intents, command_prefix=commands.when_mentioned_or('$'),
+                         tree_cls=TracedTree)
 
     async def setup_hook(self):
+        await run_db(migrate_databases)
+        await run_db(backfill_reset_schedules)
+
         cogs = get_config()['enabled_cogs']
         for ext in cogs:
             try:
@@ -31,6 +65,24 @@ class MyClient(commands.Bot):
         with open('./database/uptime.json', 'w') as datafile:
             dump_json({"start_time": time.time()}, datafile, indent=4)
 
+        if get_config().get('preload_assets'):
+            preload_assets()
+            prebake_stars()
+
+        render_store.clear_fallback()
+        await render_executor.start()
+        await usage_repo.start(get_config()['command_usage']['flush_interval'])
+        await linking_repo.load_username_index()
+
+
+    async def close(self):
+        render_executor.shutdown()
+        await hypixel_client.close()
+        await mojang_resolver.close()
+        await super().close()
+        await usage_repo.close()
+        close_all()
+
 
 intents = discord.Intents(messages=True)
 intents.guilds = True
@@ -43,6 +95,13 @@ async def on_ready():
     await client.change_presence(activity=discord.Game(name="/help"))
 
 
+@client.event
+async def on_app_command_completion(interaction: discord.Interaction, command):
+    start = interaction.extras.get('trace_start')
+    if start is not None:
+        tracer.record('total', time.perf_counter() - start, command=command.qualified_name)
+
+
 @client.tree.error
 async def on_tree_error(interaction: discord.Interaction, error: app_commands.AppCommandError):
     config = get_config()
@@ -134,5 +193,37 @@ async def sync(ctx):
     await ctx.send('Successfully synced client tree!')
 
 
+@client.command()
+@commands.is_owner()
+async def stats(ctx, name: str=None):
+    stats_json = dumps_json(get_stats(name), indent=2)
+    await ctx.send(f'```json\n{stats_json[:1980]}\n```')
+
+
+@client.command()
+@commands.is_owner()
+async def perf(ctx, command: str=None):
+    if command == 'reset':
+        tracer.reset()
+        await ctx.send('Successfully reset command traces!')
+        return
+
+    if command == 'json':
+        perf_json = dumps_json(tracer.export(), indent=2)
+        await ctx.send(file=discord.File(BytesIO(perf_json.encode()), filename='perf.json'))
+        return
+
+    rows = tracer.summary(command)
+    if not rows:
+        await ctx.send('No commands have been traced yet!')
+        return
+
+    lines = [f"{'command':<16}{'stage':<22}{'count':>7}{'p50 ms':>8}{'p95 ms':>8}{'max ms':>9}"]
+    for name, stage, count, p50, p95, max_ms in rows:
+        lines.append(f'{name[:15]:<16}{stage[:21]:<22}{count:>7}{p50:>8}{p95:>8}{max_ms:>9}')
+    table = '\n'.join(lines)
+    await ctx.send(f'```\n{table[:1980]}\n```')
+
+
 if __name__ == '__main__':
     client.run(TOKEN)
@@ -0,0 +1,46 @@
+"""
+Creates the tables and indexes of every database and applies pending
+schema migrations. With --check the query plan of every hot query is
+printed instead, flagging any query that reads a whole table
+"""
+
+import sys
+import argparse
+
+from helper.schema import migrate_databases, get_schema_version, check_query_plans, MIGRATIONS
+
+
+def check() -> int:
+    flagged = 0
+    for plan in check_query_plans():
+        status = 'SCAN' if plan['flagged'] else 'ok'
+        print(f"[{status}] {plan['database']} {plan['call_site']}")
+        print(f"    {plan['query']}")
+        if plan['error']:
+            print(f"    error: {plan['error']}")
+        for step in plan['steps']:
+            print(f'    -> {step}')
+        flagged += plan['flagged']
+
+    print(f'{flagged} flagged queries')
+    return flagged
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--check', action='store_true',
+        help='print the query plans of the hot queries and exit with 1 if any scan a table')
+    args = parser.parse_args()
+
+    if args.check:
+        sys.exit(1 if check() else 0)
+
+    for name, applied in migrate_databases().items():
+        versions = ', '.join(map(str, applied)) or 'up to date'
+        print(f'{name}: version {get_schema_version(name)} ({versions})')
+    print(f'Migrated {len(MIGRATIONS)} databases')
+
+
+if __name__ == '__main__':
+    main()
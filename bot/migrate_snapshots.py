@@ -0,0 +1,32 @@
+"""
+Moves the per period historical tables (daily_2023_07_14, weekly_2023_28, etc)
+into the single snapshot table, this only has to be run once.
+Snapshots can optionally be moved into the compact archive afterwards
+"""
+
+import argparse
+
+from helper.historical import migrate_snapshot_tables, archive_snapshots
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--keep', action='store_true',
+        help='keep the per period tables after they have been copied')
+    parser.add_argument(
+        '--archive', action='store_true',
+        help='move every snapshot into the compact archive')
+    args = parser.parse_args()
+
+    migrated = migrate_snapshot_tables(drop=not args.keep)
+    for table, rows in migrated.items():
+        print(f'{table}: {rows} rows')
+    print(f'Migrated {len(migrated)} tables')
+
+    if args.archive:
+        print(f'Archived {archive_snapshots()} snapshots')
+
+
+if __name__ == '__main__':
+    main()
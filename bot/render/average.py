@@ -1,12 +1,15 @@
-from PIL import Image, ImageDraw, ImageFont
+from io import BytesIO
+
+from PIL import ImageDraw
 
 from calc.average import Ratios
 from helper.rendername import get_rank_prefix, render_rank
 from helper.rendertools import get_background, paste_skin, box_center_text
 from helper.renderprogress import render_progress_bar, render_progress_text
+from helper.assetcache import get_font, get_image
 
 
-def render_average(name, uuid, mode, hypixel_data, skin_res, save_dir):
+def render_average(name, uuid, mode, hypixel_data, skin_res):
     ratios = Ratios(name, mode, hypixel_data)
     level = ratios.level
     player_rank_info = ratios.player_rank_info
@@ -50,9 +53,9 @@ def render_average(name, uuid, mode, hypixel_data, skin_res, save_dir):
     image = image.convert("RGBA")
 
     draw = ImageDraw.Draw(image)
-    minecraft_16 = ImageFont.truetype('./assets/minecraft.ttf', 16)
-    minecraft_18 = ImageFont.truetype('./assets/minecraft.ttf', 18)
-    minecraft_22 = ImageFont.truetype('./assets/minecraft.ttf', 22)
+    minecraft_16 = get_font(16)
+    minecraft_18 = get_font(18)
+    minecraft_22 = get_font(22)
 
     def leng(text, width):
         return (width - draw.textlength(text, font=minecraft_16)) / 2
@@ -105,8 +108,7 @@ def render_average(name, uuid, mode, hypixel_data, skin_res, save_dir):
                          progress=progress, target=target, draw=draw)
 
     # Paste overlay
-    overlay_image = Image.open(f'./assets/average/overlay.png')
-    overlay_image = overlay_image.convert("RGBA")
+    overlay_image = get_image('./assets/average/overlay.png')
     image.paste(overlay_image, (0, 0), overlay_image)
 
     box_center_text("Average Stats", draw, box_width=171,
@@ -115,5 +117,9 @@ def render_average(name, uuid, mode, hypixel_data, skin_res, save_dir):
     # Render skin
     image = paste_skin(skin_res, image, positions=(465, 67))
 
-    # Save the image
-    image.save(f'./database/activerenders/{save_dir}/{mode.lower()}.png')
+    # Return the image
+    image_bytes = BytesIO()
+    image.save(image_bytes, format='PNG')
+    image_bytes.seek(0)
+
+    return image_bytes
@@ -0,0 +1,90 @@
+from io import BytesIO
+
+from PIL import Image, ImageDraw
+
+from calc.total import Stats
+from helper.rendername import render_level_and_name
+from helper.rendertools import box_center_text
+from helper.assetcache import get_font
+
+
+# Left edge and width of each stat column
+COLUMNS = (
+    ('FKDR', 440, 90),
+    ('WLR', 530, 90),
+    ('Finals', 620, 100),
+    ('Wins', 720, 100),
+)
+
+
+def get_sort_key(stats: Stats, sort: str) -> tuple:
+    """
+    Returns the value players are sorted by, highest first
+    :param stats: the total stats of the player
+    :param sort: the stat to sort by (fkdr or star)
+    """
+    bedwars = stats.hypixel_data_bedwars
+    fkdr = (bedwars.get(f'{stats.mode}final_kills_bedwars', 0)
+            / (bedwars.get(f'{stats.mode}final_deaths_bedwars', 0) or 1))
+
+    if sort == 'star':
+        return stats.level, fkdr
+    return fkdr, stats.level
+
+
+def render_bulk(players, mode, sort):
+    all_stats = [Stats(name, mode, hypixel_data) for name, hypixel_data in players]
+    all_stats.sort(key=lambda stats: get_sort_key(stats, sort), reverse=True)
+
+    row_height = 36
+    width, height = 836, 112 + row_height * len(all_stats)
+
+    image = Image.new('RGBA', (width, height), (30, 30, 36, 255))
+    draw = ImageDraw.Draw(image)
+    minecraft_16 = get_font(16)
+    minecraft_18 = get_font(18)
+
+    white = (255, 255, 255)
+    gray = (170, 170, 170)
+    gold = (255, 170, 0)
+    green = (85, 255, 85)
+
+    title = f'Bulk Lookup ({mode.title()}) - sorted by {"Star" if sort == "star" else "FKDR"}'
+    box_center_text(title, draw, box_width=width, box_start=0, text_y=16, font=get_font(20))
+
+    header_y = 62
+    box_center_text('#', draw, box_width=40, box_start=16, text_y=header_y, font=minecraft_16, color=gray)
+    box_center_text('Player', draw, box_width=384, box_start=56, text_y=header_y,
+                    font=minecraft_16, color=gray)
+    for label, left, column_width in COLUMNS:
+        box_center_text(label, draw, box_width=column_width, box_start=left, text_y=header_y,
+                        font=minecraft_16, color=gray)
+
+    for i, stats in enumerate(all_stats):
+        top = 92 + i * row_height
+        fill = (18, 18, 22) if i % 2 == 0 else (24, 24, 29)
+        draw.rounded_rectangle((16, top, width - 16, top + row_height - 4), radius=6, fill=fill)
+
+        text_y = top + 6
+        box_center_text(str(i + 1), draw, box_width=40, box_start=16, text_y=text_y + 1,
+                        font=minecraft_16, color=gray)
+        render_level_and_name(stats.name, stats.level, stats.player_rank_info, image=image,
+                              box_positions=(56, 384), position_y=text_y, fontsize=18)
+
+        _, _, fkdr = stats.get_finals()
+        _, _, wlr = stats.get_wins()
+        final_kills = f"{stats.hypixel_data_bedwars.get(f'{stats.mode}final_kills_bedwars', 0):,}"
+        wins = f"{stats.hypixel_data_bedwars.get(f'{stats.mode}wins_bedwars', 0):,}"
+
+        for (_, left, column_width), value, color in zip(
+            COLUMNS, (fkdr, wlr, final_kills, wins), (gold, gold, green, white)
+        ):
+            box_center_text(value, draw, box_width=column_width, box_start=left,
+                            text_y=text_y + 1, font=minecraft_18, color=color)
+
+    # Return the image
+    image_bytes = BytesIO()
+    image.save(image_bytes, format='PNG')
+    image_bytes.seek(0)
+
+    return image_bytes
@@ -1,11 +1,14 @@
-from PIL import Image, ImageDraw, ImageFont
+from io import BytesIO
+
+from PIL import ImageDraw
 
 from calc.compare import Compare
 from helper.rendername import render_level_and_name
 from helper.rendertools import get_background
+from helper.assetcache import get_font, get_image
 
 def render_compare(name_1, name_2, uuid_1, mode,
-                   hypixel_data_1, hypixel_data_2, save_dir):
+                   hypixel_data_1, hypixel_data_2):
     compare = Compare(name_1, name_2, mode, hypixel_data_1, hypixel_data_2)
     level_1, level_2 = compare.level_1, compare.level_2
     rank_info_1, rank_info_2 = compare.player_rank_info
@@ -21,7 +24,7 @@ def render_compare(name_1, name_2, uuid_1, mode,
     image = image.convert("RGBA")
 
     draw = ImageDraw.Draw(image)
-    minecraft_16 = ImageFont.truetype('./assets/minecraft.ttf', 16)
+    minecraft_16 = get_font(16)
 
     def leng(text, container_width):
         """Returns startpoint for centering text in a box"""
@@ -93,9 +96,12 @@ def render_compare(name_1, name_2, uuid_1, mode,
                           box_positions=(17, 401), position_y=51, fontsize=18)
 
     # Paste overlay
-    overlay_image = Image.open(f'./assets/compare/overlay.png')
-    overlay_image = overlay_image.convert("RGBA")
+    overlay_image = get_image('./assets/compare/overlay.png')
     image.paste(overlay_image, (0, 0), overlay_image)
 
-    # Save the image
-    image.save(f'./database/activerenders/{save_dir}/{mode.lower()}.png')
+    # Return the image
+    image_bytes = BytesIO()
+    image.save(image_bytes, format='PNG')
+    image_bytes.seek(0)
+
+    return image_bytes
@@ -1,10 +1,11 @@
 from io import BytesIO
 
-from PIL import Image, ImageDraw, ImageFont
+from PIL import ImageDraw
 
 from helper.rendername import render_level_and_name
 from calc.cosmetics import ActiveCosmetics
 from helper.rendertools import get_background
+from helper.assetcache import get_font, get_image
 
 def render_cosmetics(name, uuid, hypixel_data):
     cosmetics = ActiveCosmetics(name, hypixel_data)
@@ -31,7 +32,7 @@ def render_cosmetics(name, uuid, hypixel_data):
     image = image.convert("RGBA")
 
     draw = ImageDraw.Draw(image)
-    font = ImageFont.truetype('./assets/minecraft.ttf', 16)
+    font = get_font(16)
 
     white = (255, 255, 255)
     black = (0, 0, 0)
@@ -42,7 +43,7 @@ def render_cosmetics(name, uuid, hypixel_data):
         draw.text((x, y), cosmetic_text, fill=white, font=font)
 
     # Render the titles
-    title_image = Image.open('./assets/cosmetics/overlay.png')
+    title_image = get_image('./assets/cosmetics/overlay.png')
     image.paste(title_image, (0, 0), title_image)
 
     # Render player name
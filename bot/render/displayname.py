@@ -1,9 +1,10 @@
 from io import BytesIO
 
-from PIL import Image, ImageFont, ImageDraw
+from PIL import Image, ImageDraw
 
 from helper.calctools import get_player_rank_info
 from helper.rendername import get_rank_prefix, render_level_and_name
+from helper.assetcache import get_font
 
 def render_displayname(name, hypixel_data):
     level = hypixel_data.get('player', {}).get('achievements', {}).get('bedwars_level', 0)
@@ -13,7 +14,7 @@ def render_displayname(name, hypixel_data):
     # Open the base image
     sample_image = Image.new('RGBA', (0, 0), (0, 0, 0, 0))
     draw = ImageDraw.Draw(sample_image)
-    font = ImageFont.truetype('./assets/minecraft.ttf', 20)
+    font = get_font(20)
 
     image_width = int(draw.textlength(f'[{level}] {rank_prefix} {name}', font=font)) + 18
     actual_image = Image.new('RGBA', (image_width, 20), (0, 0, 0, 0))
@@ -1,17 +1,20 @@
-from PIL import Image, ImageDraw, ImageFont
+from io import BytesIO
+
+from PIL import ImageDraw
 
 from calc.historical import HistoricalStats, LookbackStats
 from helper.rendername import render_rank, get_rank_prefix
 from helper.rendertools import get_background, paste_skin, box_center_text
 from helper.renderprogress import render_progress_bar, render_progress_text
+from helper.assetcache import get_font, get_image
 
 
 def render_historical(name, uuid, method, relative_date, title, mode,
-                      hypixel_data, skin_res, save_dir, table_name = None):
-    if not table_name:
+                      hypixel_data, skin_res, period_type = None, period_key = None):
+    if not period_key:
         stats = HistoricalStats(name, uuid, method, mode, hypixel_data)
     else:
-        stats = LookbackStats(name, uuid, table_name, mode, hypixel_data)
+        stats = LookbackStats(name, uuid, period_type, period_key, mode, hypixel_data)
 
     level = stats.level
     player_rank_info = stats.player_rank_info
@@ -34,9 +37,9 @@ def render_historical(name, uuid, method, relative_date, title, mode,
     image = image.convert("RGBA")
 
     draw = ImageDraw.Draw(image)
-    minecraft_16 = ImageFont.truetype('./assets/minecraft.ttf', 16)
-    minecraft_17 = ImageFont.truetype('./assets/minecraft.ttf', 17)
-    minecraft_22 = ImageFont.truetype('./assets/minecraft.ttf', 22)
+    minecraft_16 = get_font(16)
+    minecraft_17 = get_font(17)
+    minecraft_22 = get_font(22)
 
     def leng(text, width):
         return (width - draw.textlength(text, font=minecraft_16)) / 2
@@ -99,9 +102,12 @@ def render_historical(name, uuid, method, relative_date, title, mode,
     image = paste_skin(skin_res, image, positions=(466, 69))
 
     # Paste overlay
-    overlay_image = Image.open(f'./assets/historical/overlay.png')
-    overlay_image = overlay_image.convert("RGBA")
+    overlay_image = get_image('./assets/historical/overlay.png')
     image.paste(overlay_image, (0, 0), overlay_image)
 
-    # Save the image
-    image.save(f'./database/activerenders/{save_dir}/{mode.lower()}.png')
+    # Return the image
+    image_bytes = BytesIO()
+    image.save(image_bytes, format='PNG')
+    image_bytes.seek(0)
+
+    return image_bytes
@@ -1,9 +1,10 @@
 from io import BytesIO
 
-from PIL import Image, ImageFont, ImageDraw
+from PIL import Image, ImageDraw
 
 from helper.rendertools import get_background, get_rank_color
 from helper.calctools import get_player_rank_info
+from helper.assetcache import get_font, get_image
 
 def render_hotbar(name, uuid, hypixel_data):
     slots = [(40, 424), (130, 424), (220, 424), (310, 424),
@@ -26,19 +27,17 @@ def render_hotbar(name, uuid, hypixel_data):
     composite_image = Image.new("RGBA", base_image.size)
 
     for i, item in enumerate(hotbar):
-        top_image = Image.open(f"./assets/hotbar/{item.lower()}.png")
-        top_image = top_image.convert("RGBA")
+        top_image = get_image(f'./assets/hotbar/{item.lower()}.png')
         composite_image.paste(top_image, slots[i], top_image)
 
-    overlay_image = Image.open('./assets/hotbar/overlay.png')
-    overlay_image = overlay_image.convert("RGBA")
+    overlay_image = get_image('./assets/hotbar/overlay.png')
     composite_image.paste(overlay_image, (0, 0), overlay_image)
 
     # Render name
     black = (0, 0, 0)
     white = (255, 255, 255)
 
-    font = ImageFont.truetype('./assets/minecraft.ttf', 36)
+    font = get_font(36)
     player_y = 53
     player_txt = "'s Hotbar"
 
@@ -1,12 +1,15 @@
-from PIL import ImageDraw, ImageFont
+from io import BytesIO
+
+from PIL import ImageDraw
 
 from calc.milestones import Stats
 from helper.rendername import render_level, get_rank_prefix, render_rank
 from helper.rendertools import get_background, paste_skin, box_center_text
 from helper.renderprogress import render_progress_bar, render_progress_text
+from helper.assetcache import get_font
 
 
-def render_milestones(name, uuid, mode, session, hypixel_data, skin_res, save_dir):
+def render_milestones(name, uuid, mode, session, hypixel_data, skin_res):
     stats = Stats(name, uuid, mode, session, hypixel_data)
     level = stats.level
     player_rank_info = stats.player_rank_info
@@ -59,9 +62,9 @@ def render_milestones(name, uuid, mode, session, hypixel_data, skin_res, save_di
     image = image.convert("RGBA")
 
     draw = ImageDraw.Draw(image)
-    minecraft_16 = ImageFont.truetype('./assets/minecraft.ttf', 16)
-    minecraft_18 = ImageFont.truetype('./assets/minecraft.ttf', 18)
-    minecraft_22 = ImageFont.truetype('./assets/minecraft.ttf', 22)
+    minecraft_16 = get_font(16)
+    minecraft_18 = get_font(18)
+    minecraft_22 = get_font(22)
 
     for values in data:
         start_x, start_y = values[0]
@@ -126,4 +129,9 @@ def render_milestones(name, uuid, mode, session, hypixel_data, skin_res, save_di
 
     image = paste_skin(skin_res, image, positions=(472, 61))
 
-    image.save(f'./database/activerenders/{save_dir}/{mode.lower()}.png')
+    # Return the image
+    image_bytes = BytesIO()
+    image.save(image_bytes, format='PNG')
+    image_bytes.seek(0)
+
+    return image_bytes
@@ -1,9 +1,10 @@
 from io import BytesIO
 
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw
 
 from helper.rendertools import get_background, get_rank_color
 from helper.calctools import get_player_rank_info
+from helper.assetcache import get_font, get_image
 
 
 def render_mostplayed(name, uuid, hypixel_data):
@@ -54,7 +55,7 @@ def render_mostplayed(name, uuid, hypixel_data):
     black = (0, 0, 0)
     white = (255, 255, 255)
 
-    font = ImageFont.truetype('./assets/minecraft.ttf', 20)
+    font = get_font(20)
     player_y = 33
     player_txt = "'s Most Played Modes"
 
@@ -72,7 +73,7 @@ def render_mostplayed(name, uuid, hypixel_data):
     draw.text((startpoint, player_y), player_txt, fill=white, font=font)
 
     # Render the titles
-    overlay_image = Image.open('./assets/mostplayed/overlay.png')
+    overlay_image = get_image('./assets/mostplayed/overlay.png')
     base_image = Image.alpha_composite(base_image, overlay_image)
 
     # Return the image
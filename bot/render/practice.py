@@ -1,11 +1,12 @@
 from io import BytesIO
 
-from PIL import Image, ImageDraw, ImageFont
+from PIL import ImageDraw
 
 from calc.practice import Practice
 from helper.rendername import render_rank, get_rank_prefix
 from helper.rendertools import get_background, paste_skin
 from helper.renderprogress import render_progress_bar
+from helper.assetcache import get_font, get_image
 
 
 def render_practice(name, uuid, hypixel_data, skin_res):
@@ -30,8 +31,8 @@ def render_practice(name, uuid, hypixel_data, skin_res):
     image = image.convert("RGBA")
 
     draw = ImageDraw.Draw(image)
-    minecraft_16 = ImageFont.truetype('./assets/minecraft.ttf', 16)
-    minecraft_22 = ImageFont.truetype('./assets/minecraft.ttf', 22)
+    minecraft_16 = get_font(16)
+    minecraft_22 = get_font(22)
 
 
     def leng(text, width):
@@ -90,8 +91,7 @@ def render_practice(name, uuid, hypixel_data, skin_res):
     image = paste_skin(skin_res, image, positions=(466, 69))
 
     # Paste overlay
-    overlay_image = Image.open(f'./assets/practice/overlay.png')
-    overlay_image = overlay_image.convert("RGBA")
+    overlay_image = get_image('./assets/practice/overlay.png')
     image.paste(overlay_image, (0, 0), overlay_image)
 
     # Return the image
@@ -1,11 +1,14 @@
-from PIL import Image, ImageDraw, ImageFont
+from io import BytesIO
+
+from PIL import ImageDraw
 
 from calc.resources import Resources
 from helper.rendername import get_rank_prefix, render_rank
 from helper.rendertools import get_background
 from helper.renderprogress import render_progress_text, render_progress_bar
+from helper.assetcache import get_font, get_image
 
-def render_resources(name, uuid, mode, hypixel_data, save_dir):
+def render_resources(name, uuid, mode, hypixel_data):
     resources = Resources(name, mode, hypixel_data)
     level = resources.level
     player_rank_info = resources.player_rank_info
@@ -28,8 +31,8 @@ def render_resources(name, uuid, mode, hypixel_data, save_dir):
     image = image.convert("RGBA")
 
     draw = ImageDraw.Draw(image)
-    minecraft_16 = ImageFont.truetype('./assets/minecraft.ttf', 16)
-    minecraft_22 = ImageFont.truetype('./assets/minecraft.ttf', 22)
+    minecraft_16 = get_font(16)
+    minecraft_22 = get_font(22)
 
     def leng(text, container_width):
         """Returns startpoint for centering text in a box"""
@@ -98,9 +101,12 @@ def render_resources(name, uuid, mode, hypixel_data, save_dir):
     draw.text((leng(f'({mode})', 174)+450, 65), f'({mode})', fill=white, font=minecraft_16)
 
     # Paste overlay
-    overlay_image = Image.open(f'./assets/resources/overlay.png')
-    overlay_image = overlay_image.convert("RGBA")
+    overlay_image = get_image('./assets/resources/overlay.png')
     image.paste(overlay_image, (0, 0), overlay_image)
 
-    # Save the image
-    image.save(f'./database/activerenders/{save_dir}/{mode.lower()}.png')
+    # Return the image
+    image_bytes = BytesIO()
+    image.save(image_bytes, format='PNG')
+    image_bytes.seek(0)
+
+    return image_bytes
@@ -1,10 +1,11 @@
 import os
 from io import BytesIO
 
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw
 
 from helper.rendertools import get_background
 from helper.calctools import get_player_rank_info
+from helper.assetcache import get_font, get_image
 
 def render_shop(name, uuid, hypixel_data):
     # Get shop layout and positions
@@ -32,14 +33,13 @@ def render_shop(name, uuid, hypixel_data):
 
     for i, item in enumerate(shop):
         if os.path.exists(f"./assets/shop/{item}.png"):
-            top_image = Image.open(f"./assets/shop/{item}.png")
+            top_image = get_image(f'./assets/shop/{item}.png')
         else:
-            top_image = Image.open(f"./assets/shop/rotational_item.png")
-        top_image = top_image.convert("RGBA")
+            top_image = get_image('./assets/shop/rotational_item.png')
         composite_image.paste(top_image, slots[i], top_image)
 
     draw = ImageDraw.Draw(base_image)
-    font = ImageFont.truetype('./assets/minecraft.ttf', 32)
+    font = get_font(32)
 
     # If the name box is transparent, color the name, otherwise default gray
     title_txt = f"{name}'s Quick Buy"
@@ -1,12 +1,15 @@
-from PIL import Image, ImageDraw, ImageFont
+from io import BytesIO
+
+from PIL import ImageDraw
 
 from calc.total import Stats
 from helper.rendername import render_rank, get_rank_prefix
 from helper.rendertools import get_background, paste_skin
 from helper.renderprogress import render_progress_bar, render_progress_text
+from helper.assetcache import get_font, get_image
 
 
-def render_total(name, uuid, mode, hypixel_data, skin_res, save_dir, method):
+def render_total(name, uuid, mode, hypixel_data, skin_res, method):
     stats = Stats(name, mode, hypixel_data)
     level = stats.level
     player_rank_info = stats.player_rank_info
@@ -35,8 +38,8 @@ def render_total(name, uuid, mode, hypixel_data, skin_res, save_dir, method):
     image = image.convert("RGBA")
 
     draw = ImageDraw.Draw(image)
-    minecraft_16 = ImageFont.truetype('./assets/minecraft.ttf', 16)
-    minecraft_22 = ImageFont.truetype('./assets/minecraft.ttf', 22)
+    minecraft_16 = get_font(16)
+    minecraft_22 = get_font(22)
 
     def leng(text, width):
         return (width - draw.textlength(text, font=minecraft_16)) / 2
@@ -95,9 +98,12 @@ def render_total(name, uuid, mode, hypixel_data, skin_res, save_dir, method):
     image = paste_skin(skin_res, image, positions=(466, 69))
 
     # Paste overlay
-    overlay_image = Image.open(f'./assets/total/overlay_{method}.png')
-    overlay_image = overlay_image.convert("RGBA")
+    overlay_image = get_image(f'./assets/total/overlay_{method}.png')
     image.paste(overlay_image, (0, 0), overlay_image)
 
-    # Save the image
-    image.save(f'./database/activerenders/{save_dir}/{mode.lower()}.png')
+    # Return the image
+    image_bytes = BytesIO()
+    image.save(image_bytes, format='PNG')
+    image_bytes.seek(0)
+
+    return image_bytes
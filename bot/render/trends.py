@@ -0,0 +1,95 @@
+from io import BytesIO
+
+from PIL import Image, ImageDraw
+
+from calc.trends import TrendStats
+from helper.rendername import render_level_and_name
+from helper.rendertools import box_center_text
+from helper.assetcache import get_font
+
+
+def render_series(draw: ImageDraw, values, box: tuple, label: str, color: tuple):
+    """
+    Draws a line graph of a series inside of a panel
+    :param draw: ImageDraw object to draw with
+    :param values: the value of each day in the series
+    :param box: the left, top, right and bottom of the panel
+    :param label: the name of the series
+    :param color: the color of the line
+    """
+    left, top, right, bottom = box
+    minecraft_12 = get_font(12)
+    minecraft_16 = get_font(16)
+    white = (255, 255, 255)
+    gray = (170, 170, 170)
+    black = (0, 0, 0)
+
+    draw.rounded_rectangle(box, radius=8, fill=(18, 18, 22))
+
+    latest = f'{values[-1]:,.2f}'
+    for text, position, fill in (
+        (label, (left + 10, top + 6), white),
+        (latest, (right - 10 - draw.textlength(latest, font=minecraft_16), top + 6), color)
+    ):
+        draw.text((position[0] + 2, position[1] + 2), text, fill=black, font=minecraft_16)
+        draw.text(position, text, fill=fill, font=minecraft_16)
+
+    graph_left, graph_top = left + 50, top + 40
+    graph_right, graph_bottom = right - 12, bottom - 10
+
+    low, high = float(values.min()), float(values.max())
+    if high == low:
+        high = low + 1
+
+    for value, y in ((high, graph_top), (low, graph_bottom)):
+        draw.line((graph_left, y, graph_right, y), fill=(60, 60, 66))
+        text = f'{value:,.1f}'
+        draw.text((graph_left - 6 - draw.textlength(text, font=minecraft_12), y - 6),
+                  text, fill=gray, font=minecraft_12)
+
+    step = (graph_right - graph_left) / max(len(values) - 1, 1)
+    scale = (graph_bottom - graph_top) / (high - low)
+    points = [(graph_left + i * step, graph_bottom - (float(value) - low) * scale)
+              for i, value in enumerate(values)]
+
+    if len(points) == 1:
+        points.append((graph_right, points[0][1]))
+    draw.line(points, fill=color, width=2, joint='curve')
+
+
+def render_trends(name, uuid, mode, hypixel_data, end_date, days, window):
+    stats = TrendStats(name, uuid, end_date, days, window, mode, hypixel_data)
+    level = int(stats.hypixel_data.get('achievements', {}).get('bedwars_level', 0))
+
+    image = Image.new('RGBA', (640, 500), (30, 30, 36, 255))
+    draw = ImageDraw.Draw(image)
+    minecraft_12 = get_font(12)
+
+    render_level_and_name(name, level, stats.player_rank_info, image=image,
+                          box_positions=(0, 640), position_y=16, fontsize=20)
+
+    subtitle = (f'({mode.title()}) {window} day rolling average, '
+                f'{stats.tracked_days} of {days} days tracked')
+    box_center_text(subtitle, draw, box_width=640, box_start=0, text_y=46, font=get_font(14))
+
+    series = (
+        ('FKDR', stats.get_fkdr(), (255, 170, 0)),
+        ('WLR', stats.get_wlr(), (85, 255, 85)),
+        ('Stars / Day', stats.get_stars_per_day(), (255, 85, 255)),
+    )
+    for i, (label, values, color) in enumerate(series):
+        top = 76 + i * 134
+        render_series(draw, values, (16, top, 624, top + 122), label, color)
+
+    start = stats.start_date.strftime('%b %d, %Y')
+    end = stats.end_date.strftime('%b %d, %Y')
+    draw.text((66, 478), start, fill=(170, 170, 170), font=minecraft_12)
+    draw.text((612 - draw.textlength(end, font=minecraft_12), 478), end,
+              fill=(170, 170, 170), font=minecraft_12)
+
+    # Return the image
+    image_bytes = BytesIO()
+    image.save(image_bytes, format='PNG')
+    image_bytes.seek(0)
+
+    return image_bytes
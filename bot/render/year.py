@@ -1,14 +1,16 @@
 from datetime import datetime
+from io import BytesIO
 
-from PIL import Image, ImageDraw, ImageFont
+from PIL import ImageDraw
 
 from calc.year import YearStats
 from helper.rendertools import get_background, paste_skin, box_center_text
 from helper.rendername import render_level, render_rank, get_rank_prefix
+from helper.assetcache import get_font, get_image
 
 
 def render_year(name, uuid, session, year, mode,
-                hypixel_data, skin_res, save_dir):
+                hypixel_data, skin_res):
     stats = YearStats(name, uuid, session, year, mode, hypixel_data)
     level = int(stats.level_hypixel)
     target = stats.get_target()
@@ -33,10 +35,10 @@ def render_year(name, uuid, session, year, mode,
     image = image.convert("RGBA")
 
     draw = ImageDraw.Draw(image)
-    minecraft_16 = ImageFont.truetype('./assets/minecraft.ttf', 16)
-    minecraft_18 = ImageFont.truetype('./assets/minecraft.ttf', 18)
-    minecraft_20 = ImageFont.truetype('./assets/minecraft.ttf', 20)
-    minecraft_22 = ImageFont.truetype('./assets/minecraft.ttf', 22)
+    minecraft_16 = get_font(16)
+    minecraft_18 = get_font(18)
+    minecraft_20 = get_font(20)
+    minecraft_22 = get_font(22)
 
     def leng(text, width):
         return (width - draw.textlength(text, font=minecraft_16)) / 2
@@ -124,11 +126,15 @@ def render_year(name, uuid, session, year, mode,
     image = paste_skin(skin_res, image, positions=(466, 69))
 
     # Paste overlay
-    overlay_image = Image.open('./assets/year/overlay.png')
+    overlay_image = get_image('./assets/year/overlay.png')
     overlay_image = overlay_image.convert('RGBA')
     image.paste(overlay_image, (0, 0), overlay_image)
 
-    # Save the image
-    image.save(f'./database/activerenders/{save_dir}/{mode.lower()}.png')
+    # Return the image
+    image_bytes = BytesIO()
+    image.save(image_bytes, format='PNG')
+    image_bytes.seek(0)
+
+    return image_bytes
     if mode.lower() == "overall":
         return level